@@ -1,5 +1,6 @@
 from data_templates.course_template import Course
 from data_templates.data_templates_util import list_to_str
+from data_templates.time_slots import meeting_times_mask, week_mask
 
 
 class SemesterCourse(Course):
@@ -31,6 +32,11 @@ class SemesterCourse(Course):
         #     "Period 6"), "F": ("1250", "1340", "Period 6")}, {"T": ("1040",
         #     "1130", "Period 4")}
         # ]
+        self.time_mask = week_mask(times)  # int: self.times as a bitmask
+        # over 5 minute slots of the week (see data_templates.time_slots),
+        # used for all overlap and blackout checks
+        self.filter_results = {}  # compiled schedule filters -> whether
+        # this section passes them, filled in by their passes method
         self.locations = locations  # list of strings the corresponding
         # dictionary of times for each location is at the same index but in
         # self.times: location names in short form, for example: CAR100
@@ -125,61 +131,16 @@ class SemesterCourse(Course):
         return message
 
     def times_overlap(self, self_time_for_location, other_time_for_location):
-        for self_day, self_start_end_times in self_time_for_location.items():
-            for other_day, other_start_end_times in (
-                    other_time_for_location.items()):
-                if (self_day == other_day and (other_start_end_times[0] <=
-                        self_start_end_times[0] <= other_start_end_times[1] or
-                        self_start_end_times[0] <= other_start_end_times[0] <=
-                        self_start_end_times[1])):
-                    return True
-
-        return False
+        return (meeting_times_mask(self_time_for_location) &
+                meeting_times_mask(other_time_for_location)) != 0
 
     def is_compatible(self, other):
         if self.code == other.code:
             return False
 
-        for self_time_for_location in self.times:
-            for other_time_for_location in other.times:
-                if self.times_overlap(self_time_for_location,
-                                      other_time_for_location):
-                    return False
-
-        return True
-
-    def meets_requirements(self, earliest_time="", latest_time="",
-                           period_blackouts=None, day_blackouts=None,
-                           min_instructor_rating="0",
-                           max_level_of_difficulty="", min_would_take_again=""):
-        meets_requirements = True
-
-        for time_dict in self.times:
-            for day, time_list in time_dict.items():
-                if earliest_time:
-                    if time_list[0] < earliest_time:
-                        meets_requirements = False
-                if latest_time:
-                    if time_list[1] > latest_time:
-                        meets_requirements = False
-                if period_blackouts:
-                    for period_blackout in period_blackouts:
-                        if period_blackout in time_list[2]:
-                            meets_requirements = False
-                if day_blackouts:
-                    for day_blackouts in day_blackouts:
-                        if day_blackouts == day:
-                            meets_requirements = False
-
-            if min_instructor_rating:
-                if self.instructors != ["Staff"]:
-                    if min(self.instructor_ratings) < min_instructor_rating:
-                        meets_requirements = False
-            if max_level_of_difficulty:
-                if self.level_of_difficulty > max_level_of_difficulty:
-                    meets_requirements = False
-            if min_would_take_again:
-                if self.would_take_again < min_would_take_again:
-                    meets_requirements = False
+        return self.time_mask & other.time_mask == 0
 
-        return meets_requirements
+    def meets_requirements(self, filters):
+        # filters are compiled by the scheduler (see
+        # semester_scheduling.schedule_filters.compile_filters)
+        return filters.passes(self)
@@ -0,0 +1,164 @@
+from functools import lru_cache
+
+# The week is discretized into 5 minute slots for every day from Monday to
+# Saturday. Slot n of day d is bit d * SLOTS_PER_DAY + n of a week mask, so
+# two sets of meeting times overlap exactly when their masks share a bit.
+SLOT_MINUTES = 5
+SLOTS_PER_DAY = 24 * 60 // SLOT_MINUTES
+WEEK_DAYS = "MTWRFS"
+DAY_MASK = (1 << SLOTS_PER_DAY) - 1
+# Week masks are stored in Postgres as little-endian bytes of this length
+WEEK_MASK_BYTES = len(WEEK_DAYS) * SLOTS_PER_DAY // 8
+
+# Start and end time of each UF class period in military time. Periods 12
+# to 14 are the evening periods E1 to E3.
+PERIOD_TIMES = {
+    "1": ("0725", "0815"), "2": ("0830", "0920"), "3": ("0935", "1025"),
+    "4": ("1040", "1130"), "5": ("1145", "1235"), "6": ("1250", "1340"),
+    "7": ("1355", "1445"), "8": ("1500", "1550"), "9": ("1605", "1655"),
+    "10": ("1710", "1800"), "11": ("1815", "1905"), "12": ("1920", "2010"),
+    "13": ("2020", "2110"), "14": ("2120", "2210"),
+}
+PERIOD_TIMES["E1"] = PERIOD_TIMES["12"]
+PERIOD_TIMES["E2"] = PERIOD_TIMES["13"]
+PERIOD_TIMES["E3"] = PERIOD_TIMES["14"]
+
+
+def time_to_minutes(time):
+    # time is a military time string formatted as XXYY (e.g., 1340)
+    return int(time[:2]) * 60 + int(time[2:4])
+
+
+def slot_to_time(slot):
+    # Inverse of time_to_minutes for a slot's start, e.g., slot 150 is 1230
+    minutes = slot * SLOT_MINUTES
+
+    return f"{minutes // 60:02d}{minutes % 60:02d}"
+
+
+def slot_range_mask(day, start_slot, end_slot):
+    """Bits for the slots in [start_slot, end_slot) of one day."""
+    day_index = WEEK_DAYS.find(day)
+
+    if day_index == -1 or end_slot <= start_slot:
+        return 0
+
+    day_bits = (1 << end_slot) - (1 << start_slot)
+
+    return day_bits << (day_index * SLOTS_PER_DAY)
+
+
+def time_range_mask(day, start_time, end_time):
+    """Bits for a meeting from start_time to end_time on one day.
+
+    Meetings are half-open, so a class ending at 0930 doesn't overlap one
+    starting at 0930. The end is rounded up to the next slot so a meeting
+    always covers at least one slot.
+    """
+    start_slot = time_to_minutes(start_time) // SLOT_MINUTES
+    end_slot = -(-time_to_minutes(end_time) // SLOT_MINUTES)
+
+    return slot_range_mask(day, start_slot, max(end_slot, start_slot + 1))
+
+
+def meeting_times_mask(time_for_location):
+    """Week mask of one location's {day: [start, end, period]} dictionary."""
+    mask = 0
+
+    for day, start_end_times in time_for_location.items():
+        mask |= time_range_mask(day, start_end_times[0], start_end_times[1])
+
+    return mask
+
+
+def week_mask(times):
+    """Week mask of a SemesterCourse's list of times for each location."""
+    mask = 0
+
+    for time_for_location in times:
+        mask |= meeting_times_mask(time_for_location)
+
+    return mask
+
+
+def every_day(day_bits):
+    """Repeat a single day's bits for every day of the week."""
+    mask = 0
+
+    for day_index in range(len(WEEK_DAYS)):
+        mask |= day_bits << (day_index * SLOTS_PER_DAY)
+
+    return mask
+
+
+def period_mask(period):
+    """Week mask of a period on every day, accepts "6", "E1" or "Period 6"."""
+    period = str(period).replace("Period", "").strip()
+
+    if period not in PERIOD_TIMES:
+        return 0
+
+    start_time, end_time = PERIOD_TIMES[period]
+
+    return every_day(time_range_mask("M", start_time, end_time))
+
+
+@lru_cache(maxsize=1024)
+def blackout_mask(earliest_time="", latest_time="", period_blackouts=(),
+                  day_blackouts=()):
+    """Week mask of every slot a section isn't allowed to meet in.
+
+    Arguments have to be hashable (use tuples for the blackout lists) so
+    the mask for the same filters is only built once.
+    """
+    mask = 0
+
+    if earliest_time:
+        earliest_slot = time_to_minutes(earliest_time) // SLOT_MINUTES
+        mask |= every_day(slot_range_mask("M", 0, earliest_slot))
+    if latest_time:
+        latest_slot = -(-time_to_minutes(latest_time) // SLOT_MINUTES)
+        mask |= every_day(slot_range_mask("M", latest_slot, SLOTS_PER_DAY))
+    for period in period_blackouts:
+        mask |= period_mask(period)
+    for day in day_blackouts:
+        mask |= slot_range_mask(day, 0, SLOTS_PER_DAY)
+
+    return mask
+
+
+def mask_to_bytes(mask):
+    return mask.to_bytes(WEEK_MASK_BYTES, "little")
+
+
+def mask_from_bytes(data):
+    return int.from_bytes(data, "little") if data else 0
+
+
+def free_blocks(busy_mask, day_start="0800", day_end="2200", min_minutes=30):
+    """Free time of every day between day_start and day_end as a list of
+    (day, start time, end time), skipping gaps shorter than min_minutes.
+
+    The window is clamped to the day, so it never reaches into the next one.
+    """
+    start_slot = min(max(time_to_minutes(day_start) // SLOT_MINUTES, 0),
+                     SLOTS_PER_DAY)
+    end_slot = min(max(-(-time_to_minutes(day_end) // SLOT_MINUTES), 0),
+                   SLOTS_PER_DAY)
+    window = slot_range_mask("M", start_slot, end_slot)
+    min_slots = -(-min_minutes // SLOT_MINUTES)
+    blocks = []
+
+    for day_index, day in enumerate(WEEK_DAYS):
+        free = ~(busy_mask >> (day_index * SLOTS_PER_DAY)) & window
+
+        while free:
+            start = (free & -free).bit_length() - 1
+            run = free >> start
+            length = (run ^ (run + 1)).bit_length() - 1  # trailing ones
+            if length >= min_slots:
+                blocks.append((day, slot_to_time(start),
+                               slot_to_time(start + length)))
+            free &= ~(((1 << length) - 1) << start)
+
+    return blocks
@@ -0,0 +1,102 @@
+"""Pull every section of a term from the UF schedule API into Postgres.
+
+Each run stores a new snapshot in the sections table and makes it the term's
+current snapshot, which schedulers then read instead of calling the API. Run
+it from the src directory:
+    python -m database_interface.ingest_sections --term 2258
+"""
+import argparse
+import asyncio
+import time
+import asyncpg
+from db.migrations import run_migrations
+from semester_scheduling.professor_ratings import professor_rating_cache
+from semester_scheduling.section_fetcher import SectionFetcher
+from semester_scheduling.section_snapshot import SECTION_COLUMNS, \
+    fetch_term_courses, section_record
+from semester_scheduling.semester_schedule import \
+    semester_courses_from_api_course
+from semester_scheduling.soc_api import SOC_SCHEDULE_URL, TERM
+
+DATABASE_URL = "postgresql://postgres@localhost/testdb"
+
+
+async def ingest_sections(database_url=DATABASE_URL, term=TERM,
+                          with_ratings=True, soc_url=SOC_SCHEDULE_URL):
+    start = time.perf_counter()
+    fetcher = SectionFetcher(base_url=soc_url, timeout=30)
+
+    try:
+        courses = [course async for course in fetch_term_courses(fetcher,
+                                                                 term)]
+    finally:
+        await fetcher.aclose()
+
+    print(f"Fetched {len(courses)} courses for term {term} in "
+          f"{time.perf_counter() - start:.1f}s")
+
+    professor_ratings = {}
+    if with_ratings:
+        professor_ratings = await professor_rating_cache.get_ratings_async([
+            section['instructors'][0].get('name', '')
+            for course in courses
+            for section in course.get('sections', [])
+            if section.get('instructors')
+        ])
+
+    # The same section can show up on more than one page
+    semester_courses = {}
+    for course in courses:
+        for semester_course in semester_courses_from_api_course(
+                course, professor_ratings):
+            key = (semester_course.code, str(semester_course.unique_id))
+            semester_courses[key] = semester_course
+
+    connection = await asyncpg.connect(database_url)
+
+    try:
+        # The app migrates when it starts, this is for databases it hasn't
+        # run against yet
+        await run_migrations(connection)
+
+        # Readers keep seeing the old snapshot until this commits
+        async with connection.transaction():
+            snapshot_id = await connection.fetchval(
+                "INSERT INTO section_snapshots (term) VALUES ($1) "
+                "RETURNING id", term)
+            await connection.copy_records_to_table(
+                "sections", columns=SECTION_COLUMNS,
+                records=[section_record(snapshot_id, semester_course)
+                         for semester_course in semester_courses.values()])
+            await connection.execute(
+                "UPDATE section_snapshots SET is_current = (id = $1) "
+                "WHERE term = $2", snapshot_id, term)
+            # Also deletes the old snapshots' cached schedule results
+            await connection.execute(
+                "DELETE FROM section_snapshots WHERE term = $1 AND id <> $2",
+                term, snapshot_id)
+    finally:
+        await connection.close()
+
+    print(f"Stored {len(semester_courses)} sections as snapshot "
+          f"{snapshot_id} in {time.perf_counter() - start:.1f}s")
+
+    return snapshot_id
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--term", default=TERM)
+    parser.add_argument("--database-url", default=DATABASE_URL)
+    parser.add_argument("--soc-url", default=SOC_SCHEDULE_URL,
+                        help="UF schedule API URL (or a stub server's)")
+    parser.add_argument("--skip-ratings", action="store_true",
+                        help="don't look up instructor ratings")
+    args = parser.parse_args()
+
+    asyncio.run(ingest_sections(args.database_url, args.term,
+                                not args.skip_ratings, args.soc_url))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+import re
+from .courses_schema import CourseSearchResult
+from src.db.postgres import database
+
+# The Courses table and its search indexes are created by database_interface/create_db.py; the expressions below
+# have to stay the same as the indexed ones or Postgres can't use the indexes.
+# Codes are matched without their space ("MAC2313" and "mac 23" both find "MAC 2313") as a text_pattern_ops range,
+# which the B-tree index answers even in a generic prepared plan, unlike LIKE with a parameter.
+# Names and descriptions are matched by trigram word similarity (typos, partial words) or full-text search on the
+# stored search_vector column.
+SEARCH_COURSES_QUERY = '''
+    SELECT code, credit, name, subject, description, lvl FROM (
+        SELECT DISTINCT ON (code) * FROM (
+            (SELECT code, credit, name, subject, description, lvl, 0 AS match_rank, 1.0::real AS score
+             FROM Courses
+             WHERE replace(code, ' ', '') ~>=~ $1 AND replace(code, ' ', '') ~<~ ($1 || '~')
+               AND ($3::text IS NULL OR subject = $3) AND ($4::text IS NULL OR lvl = $4)
+             ORDER BY replace(code, ' ', '') LIMIT $5)
+            UNION ALL
+            (SELECT code, credit, name, subject, description, lvl, 1 AS match_rank,
+                    word_similarity($2, name) +
+                    ts_rank(search_vector, plainto_tsquery('english', $2)) AS score
+             FROM Courses
+             WHERE ($2 <% name OR search_vector @@ plainto_tsquery('english', $2))
+               AND ($3::text IS NULL OR subject = $3) AND ($4::text IS NULL OR lvl = $4)
+             ORDER BY score DESC LIMIT $5)
+        ) matches ORDER BY code, match_rank
+    ) courses ORDER BY match_rank, score DESC, code LIMIT $5
+'''
+
+async def search_courses(query: str, subject: str | None, level: str | None, limit: int):
+    """
+    Code prefix matches come first (in code order), then name and description matches (best first).
+    """
+    # Only letters and digits can be part of a code, so nothing in it is special in the range comparison
+    code_prefix = re.sub(r"[^A-Za-z0-9]", "", query).upper() or None
+    async with database.acquire() as connection:
+        rows = await connection.fetch(SEARCH_COURSES_QUERY, code_prefix, query.strip(), subject, level, limit)
+
+    return [CourseSearchResult(**dict(row)) for row in rows]
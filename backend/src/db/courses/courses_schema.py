@@ -0,0 +1,9 @@
+from pydantic import BaseModel
+
+class CourseSearchResult(BaseModel):
+    code: str
+    credit: str
+    name: str | None
+    subject: str | None
+    description: str | None
+    lvl: str | None
@@ -0,0 +1,139 @@
+import asyncpg
+
+# Arbitrary key of the advisory lock held while migrating, so app workers starting together migrate one at a time
+MIGRATIONS_LOCK_KEY = 7_413_920_025
+
+# (version, name, SQL), applied in order, each exactly once. Never edit one that has shipped, add a new one instead.
+# The first ones use IF NOT EXISTS because databases made before migrations already have some of their tables,
+# columns and indexes.
+MIGRATIONS = [
+    (1, "create users, plans, schedules and friendships", '''
+        CREATE TABLE IF NOT EXISTS users (
+            uid TEXT PRIMARY KEY NOT NULL,
+            name TEXT NOT NULL,
+            email TEXT NOT NULL,
+            username TEXT NOT NULL
+        );
+
+        CREATE TABLE IF NOT EXISTS plans (
+            id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+            owner_uid TEXT REFERENCES users(uid),
+            semester VARCHAR(15) NOT NULL,
+            name TEXT NOT NULL,
+            date DATE NOT NULL DEFAULT CURRENT_DATE
+        );
+
+        CREATE TABLE IF NOT EXISTS schedules (
+            id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+            owner_uid TEXT REFERENCES users(uid),
+            semester VARCHAR(15) NOT NULL,
+            name TEXT NOT NULL,
+            date DATE NOT NULL DEFAULT CURRENT_DATE
+        );
+
+        CREATE TABLE IF NOT EXISTS friendships (
+            user_id TEXT NOT NULL REFERENCES users(uid),
+            friend_id TEXT NOT NULL REFERENCES users(uid),
+            PRIMARY KEY (user_id, friend_id)
+        );
+    '''),
+    (2, "store schedule sections and week masks", '''
+        -- The sections of a schedule and their meeting times as a week mask (see data_templates/time_slots.py) for
+        -- comparing schedules between friends
+        ALTER TABLE schedules ADD COLUMN IF NOT EXISTS sections JSONB NOT NULL DEFAULT '[]';
+        ALTER TABLE schedules ADD COLUMN IF NOT EXISTS time_mask BYTEA;
+    '''),
+    (3, "index plans, schedules and friendships by user", '''
+        CREATE INDEX IF NOT EXISTS plans_owner_uid_idx ON plans (owner_uid);
+        -- Also serves lookups by owner_uid alone (e.g., the overview), so there's no separate index for those
+        CREATE INDEX IF NOT EXISTS schedules_owner_semester_idx ON schedules (owner_uid, semester, date DESC);
+        -- The primary key covers lookups by user_id, this one who added a user as a friend
+        CREATE INDEX IF NOT EXISTS friendships_friend_id_idx ON friendships (friend_id);
+    '''),
+    (4, "create section snapshots and schedule results", '''
+        -- A snapshot is one full pull of a term's sections (see database_interface/ingest_sections.py). Only one
+        -- snapshot per term is current, schedulers read from it instead of calling the UF API. Databases that had
+        -- sections ingested before this migration already have these tables.
+        CREATE TABLE IF NOT EXISTS section_snapshots (
+            id SERIAL PRIMARY KEY,
+            term TEXT NOT NULL,
+            created_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+            is_current BOOLEAN NOT NULL DEFAULT FALSE
+        );
+
+        CREATE TABLE IF NOT EXISTS sections (
+            snapshot_id INT NOT NULL REFERENCES section_snapshots(id) ON DELETE CASCADE,
+            code TEXT NOT NULL,
+            unique_id TEXT NOT NULL,
+            credit TEXT,
+            name TEXT,
+            subject TEXT,
+            times JSONB NOT NULL,
+            locations TEXT[],
+            instructors TEXT[],
+            instructor_ratings TEXT[],
+            mode_type TEXT,
+            final_exam_date TEXT,
+            class_dates TEXT,
+            department TEXT,
+            gen_ed TEXT[],
+            level_of_difficulty TEXT,
+            would_take_again TEXT,
+            PRIMARY KEY (snapshot_id, code, unique_id)
+        );
+
+        -- Schedule search results shared between app workers (see semester_scheduling/schedule_result_cache.py),
+        -- deleted along with their snapshot when a newer one is ingested
+        CREATE TABLE IF NOT EXISTS schedule_results (
+            key TEXT PRIMARY KEY,
+            snapshot_id INT NOT NULL REFERENCES section_snapshots(id) ON DELETE CASCADE,
+            codes TEXT[] NOT NULL,
+            result JSONB NOT NULL,
+            created_at TIMESTAMPTZ NOT NULL DEFAULT now()
+        );
+    '''),
+]
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+async def get_schema_version(connection: asyncpg.Connection):
+    """Version of the last migration applied, 0 if none has been."""
+    try:
+        return await connection.fetchval("SELECT coalesce(max(version), 0) FROM schema_migrations")
+    except asyncpg.UndefinedTableError:
+        return 0
+
+async def run_migrations(connection: asyncpg.Connection):
+    """
+    Applies the migrations the database doesn't have yet, each in its own transaction with its row in
+    schema_migrations, and returns the versions applied. When the schema is current it's one query and no DDL.
+    """
+    if await get_schema_version(connection) >= LATEST_VERSION:
+        return []
+
+    applied = []
+    async with connection.transaction():
+        await connection.execute("SELECT pg_advisory_xact_lock($1)", MIGRATIONS_LOCK_KEY)
+        await connection.execute('''
+            CREATE TABLE IF NOT EXISTS schema_migrations (
+                version INTEGER PRIMARY KEY,
+                name TEXT NOT NULL,
+                applied_at TIMESTAMPTZ NOT NULL DEFAULT now()
+            )
+        ''')
+        # Another worker may have migrated while this one waited for the lock
+        version = await get_schema_version(connection)
+
+    for migration_version, name, sql in MIGRATIONS:
+        if migration_version <= version:
+            continue
+
+        async with connection.transaction():
+            await connection.execute("SELECT pg_advisory_xact_lock($1)", MIGRATIONS_LOCK_KEY)
+            if await connection.fetchval("SELECT 1 FROM schema_migrations WHERE version = $1", migration_version):
+                continue
+            await connection.execute(sql)
+            await connection.execute("INSERT INTO schema_migrations (version, name) VALUES ($1, $2)",
+                                     migration_version, name)
+        applied.append(migration_version)
+
+    return applied
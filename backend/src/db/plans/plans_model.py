@@ -1,17 +1,18 @@
-from .plans_schema import PlanCreate, PlanEdit, PlanDelete
+from .plans_schema import PlanCreate, PlanEdit, PlanDelete, PlanValidate, PlanGenerate
 from src.db.postgres import database
 
+INSERT_PLAN = database.statement("insert_plan", "INSERT INTO plans (owner_uid, name, semester) VALUES ($1, $2, $3)")
+EDIT_PLAN = database.statement("edit_plan", "UPDATE plans SET name = $1, semester = $2 WHERE id = $3 AND owner_uid = $4")
+DELETE_PLAN = database.statement("delete_plan", "DELETE FROM plans WHERE id = $1 AND owner_uid = $2")
+
 async def insert_plan(plan: PlanCreate, uid: str):
-    query = "INSERT INTO plans (owner_uid, name, semester) VALUES ($1, $2, $3)"
-    async with database.pool.acquire() as connection:
-        await connection.execute(query, uid, plan.name, plan.semester)
+    async with database.acquire() as connection:
+        await connection.execute(INSERT_PLAN, uid, plan.name, plan.semester)
 
 async def edit_plan(plan: PlanEdit, uid: str):
-    query = "UPDATE plans SET name = $1, semester = $2 WHERE id = $3 AND owner_uid = $4"
-    async with database.pool.acquire() as connection:
-        await connection.execute(query, plan.name, plan.semester, plan.id, uid)
+    async with database.acquire() as connection:
+        await connection.execute(EDIT_PLAN, plan.name, plan.semester, plan.id, uid)
 
 async def delete_plan(plan: PlanDelete, uid: str):
-    query = "DELETE FROM plans WHERE id = $1 AND owner_uid = $2"
-    async with database.pool.acquire() as connection:
-        await connection.execute(query, plan.id, uid)
\ No newline at end of file
+    async with database.acquire() as connection:
+        await connection.execute(DELETE_PLAN, plan.id, uid)
@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 class PlanBase(BaseModel):
     id: str
@@ -13,3 +13,14 @@ class PlanEdit(PlanBase):
 
 class PlanDelete(PlanBase):
     pass
+
+class PlanValidate(BaseModel):
+    semesters: list[list[str]]  # course codes of every semester, in order
+    completed: list[str] = []  # courses taken before the plan
+    max_credits: int = Field(default=18, ge=1, le=30)
+
+class PlanGenerate(BaseModel):
+    program: str  # name of a major with a model plan in backend/data
+    completed: list[str] = []
+    semesters: int = Field(default=8, ge=1, le=12)
+    max_credits: int = Field(default=18, ge=1, le=30)
@@ -0,0 +1,104 @@
+import bisect
+
+# Upper bounds of the latency histogram buckets, in milliseconds, the last bucket has everything slower
+LATENCY_BUCKETS_MS = (0.5, 1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500)
+
+class LatencyHistogram:
+    """Counts of latencies in fixed buckets, so recording one is a bisect and an increment however many are recorded."""
+
+    def __init__(self):
+        self.counts = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.errors = 0
+
+    def record(self, elapsed_ms: float, failed: bool = False):
+        self.counts[bisect.bisect_left(LATENCY_BUCKETS_MS, elapsed_ms)] += 1
+        self.count += 1
+        self.total_ms += elapsed_ms
+        self.max_ms = max(self.max_ms, elapsed_ms)
+        self.errors += failed
+
+    def get_percentile(self, fraction: float):
+        """Upper bound of the bucket the percentile falls in, at most the max."""
+        rank = fraction * self.count
+        seen = 0
+
+        for bound, count in zip(LATENCY_BUCKETS_MS + (float("inf"),), self.counts):
+            seen += count
+            if count and seen >= rank:
+                return min(bound, self.max_ms)
+
+        return 0.0
+
+    def get_stats(self):
+        bucket_names = [f"<={bound}ms" for bound in LATENCY_BUCKETS_MS] + [f">{LATENCY_BUCKETS_MS[-1]}ms"]
+
+        return {
+            "count": self.count,
+            "errors": self.errors,
+            "mean_ms": self.total_ms / self.count if self.count else 0.0,
+            "max_ms": self.max_ms,
+            "p50_ms": self.get_percentile(0.5),
+            "p95_ms": self.get_percentile(0.95),
+            "p99_ms": self.get_percentile(0.99),
+            "buckets": dict(zip(bucket_names, self.counts))
+        }
+
+class PoolMetrics:
+    """
+    How long requests wait for a pool connection, how busy the pool is and how long every query takes, by statement
+    name (see Postgres.statement). Only touched from the event loop, so there's no lock.
+    """
+
+    def __init__(self):
+        self.acquire_wait = LatencyHistogram()
+        self.queries = {}  # statement name -> LatencyHistogram
+        self.in_use = 0  # connections handed out
+        self.waiting = 0  # acquires waiting for a connection
+        self.peak_in_use = 0
+        self.peak_waiting = 0
+        self.saturated_acquires = 0  # acquires that had to queue, every connection the pool may open being taken
+
+    def start_acquire(self, max_size: int):
+        if self.in_use + self.waiting >= max_size:
+            self.saturated_acquires += 1
+        self.waiting += 1
+        self.peak_waiting = max(self.peak_waiting, self.waiting)
+
+    def end_acquire(self, wait_ms: float, acquired: bool):
+        self.waiting -= 1
+        self.acquire_wait.record(wait_ms, not acquired)
+        if acquired:
+            self.in_use += 1
+            self.peak_in_use = max(self.peak_in_use, self.in_use)
+
+    def release(self):
+        self.in_use -= 1
+
+    def record_query(self, name: str, elapsed_ms: float, failed: bool):
+        histogram = self.queries.get(name)
+        if histogram is None:
+            histogram = self.queries[name] = LatencyHistogram()
+        histogram.record(elapsed_ms, failed)
+
+    def get_stats(self, pool):
+        max_size = pool.get_max_size()
+
+        return {
+            "pool": {
+                "size": pool.get_size(),
+                "idle": pool.get_idle_size(),
+                "min_size": pool.get_min_size(),
+                "max_size": max_size,
+                "in_use": self.in_use,
+                "waiting": self.waiting,
+                "saturation": self.in_use / max_size if max_size else 0.0,
+                "peak_in_use": self.peak_in_use,
+                "peak_waiting": self.peak_waiting,
+                "saturated_acquires": self.saturated_acquires
+            },
+            "acquire_wait": self.acquire_wait.get_stats(),
+            "queries": {name: histogram.get_stats() for name, histogram in sorted(self.queries.items())}
+        }
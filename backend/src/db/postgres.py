@@ -1,48 +1,78 @@
 import asyncpg
+import os
+import time
+from contextlib import asynccontextmanager
+from src.db.migrations import run_migrations
+from src.db.pool_metrics import PoolMetrics
 
-DATABASE_URL = "postgresql://postgres@localhost/testdb"
+DATABASE_URL = os.environ.get("DATABASE_URL", "postgresql://postgres@localhost/testdb")
+# Pool sizing, raise the max size if the admin pool stats show acquires waiting (and Postgres has connections to spare)
+POOL_MIN_SIZE = int(os.environ.get("DATABASE_POOL_MIN_SIZE", 4))
+POOL_MAX_SIZE = int(os.environ.get("DATABASE_POOL_MAX_SIZE", 20))
+MAX_INACTIVE_CONNECTION_LIFETIME = float(os.environ.get("DATABASE_MAX_INACTIVE_CONNECTION_LIFETIME", 300))
+# Prepared statements each connection keeps (least recently used ones are closed first), enough for every fixed query
+STATEMENT_CACHE_SIZE = int(os.environ.get("DATABASE_STATEMENT_CACHE_SIZE", 256))
 
 class Postgres:
-    def __init__(self, database_url: str):
+    def __init__(self, database_url: str, min_size: int = POOL_MIN_SIZE, max_size: int = POOL_MAX_SIZE,
+                 statement_cache_size: int = STATEMENT_CACHE_SIZE):
         self.database_url = database_url
+        self.min_size = min_size
+        self.max_size = max_size
+        self.statement_cache_size = statement_cache_size
+        self.statements = {}  # query -> statement name, for the metrics
+        self.metrics = PoolMetrics()
 
     async def connect(self):
-        self.pool = await asyncpg.create_pool(self.database_url)
+        self.pool = await asyncpg.create_pool(self.database_url, min_size=self.min_size, max_size=self.max_size,
+                                              statement_cache_size=self.statement_cache_size,
+                                              max_inactive_connection_lifetime=MAX_INACTIVE_CONNECTION_LIFETIME,
+                                              init=self.init_connection)
 
     async def disconnect(self):
         await self.pool.close()
 
-    async def create_tables(self):
-        async with database.pool.acquire() as connection:
-            await connection.execute('''
-                CREATE TABLE IF NOT EXISTS users (
-                    uid TEXT PRIMARY KEY NOT NULL,
-                    name TEXT NOT NULL,
-                    email TEXT NOT NULL,
-                    username TEXT NOT NULL
-                );
-
-                CREATE TABLE IF NOT EXISTS plans (
-                    id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
-                    owner_uid TEXT REFERENCES users(uid),
-                    semester VARCHAR(15) NOT NULL,
-                    name TEXT NOT NULL,
-                    date DATE NOT NULL DEFAULT CURRENT_DATE
-                );
-
-                CREATE TABLE IF NOT EXISTS schedules (
-                    id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
-                    owner_uid TEXT REFERENCES users(uid),
-                    semester VARCHAR(15) NOT NULL,
-                    name TEXT NOT NULL,
-                    date DATE NOT NULL DEFAULT CURRENT_DATE
-                );
-                
-                CREATE TABLE IF NOT EXISTS friendships (
-                    user_id TEXT NOT NULL REFERENCES users(uid),
-                    friend_id TEXT NOT NULL REFERENCES users(uid),
-                    PRIMARY KEY (user_id, friend_id)
-                );
-            ''')
+    async def init_connection(self, connection: asyncpg.Connection):
+        # The pool runs the reset query whenever a connection is released
+        self.statements[connection.get_reset_query()] = "pool_reset"
+        connection.add_query_logger(self.log_query)
+
+    def log_query(self, record):
+        self.metrics.record_query(self.statements.get(record.query, "other"), record.elapsed * 1000,
+                                  record.exception is not None)
+
+    def statement(self, name: str, query: str):
+        """
+        Names a fixed query for the metrics and returns it. Run it as is: asyncpg prepares a query on the server the
+        first time a connection runs it and reuses the prepared statement from then on, so a query whose text never
+        changes is only parsed and planned once per connection.
+        """
+        self.statements[query] = name
+        return query
+
+    @asynccontextmanager
+    async def acquire(self):
+        """A connection of the pool, timing the wait for it."""
+        self.metrics.start_acquire(self.max_size)
+        start = time.perf_counter()
+        connection = None
+        try:
+            connection = await self.pool.acquire()
+        finally:
+            self.metrics.end_acquire((time.perf_counter() - start) * 1000, connection is not None)
+
+        try:
+            yield connection
+        finally:
+            self.metrics.release()
+            await self.pool.release(connection)
+
+    def get_stats(self):
+        return self.metrics.get_stats(self.pool)
+
+    async def migrate(self):
+        """Brings the schema up to date (see db/migrations.py), which does nothing if it already is."""
+        async with self.acquire() as connection:
+            return await run_migrations(connection)
 
 database = Postgres(DATABASE_URL)
\ No newline at end of file
@@ -1,22 +1,47 @@
-from .schedules_schema import ScheduleCreate, ScheduleEdit, ScheduleDelete
+import json
+from .schedules_schema import ScheduleCreate, ScheduleEdit, ScheduleDelete, ScheduleSection
 from src.db.postgres import database
+from data_templates.time_slots import mask_to_bytes, week_mask
+
+INSERT_SCHEDULE = database.statement(
+    "insert_schedule",
+    "INSERT INTO schedules (owner_uid, name, semester, sections, time_mask) VALUES ($1, $2, $3, $4, $5)"
+)
+EDIT_SCHEDULE = database.statement("edit_schedule", '''
+    UPDATE schedules SET name = $1, semester = $2, sections = COALESCE($5, sections),
+        time_mask = COALESCE($6, time_mask)
+    WHERE id = $3 AND owner_uid = $4
+''')
+DELETE_SCHEDULE = database.statement("delete_schedule", "DELETE FROM schedules WHERE id = $1 AND owner_uid = $2")
+# The time mask is only for comparing schedules (see semester_scheduling/friend_overlap.py)
+GET_SCHEDULE_BY_UID = database.statement(
+    "get_schedule_by_uid", "SELECT id, owner_uid, semester, name, date, sections FROM schedules WHERE owner_uid = $1"
+)
+
+def get_sections_columns(sections: list[ScheduleSection]):
+    """
+    The sections and week time mask (see data_templates/time_slots.py) columns of a schedule. The mask is computed
+    once here so comparing schedules never has to look at their meeting times again.
+    """
+    mask = 0
+    for section in sections:
+        mask |= week_mask(section.times)
+
+    return json.dumps([section.model_dump() for section in sections]), mask_to_bytes(mask)
 
 async def insert_schedule(schedule: ScheduleCreate, uid: str):
-    query = "INSERT INTO schedules (owner_uid, name, semester) VALUES ($1, $2, $3)"
-    async with database.pool.acquire() as connection:
-        await connection.execute(query, uid, schedule.name, schedule.semester)
+    async with database.acquire() as connection:
+        await connection.execute(INSERT_SCHEDULE, uid, schedule.name, schedule.semester, *get_sections_columns(schedule.sections))
 
 async def edit_schedule(schedule: ScheduleEdit, uid: str):
-    query = "UPDATE schedules SET name = $1, semester = $2 WHERE id = $3 AND owner_uid = $4"
-    async with database.pool.acquire() as connection:
-        await connection.execute(query, schedule.name, schedule.semester, schedule.id, uid)
+    sections, time_mask = get_sections_columns(schedule.sections) if schedule.sections is not None else (None, None)
+    async with database.acquire() as connection:
+        await connection.execute(EDIT_SCHEDULE, schedule.name, schedule.semester, schedule.id, uid, sections, time_mask)
 
 async def delete_schedule(schedule: ScheduleDelete, uid: str):
-    query = "DELETE FROM schedules WHERE id = $1 AND owner_uid = $2"
-    async with database.pool.acquire() as connection:
-        await connection.execute(query, schedule.id, uid)
+    async with database.acquire() as connection:
+        await connection.execute(DELETE_SCHEDULE, schedule.id, uid)
 
 async def get_schedule_by_uid(user_id: str):
-    query = "SELECT * FROM schedules WHERE owner_uid = $1"
-    async with database.pool.acquire() as connection:
-        return await connection.fetch(query, user_id)
+    async with database.acquire() as connection:
+        return await connection.fetch(GET_SCHEDULE_BY_UID, user_id)
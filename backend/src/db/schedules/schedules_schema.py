@@ -1,15 +1,22 @@
 from pydantic import BaseModel
 
+class ScheduleSection(BaseModel):
+    code: str
+    unique_id: str  # class number of the section
+    times: list[dict[str, list[str]]] = []  # like SemesterCourse.times
+
 class ScheduleBase(BaseModel):
     id: str
 
 class ScheduleCreate(BaseModel):
     name: str
     semester: str
+    sections: list[ScheduleSection] = []
 
 class ScheduleEdit(ScheduleBase):
     name: str
     semester: str
+    sections: list[ScheduleSection] | None = None  # None keeps the saved sections
 
 class ScheduleDelete(ScheduleBase):
-    pass
\ No newline at end of file
+    pass
@@ -1,20 +1,75 @@
 from src.db.postgres import database
 
+INSERT_FRIENDSHIP = database.statement("insert_friendship", '''
+    INSERT INTO friendships (user_id, friend_id)
+    VALUES ($1, $2)
+    ON CONFLICT DO NOTHING;
+''')
+LIST_FRIENDSHIPS = database.statement("list_friendships", "SELECT friend_id FROM friendships WHERE user_id = $1")
+IS_FRIEND = database.statement("is_friend", "SELECT EXISTS (SELECT 1 FROM friendships WHERE user_id = $1 AND friend_id = $2)")
+LIST_FRIEND_PROFILES = database.statement("list_friend_profiles", '''
+    SELECT users.uid, users.name, users.username, users.email, summary.schedule_count,
+           latest.id AS schedule_id, latest.name AS schedule_name, latest.semester, latest.date
+    FROM friendships
+    JOIN users ON users.uid = friendships.friend_id
+    CROSS JOIN LATERAL (
+        SELECT count(*) AS schedule_count FROM schedules
+        WHERE owner_uid = users.uid AND ($2::text IS NULL OR semester = $2)
+    ) summary
+    LEFT JOIN LATERAL (
+        SELECT id, name, semester, date FROM schedules
+        WHERE owner_uid = users.uid AND ($2::text IS NULL OR semester = $2)
+        ORDER BY date DESC, id LIMIT 1
+    ) latest ON true
+    WHERE friendships.user_id = $1
+    ORDER BY users.name, users.uid
+''')
+GET_USER_BY_UID = database.statement("get_user_by_uid", "SELECT uid, email FROM users WHERE uid = $1")
+GET_FRIEND_SCHEDULES = database.statement("get_friend_schedules", '''
+    SELECT people.uid, schedules.id, schedules.sections, schedules.time_mask
+    FROM (
+        SELECT $1::text AS uid, 0 AS position
+        UNION ALL
+        SELECT friend_id, 1 FROM friendships
+        WHERE user_id = $1 AND ($2::text[] IS NULL OR friend_id = ANY($2))
+    ) people
+    LEFT JOIN LATERAL (
+        SELECT id, sections, time_mask FROM schedules
+        WHERE owner_uid = people.uid AND semester = $3
+        ORDER BY date DESC, id LIMIT 1
+    ) schedules ON true
+    ORDER BY people.position, people.uid
+''')
+
 async def insert_friendship(user_id: str, friend_id: str):
-    query = """
-        INSERT INTO friendships (user_id, friend_id)
-        VALUES ($1, $2)
-        ON CONFLICT DO NOTHING;
-    """
-    async with database.pool.acquire() as connection:
-        await connection.execute(query, user_id, friend_id)
+    async with database.acquire() as connection:
+        await connection.execute(INSERT_FRIENDSHIP, user_id, friend_id)
 
 async def list_friendships(user_id: str):
-    query = "SELECT friend_id FROM friendships WHERE user_id = $1"
-    async with database.pool.acquire() as connection:
-        return await connection.fetch(query, user_id)
+    async with database.acquire() as connection:
+        return await connection.fetch(LIST_FRIENDSHIPS, user_id)
+
+async def is_friend(user_id: str, friend_id: str) -> bool:
+    async with database.acquire() as connection:
+        return await connection.fetchval(IS_FRIEND, user_id, friend_id)
+
+async def list_friend_profiles(user_id: str, semester: str | None = None):
+    """
+    The user's friends with their profiles and a summary of their schedules (how many they have and their latest,
+    of the semester if given), in one round trip.
+    """
+    async with database.acquire() as connection:
+        return await connection.fetch(LIST_FRIEND_PROFILES, user_id, semester)
 
 async def get_user_by_uid(uid: str):
-    query = "SELECT uid, email FROM users WHERE uid = $1"
-    async with database.pool.acquire() as connection:
-        return await connection.fetchrow(query, uid)
+    async with database.acquire() as connection:
+        return await connection.fetchrow(GET_USER_BY_UID, uid)
+
+async def get_friend_schedules(user_id: str, friend_ids: list[str] | None, semester: str):
+    """
+    The user and their friends (only friend_ids if given), each with their latest schedule of the semester (null
+    columns if they have none), in one round trip. Uids that aren't the user's friends don't come back, so the same
+    query checks the friendships. The user is always the first row.
+    """
+    async with database.acquire() as connection:
+        return await connection.fetch(GET_FRIEND_SCHEDULES, user_id, friend_ids, semester)
@@ -3,7 +3,8 @@ from src.db.postgres import database
 
 # TODO: in production, use an ORM instead of raw queries like these for security purposes?
 
+INSERT_USER = database.statement("insert_user", "INSERT INTO users (uid, name, email, username) VALUES ($1, $2, $3, $4)")
+
 async def insert_user(user: User):
-    query = "INSERT INTO users (uid, name, email, username) VALUES ($1, $2, $3, $4)"
-    async with database.pool.acquire() as connection:
-        await connection.execute(query, user.uid, user.name, user.email, user.username)
\ No newline at end of file
+    async with database.acquire() as connection:
+        await connection.execute(INSERT_USER, user.uid, user.name, user.email, user.username)
@@ -0,0 +1,21 @@
+"""Version of the catalog in Postgres.
+
+database_interface.create_db records a row in CatalogLoads after every load,
+so the ID of the last one changes whenever the catalog may have. Indexes
+built from the catalog (see degree_audit and prerequisite_graph) are kept
+per app worker and rebuilt when it does, with one index lookup per request
+to find out.
+"""
+import asyncpg
+
+CATALOG_VERSION_QUERY = "SELECT max(id) FROM CatalogLoads"
+
+
+async def get_catalog_version(connection):
+    """ID of the last catalog load, 0 if none was recorded (e.g., the
+    catalog was loaded before loads were recorded).
+    """
+    try:
+        return await connection.fetchval(CATALOG_VERSION_QUERY) or 0
+    except asyncpg.UndefinedTableError:
+        return 0
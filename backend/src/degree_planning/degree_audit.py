@@ -0,0 +1,242 @@
+import re
+from degree_planning.catalog_version import get_catalog_version
+
+PROGRAM_REQUIREMENTS_QUERY = '''
+    SELECT 'major' AS kind, name, credit, required_courses FROM Majors
+    UNION ALL
+    SELECT 'minor', name, credit, required_courses FROM Minors
+    UNION ALL
+    SELECT 'certificate', name, credit, required_courses FROM Certificates
+'''
+
+
+def normalize_code(code):
+    """ "mac2311" or "MAC 2311" -> "MAC 2311", None if it isn't a code. The
+    scraped required courses have no space in them.
+    """
+    match = re.fullmatch(r"\s*([A-Za-z]{3})\s*(\d{4}[A-Za-z]?)\s*", code or "")
+
+    return f"{match.group(1)} {match.group(2)}".upper() if match else None
+
+
+class ProgramRequirements:
+    """A program's requirements as bitsets over an AuditIndex's codes.
+
+    required_bits has a bit per course that has to be taken. Each choice
+    group is (option bitsets, count): count of its options have to be
+    completed, an option being all of its courses (e.g., a course and its
+    lab). Groups come from the "Select one" items of majors' model plans, so
+    the alternatives they list aren't all required.
+    """
+
+    def __init__(self, program_id, kind, name, credit, required_bits,
+                 choice_groups):
+        self.program_id = program_id
+        self.kind = kind  # major, minor or certificate
+        self.name = name
+        self.credit = credit
+        self.required_bits = required_bits
+        self.required_count = required_bits.bit_count()
+        self.choice_groups = choice_groups
+        self.requirement_count = self.required_count + sum(
+            count for _, count in choice_groups)
+
+
+def satisfied_options(option_bits, completed_bits):
+    return sum(1 for bits in option_bits if bits & completed_bits == bits)
+
+
+class AuditIndex:
+    """Every program's requirements, indexed for auditing a transcript
+    against all of them at once.
+
+    Course codes get bit positions, so a transcript is one int and a
+    program's progress is a few AND and popcount operations. programs_of
+    maps a bit to the bitset of the programs requiring that course, so a
+    what-if over every program only audits the ones a transcript has
+    anything in common with.
+    """
+
+    def __init__(self, programs, model_plans=None):
+        """programs are (kind, name, credit, required course codes) tuples,
+        model_plans a ModelPlansSnapshot (see model_plans_snapshot) to take
+        majors' choice groups from.
+        """
+        self.bits = {}  # course code -> bit position
+        self.codes = []  # bit position -> course code
+        self.programs = []
+        programs_of = []
+
+        for kind, name, credit, required_courses in programs:
+            program_id = len(self.programs)
+            required_bits = self.bits_of(required_courses, add=True)
+            choice_groups = []
+            plan = model_plans.get(name) if kind == "major" and \
+                model_plans is not None and name in model_plans else []
+
+            for items in plan:
+                for item in items:
+                    option_bits = [self.bits_of(option, add=True)
+                                   for option in item.options]
+                    if item.flexible or len(option_bits) < 2:
+                        # A single course the plan has is required
+                        if not item.flexible and option_bits:
+                            required_bits |= option_bits[0]
+                        continue
+                    choice_groups.append((option_bits, min(
+                        item.count, len(option_bits))))
+
+            # A course that's one of the options of a choice isn't required
+            for option_bits, _ in choice_groups:
+                for bits in option_bits:
+                    required_bits &= ~bits
+
+            self.programs.append(ProgramRequirements(
+                program_id, kind, name, credit, required_bits,
+                choice_groups))
+
+            program_bit = 1 << program_id
+            requirement_bits = required_bits
+            for option_bits, _ in choice_groups:
+                for bits in option_bits:
+                    requirement_bits |= bits
+            while requirement_bits:
+                lowest_bit = requirement_bits & -requirement_bits
+                position = lowest_bit.bit_length() - 1
+                programs_of.extend([0] * (position + 1 - len(programs_of)))
+                programs_of[position] |= program_bit
+                requirement_bits ^= lowest_bit
+
+        programs_of.extend([0] * (len(self.codes) - len(programs_of)))
+        self.programs_of = programs_of  # bit position -> program bitset
+
+    def bits_of(self, codes, add=False):
+        """Bitset of course codes, codes that aren't in the index are
+        ignored unless add is set.
+        """
+        bits = 0
+
+        for code in codes or []:
+            code = normalize_code(code)
+            if code is None:
+                continue
+            if code not in self.bits:
+                if not add:
+                    continue
+                self.bits[code] = len(self.codes)
+                self.codes.append(code)
+            bits |= 1 << self.bits[code]
+
+        return bits
+
+    def codes_of(self, bits):
+        codes = []
+
+        while bits:
+            lowest_bit = bits & -bits
+            codes.append(self.codes[lowest_bit.bit_length() - 1])
+            bits ^= lowest_bit
+
+        return codes
+
+    def find_programs(self, names, kind=None):
+        return [program for program in self.programs
+                if program.name in names and kind in (None, program.kind)]
+
+    def get_progress(self, program, completed_bits):
+        """(completed requirements, total requirements) of a program."""
+        completed = (program.required_bits & completed_bits).bit_count()
+
+        for option_bits, count in program.choice_groups:
+            completed += min(satisfied_options(option_bits, completed_bits),
+                             count)
+
+        return completed, program.requirement_count
+
+    def audit(self, program, completed_bits):
+        """A program's progress, what's completed and what's left."""
+        completed, total = self.get_progress(program, completed_bits)
+        choices = []
+
+        for option_bits, count in program.choice_groups:
+            satisfied = satisfied_options(option_bits, completed_bits)
+            choices.append({
+                "options": [self.codes_of(bits) for bits in option_bits],
+                "count": count,
+                "satisfied": satisfied >= count
+            })
+
+        return {
+            "kind": program.kind,
+            "name": program.name,
+            "credit": program.credit,
+            "completed": completed,
+            "total": total,
+            "progress": completed / total if total else 0.0,
+            "completed_courses": self.codes_of(
+                program.required_bits & completed_bits),
+            "remaining_courses": self.codes_of(
+                program.required_bits & ~completed_bits),
+            "choices": choices
+        }
+
+    def what_if(self, completed_bits, kind=None, limit=None):
+        """Progress towards every program (of a kind), most completed first.
+
+        Only programs sharing a course with the transcript are audited, the
+        rest haven't been started.
+        """
+        touched = 0
+        remaining_bits = completed_bits
+        while remaining_bits:
+            lowest_bit = remaining_bits & -remaining_bits
+            touched |= self.programs_of[lowest_bit.bit_length() - 1]
+            remaining_bits ^= lowest_bit
+
+        results = []
+        for program in self.programs:
+            if kind not in (None, program.kind):
+                continue
+            if touched >> program.program_id & 1:
+                completed, total = self.get_progress(program, completed_bits)
+            else:
+                completed, total = 0, program.requirement_count
+            results.append({
+                "kind": program.kind,
+                "name": program.name,
+                "completed": completed,
+                "total": total,
+                "progress": completed / total if total else 0.0,
+                "remaining": total - completed
+            })
+
+        results.sort(key=lambda result: (-result["progress"],
+                                         result["remaining"], result["name"]))
+
+        return results[:limit] if limit is not None else results
+
+
+async def load_audit_index(connection, model_plans=None):
+    rows = await connection.fetch(PROGRAM_REQUIREMENTS_QUERY)
+
+    return AuditIndex([(row["kind"], row["name"], row["credit"],
+                        row["required_courses"]) for row in rows],
+                      model_plans)
+
+
+audit_index = None  # loaded on first use, shared by every request
+audit_index_version = None  # catalog version audit_index was loaded from
+
+
+async def get_audit_index(connection, model_plans=None):
+    """The programs' index, loaded once per app worker and again after
+    every catalog load (see catalog_version).
+    """
+    global audit_index, audit_index_version
+
+    version = await get_catalog_version(connection)
+    if audit_index is None or version != audit_index_version:
+        audit_index = await load_audit_index(connection, model_plans)
+        audit_index_version = version
+
+    return audit_index
@@ -0,0 +1,408 @@
+from degree_planning.prerequisite_graph import DEFAULT_COURSE_CREDITS
+
+PLAN_SEMESTERS = 8
+MAX_SEMESTER_CREDITS = 18
+
+
+class InfeasiblePlanError(ValueError):
+    pass
+
+
+class PlanIssue:
+    """Something wrong with a semester of a plan.
+
+    kind is "prerequisite", "corequisite", "credits", "duplicate" (errors)
+    or "unknown_course" (a warning, the course isn't in the catalog so its
+    requisites can't be checked).
+    """
+
+    def __init__(self, kind, semester, message, code=None, missing=None):
+        self.kind = kind
+        self.semester = semester  # index of the semester in the plan
+        self.message = message
+        self.code = code
+        self.missing = missing or []  # groups of codes, one of each needed
+
+    def is_error(self):
+        return self.kind != "unknown_course"
+
+    def to_dict(self):
+        return {
+            "kind": self.kind,
+            "severity": "error" if self.is_error() else "warning",
+            "semester": self.semester,
+            "code": self.code,
+            "missing": self.missing,
+            "message": self.message
+        }
+
+
+def course_credits(graph, code):
+    return graph.credits[graph.ids[code]] if code in graph else \
+        DEFAULT_COURSE_CREDITS
+
+
+def validate_plan(graph, semesters, completed=(),
+                  max_credits=MAX_SEMESTER_CREDITS):
+    """Check a plan (a list of semesters, each a list of course codes)
+    against a PrerequisiteGraph, return the list of PlanIssues.
+
+    completed are the codes of courses taken before the plan starts. A
+    course's prerequisites have to be completed in an earlier semester, its
+    corequisites in an earlier semester or the same one. Each check is a
+    few bitset operations per course, so a whole plan is checked in well
+    under a millisecond.
+    """
+    issues = []
+    done_bits = graph.bits_of(completed)
+    seen = set(completed)
+
+    for index, codes in enumerate(semesters):
+        semester_bits = graph.bits_of(codes)
+        credits = 0
+
+        for code in codes:
+            if code in seen:
+                issues.append(PlanIssue(
+                    "duplicate", index, f"{code} is already in the plan",
+                    code))
+            seen.add(code)
+            credits += course_credits(graph, code)
+
+            if code not in graph:
+                issues.append(PlanIssue(
+                    "unknown_course", index,
+                    f"{code} isn't in the course catalog", code))
+                continue
+
+            course_id = graph.ids[code]
+            missing = [graph.codes_of(group_bits) for group_bits
+                       in graph.requirements[course_id]
+                       if not group_bits & done_bits]
+            if missing:
+                issues.append(PlanIssue(
+                    "prerequisite", index,
+                    f"{code} needs {describe_groups(missing)} in an earlier "
+                    f"semester", code, missing))
+
+            missing = [graph.codes_of(group_bits) for group_bits
+                       in graph.corequisites[course_id]
+                       if not group_bits & (done_bits | semester_bits)]
+            if missing:
+                issues.append(PlanIssue(
+                    "corequisite", index,
+                    f"{code} needs {describe_groups(missing)} in this or an "
+                    f"earlier semester", code, missing))
+
+        if credits > max_credits:
+            issues.append(PlanIssue(
+                "credits", index,
+                f"{credits} credits is more than the {max_credits} allowed"))
+
+        done_bits |= semester_bits
+
+    return issues
+
+
+def describe_groups(groups):
+    return " and ".join(" or ".join(group) for group in groups)
+
+
+class PlanUnit:
+    """What one semester slot of a generated plan holds: the courses chosen
+    for a model plan item, taken together (e.g., a course and its lab), or
+    a flexible slot like an elective.
+    """
+
+    def __init__(self, item, codes, credits):
+        self.item = item
+        self.codes = codes  # () for a flexible slot
+        self.credits = credits
+        self.target = item.semester  # semester of the item in the model plan
+        self.prereq_groups = []  # tuples of unit indexes, one of each first
+        self.coreq_groups = []  # same, can also be in the same semester
+        self.dependents = set()  # indexes of units with this one in a group
+        self.earliest = 0  # domain of the unit's semester
+        self.latest = 0
+        self.semester = None  # once it's placed
+
+    def to_dict(self):
+        return {
+            "text": self.item.text,
+            "codes": list(self.codes),
+            "credits": self.credits,
+            "critical_tracking": self.item.critical_tracking
+        }
+
+
+class GeneratedPlan:
+    def __init__(self, semesters, assumed):
+        self.semesters = semesters  # list of lists of PlanUnits
+        self.assumed = assumed  # code -> requisite groups outside the plan
+
+    def codes(self):
+        """The plan as a list of semesters of course codes (validate_plan's
+        input).
+        """
+        return [[code for unit in units for code in unit.codes]
+                for units in self.semesters]
+
+    def to_dict(self):
+        return {
+            "semesters": [{
+                "courses": [unit.to_dict() for unit in units],
+                "credits": sum(unit.credits for unit in units)
+            } for units in self.semesters],
+            "assumed_prerequisites": self.assumed
+        }
+
+
+def choose_option(graph, options, completed, completed_bits):
+    """The option that needs the fewest courses not completed yet, None if
+    an option is completed already.
+    """
+    best_option = None
+    best_cost = None
+
+    for option in options:
+        if all(code in completed for code in option):
+            return None
+
+        needed_bits = graph.bits_of(option)
+        for code in option:
+            if code in graph:
+                needed_bits |= graph.ancestors[graph.ids[code]]
+        cost = (needed_bits & ~completed_bits).bit_count()
+
+        if best_cost is None or cost < best_cost:
+            best_option, best_cost = option, cost
+
+    return best_option
+
+
+def get_plan_units(graph, model_plan, completed, completed_bits):
+    units = []
+    planned = set(completed)
+
+    for items in model_plan:
+        for item in items:
+            credits = None if item.credits is None else \
+                round(item.credits / item.count)
+
+            if not item.options:
+                units.append(PlanUnit(item, (), DEFAULT_COURSE_CREDITS
+                                      if credits is None else credits))
+                continue
+
+            options = list(item.options)
+            for _ in range(item.count):
+                option = choose_option(graph, options, completed,
+                                       completed_bits)
+                if option is None or not options:
+                    continue  # completed already
+                options.remove(option)
+                codes = tuple(code for code in option if code not in planned)
+                if not codes:
+                    continue  # already planned by another item
+                planned.update(codes)
+                units.append(PlanUnit(item, codes, credits if (
+                    credits is not None and len(codes) == len(option)) else
+                    sum(course_credits(graph, code) for code in codes)))
+
+    return units
+
+
+def link_plan_units(graph, units, completed_bits):
+    """Turn the units' courses' requisites into groups of other units.
+
+    Groups with a completed course are satisfied and dropped. Groups with no
+    course in the plan are prerequisites the model plan expects from
+    somewhere else (e.g., placement tests or AP credit), they're returned as
+    code -> groups instead of constraining the plan.
+    """
+    unit_of = {}  # course ID -> index of the unit it's in
+    for index, unit in enumerate(units):
+        for code in unit.codes:
+            if code in graph:
+                unit_of[graph.ids[code]] = index
+    planned_bits = sum(1 << course_id for course_id in unit_of)
+    assumed = {}
+
+    for index, unit in enumerate(units):
+        for code in unit.codes:
+            if code not in graph:
+                continue
+            course_id = graph.ids[code]
+            requisites = ((graph.requirements[course_id], unit.prereq_groups),
+                          (graph.corequisites[course_id], unit.coreq_groups))
+
+            for groups, unit_groups in requisites:
+                for group_bits in groups:
+                    if group_bits & completed_bits:
+                        continue
+                    if not group_bits & planned_bits:
+                        assumed.setdefault(code, []).append(
+                            graph.codes_of(group_bits))
+                        continue
+                    group = tuple(sorted({
+                        unit_of[course_id] for course_id in
+                        graph.ids_of(group_bits & planned_bits)}))
+                    if index in group:
+                        continue  # taken together, e.g., a course and its lab
+                    unit_groups.append(group)
+                    for other_index in group:
+                        units[other_index].dependents.add(index)
+
+    return assumed
+
+
+def propagate_earliest(units, indexes, semesters):
+    """Raise the earliest semester of the units depending on indexes until
+    every prerequisite group can come first, InfeasiblePlanError if a
+    unit's domain becomes empty.
+    """
+    queue = list(indexes)
+
+    while queue:
+        for dependent_index in units[queue.pop()].dependents:
+            dependent = units[dependent_index]
+            earliest = max(
+                [min(units[i].earliest + 1 for i in group)
+                 for group in dependent.prereq_groups] +
+                [min(units[i].earliest for i in group)
+                 for group in dependent.coreq_groups] + [dependent.earliest])
+
+            if earliest > dependent.earliest:
+                dependent.earliest = earliest
+                if earliest > dependent.latest or earliest >= semesters:
+                    raise InfeasiblePlanError(
+                        f"{', '.join(dependent.codes)} can't be taken by "
+                        f"semester {min(dependent.latest, semesters - 1) + 1}"
+                        f" after its prerequisites")
+                queue.append(dependent_index)
+
+
+def propagate_latest(units, semesters):
+    # A unit that's the only planned way to satisfy a group of another unit
+    # has to come before it
+    for unit in units:
+        unit.latest = semesters - 1
+
+    changed = True
+    while changed:
+        changed = False
+        for unit in units:
+            for groups, gap in ((unit.prereq_groups, 1),
+                                (unit.coreq_groups, 0)):
+                for group in groups:
+                    if len(group) == 1 and \
+                            units[group[0]].latest > unit.latest - gap:
+                        units[group[0]].latest = unit.latest - gap
+                        changed = True
+                        if units[group[0]].latest < 0:
+                            raise InfeasiblePlanError(
+                                f"{', '.join(units[group[0]].codes)} has "
+                                f"too many courses depending on it for "
+                                f"{semesters} semesters")
+
+
+def is_ready(unit, units, semester):
+    placed_before = all(any(
+        units[i].semester is not None and units[i].semester < semester
+        for i in group) for group in unit.prereq_groups)
+    placed_with = all(any(
+        units[i].semester is not None and units[i].semester <= semester
+        for i in group) for group in unit.coreq_groups)
+
+    return placed_before and placed_with
+
+
+def generate_plan(graph, model_plan, completed=(), semesters=PLAN_SEMESTERS,
+                  max_credits=MAX_SEMESTER_CREDITS):
+    """Fit a model plan (see model_plans.parse_model_plan) into semesters
+    for a student who completed some courses already.
+
+    Instead of searching placements, every unit of the plan gets a domain of
+    semesters it can go in: the earliest comes from propagating its
+    prerequisites forward, the latest from propagating the units that can
+    only be unlocked by it backward. Semesters are then filled in order,
+    most constrained units first (smallest latest, then the semester the
+    model plan has them in), and a unit that doesn't fit pushes the
+    earliest semester of everything depending on it further back, so an
+    infeasible plan is found as soon as a domain is empty instead of after
+    trying every placement. Flexible slots (electives, gen eds) fill
+    what's left, near their model semester.
+    """
+    completed = set(completed)
+    completed_bits = graph.bits_of(completed)
+    units = get_plan_units(graph, model_plan, completed, completed_bits)
+    assumed = link_plan_units(graph, units, completed_bits)
+    total_credits = sum(unit.credits for unit in units)
+
+    if total_credits > semesters * max_credits:
+        raise InfeasiblePlanError(
+            f"{total_credits} credits don't fit in {semesters} semesters of "
+            f"{max_credits} credits")
+
+    propagate_latest(units, semesters)
+    propagate_earliest(units, range(len(units)), semesters)
+    plan = [[] for _ in range(semesters)]
+    remaining_credits = total_credits
+
+    for semester in range(semesters):
+        credits = 0
+        # Units due later are pulled into this semester while it has less
+        # than an even share of what's left, so the last semesters aren't
+        # left with more than fits in them
+        required_credits = remaining_credits / (semesters - semester)
+        candidates = sorted(
+            (index for index, unit in enumerate(units)
+             if unit.semester is None and unit.earliest <= semester),
+            key=lambda index: (units[index].latest, units[index].target,
+                               index))
+
+        # The units due by this semester go first, then later ones are
+        # pulled in by their model semester. Corequisites placed this
+        # semester can make more units ready, so candidates are gone over
+        # until nothing else is placed.
+        for pull_ahead in (False, True):
+            if pull_ahead:
+                candidates.sort(key=lambda index: (units[index].target,
+                                                   units[index].latest, index))
+            placed = True
+            while placed:
+                placed = False
+                for index in candidates:
+                    unit = units[index]
+                    if unit.semester is not None:
+                        continue
+                    due = credits < required_credits if pull_ahead else \
+                        unit.latest <= semester or unit.target <= semester
+                    if due and credits + unit.credits <= max_credits and \
+                            is_ready(unit, units, semester):
+                        unit.semester = semester
+                        credits += unit.credits
+                        plan[semester].append(unit)
+                        placed = True
+
+        deferred = []
+        for index in candidates:
+            unit = units[index]
+            if unit.semester is not None:
+                continue
+            if unit.latest <= semester:
+                raise InfeasiblePlanError(
+                    f"{', '.join(unit.codes) or unit.item.text} doesn't fit "
+                    f"in semester {semester + 1} with {max_credits} credits")
+            unit.earliest = semester + 1
+            deferred.append(index)
+
+        propagate_earliest(units, deferred, semesters)
+        remaining_credits -= credits
+
+    if remaining_credits:
+        unplaced = [unit.item.text for unit in units if unit.semester is None]
+        raise InfeasiblePlanError(
+            f"{', '.join(unplaced)} don't fit in {semesters} semesters")
+
+    return GeneratedPlan(plan, assumed)
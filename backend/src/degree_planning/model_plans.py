@@ -0,0 +1,164 @@
+import json
+import re
+from pathlib import Path
+
+MODEL_PLANS_DIRECTORY = Path(__file__).resolve().parents[2] / "data"
+
+CODE_PATTERN = r"[A-Z]{3} ?\d{4}[A-Z]?"
+# "BSC 2005 & 2005L": courses taken together, later ones may leave out the
+# prefix of the first
+COURSE_SET_PATTERN = re.compile(
+    rf"^({CODE_PATTERN})((?:\s*&\s*(?:{CODE_PATTERN}|\d{{4}}[A-Z]?))*)$")
+CRITICAL_TRACKING_PATTERN = re.compile(r"\s*\(CT\)")
+CREDITS_PATTERN = re.compile(r"\s*\((\d+) credits?\)?", flags=re.IGNORECASE)
+# "Select one: X OR Y", "MCB 4203orPCB 4233" and "ENV 4892 or EGN 4951"
+ALTERNATIVES_PATTERN = re.compile(
+    rf"\s+OR\s+|(?<=[0-9A-Z])or(?={CODE_PATTERN})|\s+or\s+(?={CODE_PATTERN})")
+# "Select two: (6 credits)" with the courses to select from on the next lines
+SELECT_HEADER_PATTERN = re.compile(r"^Select (one|two|three)\b")
+SELECT_COUNTS = {"one": 1, "two": 2, "three": 3}
+
+
+def format_code(code):
+    # "ART2825C" -> "ART 2825C"
+    return f"{code[:3]} {code[3:].strip()}"
+
+
+def parse_course_set(text):
+    """Codes of "MAC 2311" or "BSC 2005 & 2005L", None if text is anything
+    else (e.g., "Elective").
+    """
+    match = COURSE_SET_PATTERN.match(text.strip())
+
+    if not match:
+        return None
+
+    first_code = format_code(match.group(1))
+    codes = [first_code]
+    for code in re.split(r"\s*&\s*", match.group(2))[1:]:
+        codes.append(format_code(code) if code[0].isalpha() else
+                     f"{first_code[:3]} {code}")
+
+    return tuple(dict.fromkeys(codes))
+
+
+class PlanItem:
+    """One line of a model semester plan.
+
+    options are the ways of satisfying it, each a tuple of course codes that
+    are all taken (usually one), and count of them are taken. An item with
+    no options, or that is flexible, can also be satisfied by a course of
+    the student's choice (e.g., "Elective (3 credits)" or "Select one: POS
+    4934 OR Elective").
+    """
+
+    def __init__(self, text, semester, options, flexible, credits,
+                 critical_tracking, count=1):
+        self.text = text  # as written in the plan
+        self.semester = semester  # index of its semester in the model plan
+        self.options = options
+        self.flexible = flexible
+        self.credits = credits  # of all count options, None if the plan
+        # doesn't say
+        self.critical_tracking = critical_tracking  # marked "(CT)"
+        self.count = count
+
+    def is_course(self):
+        return bool(self.options) and not self.flexible
+
+    def to_dict(self):
+        return {
+            "text": self.text,
+            "semester": self.semester,
+            "options": [list(option) for option in self.options],
+            "flexible": self.flexible,
+            "credits": self.credits,
+            "critical_tracking": self.critical_tracking,
+            "count": self.count
+        }
+
+
+def parse_plan_item(text, semester):
+    """Parse a model plan line, e.g., "MAC 2311 (CT)", "BSC 2005 & 2005L",
+    "Select one: PHY 2048 & 2048L OR PHY 2053 & 2053L (CT)" or "Elective
+    (3 credits)".
+    """
+    critical_tracking = bool(CRITICAL_TRACKING_PATTERN.search(text))
+    credits_match = CREDITS_PATTERN.search(text)
+    credits = int(credits_match.group(1)) if credits_match else None
+    requirement = CREDITS_PATTERN.sub("", CRITICAL_TRACKING_PATTERN.sub(
+        "", text)).strip()
+    requirement = re.sub(r"^Select one:\s*", "", requirement)
+    options = []
+    flexible = False
+
+    for alternative in ALTERNATIVES_PATTERN.split(requirement):
+        codes = parse_course_set(alternative)
+        if codes is None:
+            flexible = True
+        else:
+            options.append(codes)
+
+    return PlanItem(text, semester, options, flexible or not options,
+                    credits, critical_tracking)
+
+
+def parse_semester(texts, semester):
+    """PlanItems of a semester's lines. A "Select one ...:" line without
+    courses of its own is followed by the lines of the courses to select
+    from, they're made its options.
+    """
+    items = []
+    header = None  # the "Select" line the courses are being added to
+
+    for text in texts:
+        item = parse_plan_item(text, semester)
+
+        if header is not None and item.is_course():
+            header.options.extend(item.options)
+            header.flexible = False
+            header.critical_tracking |= item.critical_tracking
+            continue
+
+        header = None
+        header_match = SELECT_HEADER_PATTERN.match(text)
+        if header_match and not item.options:
+            # A header without courses after it (e.g., "Select one elective
+            # (3 credits)") stays flexible
+            header = item
+            item.count = SELECT_COUNTS[header_match.group(1)]
+        items.append(item)
+
+    return items
+
+
+def parse_model_plan(plan_dict):
+    """List of semesters, each a list of PlanItems, of a plan JSON's dict
+    ("Semester 1" -> list of lines).
+    """
+    semesters = sorted(plan_dict, key=lambda name: int(re.sub(
+        r"\D", "", name) or 0))
+
+    return [parse_semester(plan_dict[name], index)
+            for index, name in enumerate(semesters)]
+
+
+def model_plan_name(program):
+    """Name of a major's model plan, its file name without .json (see
+    save_courses_to_json).
+    """
+    return re.sub(r'[\\/*?:"<>|]', "_", program)
+
+
+def load_model_plan(program, directory=MODEL_PLANS_DIRECTORY):
+    """Parsed model plan of a major, FileNotFoundError if there's none."""
+    file_name = model_plan_name(program) + ".json"
+
+    with open(Path(directory) / file_name, encoding="utf-8") as f:
+        return parse_model_plan(json.load(f))
+
+
+def load_model_plans(directory=MODEL_PLANS_DIRECTORY):
+    """Program name -> parsed model plan, for every plan in directory."""
+    return {path.stem: load_model_plan(path.stem, directory)
+            for path in sorted(Path(directory).glob("*.json"))}
@@ -0,0 +1,290 @@
+"""Compile the model semester plans in backend/data into one binary snapshot.
+
+The plans are parsed once (see model_plans) and written as flat arrays of
+integers plus a string table, which the app memory-maps at startup instead
+of opening and parsing every JSON file. Run it from the src directory:
+    python -m degree_planning.model_plans_snapshot
+The app also rebuilds the snapshot by itself when it's missing, was written
+by another version of this module or the JSON files changed.
+"""
+import argparse
+import hashlib
+import mmap
+import os
+import struct
+import threading
+import time
+from array import array
+from pathlib import Path
+from degree_planning.model_plans import MODEL_PLANS_DIRECTORY, PlanItem, \
+    load_model_plans, model_plan_name
+
+MODEL_PLANS_SNAPSHOT_PATH = Path(__file__).resolve().parents[2] / "cache" / \
+    "model_plans.snapshot"
+SNAPSHOT_MAGIC = b"TWPLANS\x00"
+# Bump when the layout or the parsing changes. It's written in native byte
+# order, so a snapshot from a machine with the other one doesn't match
+# either and is rebuilt.
+SNAPSHOT_VERSION = 1
+
+# Sections after the header, each a flat array of unsigned 32-bit ints
+# except the string bytes:
+#   string_offsets  string i is string_bytes[offsets[i]:offsets[i + 1]]
+#   string_bytes    UTF-8
+#   programs        name, first semester, semester count
+#   semesters       first item, item count
+#   items           text, flags, credits + 1 (0 if not given), first
+#                   option, option count, count
+#   options         first code, code count
+#   codes           course code
+# Names, texts and codes are string indexes.
+SECTIONS = ("string_offsets", "string_bytes", "programs", "semesters",
+            "items", "options", "codes")
+PROGRAM_FIELDS = 3
+SEMESTER_FIELDS = 2
+ITEM_FIELDS = 6
+OPTION_FIELDS = 2
+FLEXIBLE_FLAG = 1
+CRITICAL_TRACKING_FLAG = 2
+# Magic, version, fingerprint of the JSON files, then the byte offset and
+# length of every section
+HEADER = struct.Struct(f"=8sI32s{2 * len(SECTIONS)}I")
+
+
+def source_fingerprint(directory=MODEL_PLANS_DIRECTORY):
+    """Hash of the plan files' names, sizes and modification times, which
+    only takes a stat of each file to check.
+    """
+    fingerprint = hashlib.sha256()
+
+    for path in sorted(Path(directory).glob("*.json")):
+        stat = path.stat()
+        fingerprint.update(f"{path.name}\0{stat.st_size}\0"
+                           f"{stat.st_mtime_ns}\0".encode())
+
+    return fingerprint.digest()
+
+
+def build_snapshot(directory=MODEL_PLANS_DIRECTORY,
+                   path=MODEL_PLANS_SNAPSHOT_PATH):
+    """Parse every model plan and write the snapshot to path."""
+    fingerprint = source_fingerprint(directory)
+    plans = load_model_plans(directory)
+    string_ids = {}
+    string_bytes = bytearray()
+    string_offsets = array("I", [0])
+    sections = {name: array("I") for name in SECTIONS
+                if name not in ("string_offsets", "string_bytes")}
+
+    def string_id(text):
+        if text not in string_ids:
+            string_ids[text] = len(string_ids)
+            string_bytes.extend(text.encode())
+            string_offsets.append(len(string_bytes))
+
+        return string_ids[text]
+
+    for name, semesters in plans.items():
+        sections["programs"].extend((
+            string_id(name), len(sections["semesters"]) // SEMESTER_FIELDS,
+            len(semesters)))
+
+        for items in semesters:
+            sections["semesters"].extend((
+                len(sections["items"]) // ITEM_FIELDS, len(items)))
+
+            for item in items:
+                flags = (FLEXIBLE_FLAG if item.flexible else 0) | \
+                    (CRITICAL_TRACKING_FLAG if item.critical_tracking else 0)
+                sections["items"].extend((
+                    string_id(item.text), flags,
+                    0 if item.credits is None else item.credits + 1,
+                    len(sections["options"]) // OPTION_FIELDS,
+                    len(item.options), item.count))
+
+                for option in item.options:
+                    sections["options"].extend((len(sections["codes"]),
+                                                len(option)))
+                    sections["codes"].extend(string_id(code)
+                                             for code in option)
+
+    sections["string_offsets"] = string_offsets
+    sections["string_bytes"] = bytes(string_bytes)
+    layout = []
+    body = bytearray()
+
+    for name in SECTIONS:
+        data = sections[name]
+        body.extend(b"\0" * (-(HEADER.size + len(body)) % 4))  # align
+        layout.extend((HEADER.size + len(body), len(data)))
+        body.extend(data if isinstance(data, bytes) else data.tobytes())
+
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # Written next to it and renamed, so an app worker never maps half of it
+    temporary_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    temporary_path.write_bytes(HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION,
+                                           fingerprint, *layout) + body)
+    os.replace(temporary_path, path)
+
+    return len(plans)
+
+
+class ModelPlansSnapshot:
+    """Read-only, memory-mapped model plans.
+
+    The arrays are views of the mapped file, so loading only reads the
+    header and the program names. A plan's PlanItems are made the first time
+    it's asked for and kept, every later lookup is a dictionary hit.
+    """
+
+    def __init__(self, path=MODEL_PLANS_SNAPSHOT_PATH):
+        with open(path, "rb") as f:
+            self.mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, self.fingerprint, *layout = HEADER.unpack_from(
+            self.mmap)
+        if magic != SNAPSHOT_MAGIC or version != SNAPSHOT_VERSION:
+            self.mmap.close()
+            raise ValueError(f"{path} isn't a version {SNAPSHOT_VERSION} "
+                             f"model plans snapshot")
+
+        self.view = memoryview(self.mmap)
+        self.sections = {}
+        for index, name in enumerate(SECTIONS):
+            offset, length = layout[2 * index], layout[2 * index + 1]
+            if name == "string_bytes":
+                self.sections[name] = self.view[offset:offset + length]
+            else:
+                self.sections[name] = self.view[
+                    offset:offset + 4 * length].cast("I")
+
+        programs = self.sections["programs"]
+        self.program_ids = {  # program name -> index
+            self.get_string(programs[index * PROGRAM_FIELDS]): index
+            for index in range(len(programs) // PROGRAM_FIELDS)}
+        self.plans = {}  # program name -> parsed plan, once asked for
+        self.lock = threading.Lock()
+
+    def get_string(self, string_id):
+        offsets = self.sections["string_offsets"]
+
+        return bytes(self.sections["string_bytes"][
+            offsets[string_id]:offsets[string_id + 1]]).decode()
+
+    def get_item(self, item_index, semester):
+        (text, flags, credits, first_option, option_count,
+         count) = self.sections["items"][item_index * ITEM_FIELDS:
+                                         (item_index + 1) * ITEM_FIELDS]
+        options = []
+
+        for option_index in range(first_option, first_option + option_count):
+            first_code, code_count = self.sections["options"][
+                option_index * OPTION_FIELDS:
+                (option_index + 1) * OPTION_FIELDS]
+            options.append(tuple(
+                self.get_string(code_id) for code_id in
+                self.sections["codes"][first_code:first_code + code_count]))
+
+        return PlanItem(self.get_string(text), semester, options,
+                        bool(flags & FLEXIBLE_FLAG),
+                        credits - 1 if credits else None,
+                        bool(flags & CRITICAL_TRACKING_FLAG), count)
+
+    def get_plan(self, program_id):
+        _, first_semester, semester_count = self.sections["programs"][
+            program_id * PROGRAM_FIELDS:(program_id + 1) * PROGRAM_FIELDS]
+        plan = []
+
+        for semester in range(semester_count):
+            first_item, item_count = self.sections["semesters"][
+                (first_semester + semester) * SEMESTER_FIELDS:
+                (first_semester + semester + 1) * SEMESTER_FIELDS]
+            plan.append([self.get_item(item_index, semester) for item_index
+                         in range(first_item, first_item + item_count)])
+
+        return plan
+
+    def get(self, program):
+        """Parsed model plan of a major (see model_plans.parse_model_plan),
+        KeyError if there's none.
+        """
+        name = model_plan_name(program)
+        plan = self.plans.get(name)
+
+        if plan is None:
+            with self.lock:
+                plan = self.plans.get(name)
+                if plan is None:
+                    plan = self.plans[name] = self.get_plan(
+                        self.program_ids[name])
+
+        return plan
+
+    def __contains__(self, program):
+        return model_plan_name(program) in self.program_ids
+
+    def programs(self):
+        return list(self.program_ids)
+
+    def close(self):
+        for section in self.sections.values():
+            section.release()
+        self.view.release()
+        self.plans.clear()
+        self.mmap.close()
+
+
+def load_snapshot(directory=MODEL_PLANS_DIRECTORY,
+                  path=MODEL_PLANS_SNAPSHOT_PATH):
+    """Map the snapshot, building it first if it's missing or stale."""
+    fingerprint = source_fingerprint(directory)
+
+    try:
+        snapshot = ModelPlansSnapshot(path)
+        if snapshot.fingerprint == fingerprint:
+            return snapshot
+        snapshot.close()
+    except (OSError, ValueError, struct.error):
+        pass
+
+    build_snapshot(directory, path)
+
+    return ModelPlansSnapshot(path)
+
+
+model_plans_snapshot = None
+
+
+def get_model_plans_snapshot():
+    global model_plans_snapshot
+
+    if model_plans_snapshot is None:
+        model_plans_snapshot = load_snapshot()
+
+    return model_plans_snapshot
+
+
+def close_model_plans_snapshot():
+    global model_plans_snapshot
+
+    if model_plans_snapshot is not None:
+        model_plans_snapshot.close()
+        model_plans_snapshot = None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--data", default=MODEL_PLANS_DIRECTORY,
+                        help="directory of the model plan JSON files")
+    parser.add_argument("--output", default=MODEL_PLANS_SNAPSHOT_PATH)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    count = build_snapshot(args.data, args.output)
+    print(f"Compiled {count} model plans into {args.output} in "
+          f"{time.perf_counter() - start:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
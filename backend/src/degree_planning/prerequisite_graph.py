@@ -0,0 +1,373 @@
+import re
+from array import array
+from data_templates.course_template import Course
+from degree_planning.catalog_version import get_catalog_version
+
+DEFAULT_COURSE_CREDITS = 3  # for codes that aren't in the catalog
+
+COURSE_PREREQUISITES_QUERY = '''
+    SELECT code, credit, name, subject, prereq_description, coreq_description
+    FROM Courses ORDER BY code
+'''
+
+
+def parse_credits(credit):
+    """Credits of a course, the lowest for a range (e.g., "1-4" is 1)."""
+    match = re.search(r"\d+", str(credit or ""))
+
+    return int(match.group()) if match else DEFAULT_COURSE_CREDITS
+
+
+def split_top_level(text, separator_pattern):
+    """Split text at separator_pattern matches that aren't in parentheses."""
+    depth = 0
+    depths = []
+
+    for char in text:
+        if char == "(":
+            depth += 1
+        depths.append(depth)
+        if char == ")":
+            depth = max(depth - 1, 0)
+
+    parts = []
+    start = 0
+    for match in re.finditer(separator_pattern, text, flags=re.IGNORECASE):
+        if depths[match.start()] == 0:
+            parts.append(text[start:match.start()])
+            start = match.end()
+    parts.append(text[start:])
+
+    return parts
+
+
+def requirement_groups(course, description):
+    """Parse a requisite description into the groups of codes it requires.
+
+    Every group has to be satisfied and one course of a group satisfies it,
+    e.g., "MAC 2311 and (PHY 2048 or PHY 2049)" is [["MAC 2311"],
+    ["PHY 2048", "PHY 2049"]]. This is a heuristic over the catalog's
+    free-form text: clauses are split at a top-level "and" or ";", a clause
+    with an "or" in it is one group and otherwise its comma separated parts
+    are separate groups. "A/B" codes are alternatives.
+    """
+    groups = []
+
+    for clause in split_top_level(description or "", r"\band\b|;"):
+        if re.search(r"\bor\b", clause, flags=re.IGNORECASE):
+            parts = [clause]
+        else:
+            parts = split_top_level(clause, ",")
+
+        for part in parts:
+            codes = [code for code in course.get_requisite_codes(part)
+                     if code != "INVALID"]
+            if codes:
+                groups.append(list(dict.fromkeys(codes)))
+
+    return groups
+
+
+class PrerequisiteGraph:
+    """Prerequisite DAG of the course catalog.
+
+    Every course (and every code a prerequisite mentions, even if it isn't
+    in the catalog) gets an integer ID, its position in self.codes. Edges go
+    from a prerequisite to the course needing it and are stored as compact
+    arrays: the direct prerequisites of course i are
+    prereq_ids[prereq_offsets[i]:prereq_offsets[i + 1]], dependents the
+    same way. The transitive closure is precomputed as Python int bitsets
+    (bit j of ancestors[i] is set when course j is needed, directly or not,
+    before course i), so "is j needed before i" is one bit test and all
+    ancestors or descendants of a course are one int.
+
+    Corequisites aren't edges since they can be taken in the same semester,
+    they're only kept as groups like prerequisites (see is_coreq_satisfied).
+    Catalog mistakes can make cycles; their courses come last in the
+    topological order and their closure is still complete.
+    """
+
+    def __init__(self, courses):
+        self.codes = []  # course ID -> course code (e.g., MAC 2313)
+        self.ids = {}  # course code -> course ID
+        requirements_by_code = {}
+        coreqs_by_code = {}
+        credits_by_code = {}
+
+        for course in courses:
+            if course.code == "INVALID":
+                continue
+            self.get_or_add_id(course.code)
+            requirements_by_code[course.code] = requirement_groups(
+                course, course.prereq_description)
+            coreqs_by_code[course.code] = requirement_groups(
+                course, course.coreq_description)
+            credits_by_code[course.code] = parse_credits(course.credit)
+
+        self.requirements = [[] for _ in self.codes]  # course ID -> list of
+        # bitsets, one per group of prerequisites (see requirement_groups).
+        # A group is satisfied by any one of its courses, the course is
+        # unlocked once every group is
+        prereqs = [set() for _ in self.codes]
+
+        for code, groups in requirements_by_code.items():
+            course_id = self.ids[code]
+            for group in groups:
+                group_bits = 0
+                for prereq_code in group:
+                    prereq_id = self.get_or_add_id(prereq_code)
+                    if prereq_id == len(self.requirements):
+                        self.requirements.append([])
+                        prereqs.append(set())
+                    if prereq_id != course_id:
+                        group_bits |= 1 << prereq_id
+                        prereqs[course_id].add(prereq_id)
+                if group_bits:
+                    self.requirements[course_id].append(group_bits)
+
+        self.corequisites = [[] for _ in self.codes]  # course ID -> list of
+        # bitsets like requirements, of courses taken before or with it
+        for code, groups in coreqs_by_code.items():
+            course_id = self.ids[code]
+            for group in groups:
+                group_bits = self.bits_of(coreq_code for coreq_code in group
+                                          if coreq_code != code)
+                if group_bits:
+                    self.corequisites[course_id].append(group_bits)
+
+        self.credits = array("B", (  # course ID -> credits
+            min(credits_by_code.get(code, DEFAULT_COURSE_CREDITS), 255)
+            for code in self.codes))
+        dependents = [set() for _ in self.codes]
+        for course_id, prereq_set in enumerate(prereqs):
+            for prereq_id in prereq_set:
+                dependents[prereq_id].add(course_id)
+
+        self.prereq_offsets, self.prereq_ids = self.compact(prereqs)
+        self.dependent_offsets, self.dependent_ids = self.compact(dependents)
+        self.topological_order = self.get_topological_order()
+        self.ancestors = self.get_closure(self.direct_prereqs)
+        self.descendants = self.get_closure(self.direct_dependents)
+
+    def get_or_add_id(self, code):
+        if code not in self.ids:
+            self.ids[code] = len(self.codes)
+            self.codes.append(code)
+
+        return self.ids[code]
+
+    @staticmethod
+    def compact(adjacency):
+        offsets = array("I", [0])
+        targets = array("I")
+
+        for neighbors in adjacency:
+            targets.extend(sorted(neighbors))
+            offsets.append(len(targets))
+
+        return offsets, targets
+
+    def direct_prereqs(self, course_id):
+        return self.prereq_ids[self.prereq_offsets[course_id]:
+                               self.prereq_offsets[course_id + 1]]
+
+    def direct_dependents(self, course_id):
+        return self.dependent_ids[self.dependent_offsets[course_id]:
+                                  self.dependent_offsets[course_id + 1]]
+
+    def get_topological_order(self):
+        """Kahn's algorithm, courses in a cycle are appended at the end."""
+        in_degrees = [self.prereq_offsets[i + 1] - self.prereq_offsets[i]
+                      for i in range(len(self.codes))]
+        order = array("I", (i for i, degree in enumerate(in_degrees)
+                            if degree == 0))
+        index = 0
+
+        while index < len(order):
+            for dependent_id in self.direct_dependents(order[index]):
+                in_degrees[dependent_id] -= 1
+                if in_degrees[dependent_id] == 0:
+                    order.append(dependent_id)
+            index += 1
+
+        self.cyclic_ids = [i for i, degree in enumerate(in_degrees) if degree]
+        order.extend(self.cyclic_ids)
+
+        return order
+
+    def get_components(self, neighbors):
+        """Strongly connected components (Tarjan's algorithm, without
+        recursion), each one listed after every component its courses have
+        edges to.
+        """
+        indexes = [-1] * len(self.codes)
+        low_links = [0] * len(self.codes)
+        on_stack = [False] * len(self.codes)
+        stack = []
+        components = []
+        index = 0
+
+        for root_id in range(len(self.codes)):
+            if indexes[root_id] != -1:
+                continue
+            work = [(root_id, iter(neighbors(root_id)))]
+            indexes[root_id] = low_links[root_id] = index
+            index += 1
+            stack.append(root_id)
+            on_stack[root_id] = True
+
+            while work:
+                course_id, neighbor_ids = work[-1]
+                for neighbor_id in neighbor_ids:
+                    if indexes[neighbor_id] == -1:
+                        indexes[neighbor_id] = low_links[neighbor_id] = index
+                        index += 1
+                        stack.append(neighbor_id)
+                        on_stack[neighbor_id] = True
+                        work.append((neighbor_id,
+                                     iter(neighbors(neighbor_id))))
+                        break
+                    if on_stack[neighbor_id]:
+                        low_links[course_id] = min(low_links[course_id],
+                                                   indexes[neighbor_id])
+                else:
+                    work.pop()
+                    if work:
+                        parent_id = work[-1][0]
+                        low_links[parent_id] = min(low_links[parent_id],
+                                                   low_links[course_id])
+                    if low_links[course_id] == indexes[course_id]:
+                        component = []
+                        while True:
+                            member_id = stack.pop()
+                            on_stack[member_id] = False
+                            component.append(member_id)
+                            if member_id == course_id:
+                                break
+                        components.append(component)
+
+        return components
+
+    def get_closure(self, neighbors):
+        """Every course reachable from each course through neighbors.
+
+        Computed over the components (see get_components) so courses in a
+        cycle, and everything leading to one, get the same complete closure
+        as the rest: the courses of a component reach each other, plus
+        whatever their neighbors outside of it reach.
+        """
+        closure = [0] * len(self.codes)
+
+        for component in self.get_components(neighbors):
+            bits = 0
+            for course_id in component:
+                for neighbor_id in neighbors(course_id):
+                    bits |= closure[neighbor_id] | 1 << neighbor_id
+            for course_id in component:
+                closure[course_id] = bits
+
+        return closure
+
+    def __len__(self):
+        return len(self.codes)
+
+    def __contains__(self, code):
+        return code in self.ids
+
+    def codes_of(self, bits):
+        """Course codes of a bitset, in topological order."""
+        return [self.codes[course_id] for course_id in self.topological_order
+                if bits >> course_id & 1]
+
+    def ids_of(self, bits):
+        """Course IDs of a bitset, lowest first."""
+        ids = []
+
+        while bits:
+            lowest_bit = bits & -bits
+            ids.append(lowest_bit.bit_length() - 1)
+            bits ^= lowest_bit
+
+        return ids
+
+    def bits_of(self, codes):
+        """Bitset of course codes, codes not in the graph are ignored."""
+        bits = 0
+
+        for code in codes:
+            if code in self.ids:
+                bits |= 1 << self.ids[code]
+
+        return bits
+
+    def ancestors_of(self, code):
+        """Every course that may be needed before code (all alternatives)."""
+        return self.codes_of(self.ancestors[self.ids[code]])
+
+    def descendants_of(self, code):
+        """Every course that code is needed for, directly or not."""
+        return self.codes_of(self.descendants[self.ids[code]])
+
+    def is_ancestor(self, prereq_code, code):
+        return self.ancestors[self.ids[code]] >> self.ids[prereq_code] & 1 \
+            == 1
+
+    def is_unlocked(self, course_id, completed_bits):
+        """Whether completed_bits (a bitset, see bits_of) has every group of
+        a course's prerequisites. Takes a course ID so planners can call it
+        in tight loops; use is_code_unlocked with a code.
+        """
+        for group_bits in self.requirements[course_id]:
+            if not group_bits & completed_bits:
+                return False
+
+        return True
+
+    def is_coreq_satisfied(self, course_id, taken_bits):
+        """Whether taken_bits, the courses completed before or taken in the
+        same semester as the course, has every group of its corequisites.
+        """
+        for group_bits in self.corequisites[course_id]:
+            if not group_bits & taken_bits:
+                return False
+
+        return True
+
+    def is_code_unlocked(self, code, completed_codes):
+        return self.is_unlocked(self.ids[code], self.bits_of(completed_codes))
+
+    def unlocked_ids(self, completed_bits):
+        """IDs of the courses not completed yet that can be taken next."""
+        return [course_id for course_id in self.topological_order
+                if not completed_bits >> course_id & 1 and
+                self.is_unlocked(course_id, completed_bits)]
+
+
+async def load_prerequisite_graph(connection):
+    """Build the graph from the Courses table (see create_db)."""
+    rows = await connection.fetch(COURSE_PREREQUISITES_QUERY)
+
+    return PrerequisiteGraph(
+        Course(row["code"], row["credit"], row["name"], row["subject"],
+               prereq_description=row["prereq_description"] or "",
+               coreq_description=row["coreq_description"] or "")
+        for row in rows
+    )
+
+
+prerequisite_graph = None  # loaded on first use, shared by every request
+prerequisite_graph_version = None  # catalog version it was loaded from
+
+
+async def get_prerequisite_graph(connection):
+    """The catalog's graph, loaded once per app worker and again after every
+    catalog load (see catalog_version).
+    """
+    global prerequisite_graph, prerequisite_graph_version
+
+    version = await get_catalog_version(connection)
+    if prerequisite_graph is None or version != prerequisite_graph_version:
+        prerequisite_graph = await load_prerequisite_graph(connection)
+        prerequisite_graph_version = version
+
+    return prerequisite_graph
@@ -1,21 +1,235 @@
-import firebase_admin
-from firebase_admin import credentials, auth
+"""Verify Firebase ID tokens.
+
+Tokens are checked locally against Google's public signing keys (see
+https://firebase.google.com/docs/auth/admin/verify-id-tokens), which are
+fetched once and kept for as long as their Cache-Control header allows. A
+verified token is kept until it expires, so a client sending the same token
+with every request only pays for a hash and a dictionary lookup. Fetching the
+keys and checking a new token's signature run in a worker thread, off the
+event loop.
+
+For tests, use_local_keys() swaps Google's keys for a local key set that can
+sign tokens:
+    keys = use_local_keys("demo-project")
+    token = keys.sign("some-uid", email="someone@ufl.edu")
+"""
+import asyncio
+import hashlib
+import json
 import os
+import re
+import time
+import urllib.request
+from collections import OrderedDict
+import jwt
+from jwt.algorithms import RSAAlgorithm
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 FIREBASE_KEY_PATH = os.path.join(BASE_DIR, "creds.secret.json")
+FIREBASE_KEYS_URL = "https://www.googleapis.com/service_accounts/v1/jwk/" \
+    "securetoken@system.gserviceaccount.com"
+FIREBASE_ISSUER = "https://securetoken.google.com/"
+
+DEFAULT_KEYS_MAX_AGE = 300  # if Google doesn't say how long to keep them
+# Least time between two fetches, so tokens with made up key ids can't make
+# every request fetch the keys
+MIN_KEYS_REFETCH_SECONDS = 60
+MAX_CACHED_TOKENS = 10000
+
+
+def get_project_id():
+    """Firebase project id, FIREBASE_PROJECT_ID or the one of the service
+    account in creds.secret.json.
+    """
+    project_id = os.environ.get("FIREBASE_PROJECT_ID")
+
+    if project_id is None:
+        with open(FIREBASE_KEY_PATH) as f:
+            project_id = json.load(f)["project_id"]
+
+    return project_id
+
+
+def get_max_age(cache_control):
+    match = re.search(r"max-age=(\d+)", cache_control or "")
+
+    return int(match.group(1)) if match else DEFAULT_KEYS_MAX_AGE
+
+
+class PublicKeys:
+    """Google's token signing keys, kept for as long as their Cache-Control
+    max-age allows.
+    """
+
+    def __init__(self, url=FIREBASE_KEYS_URL):
+        self.url = url
+        self.keys = {}  # key id -> PyJWK
+        self.expires_at = 0.0
+        self.fetched_at = 0.0
+        self.lock = asyncio.Lock()
+
+    def fetch(self):
+        with urllib.request.urlopen(self.url, timeout=10) as response:
+            key_set = json.load(response)
+            max_age = get_max_age(response.headers.get("Cache-Control"))
+
+        return {key["kid"]: jwt.PyJWK(key) for key in key_set["keys"]}, \
+            max_age
+
+    async def refresh(self):
+        async with self.lock:
+            # Another request may have fetched them while this one waited
+            if time.monotonic() - self.fetched_at < MIN_KEYS_REFETCH_SECONDS \
+                    and time.monotonic() < self.expires_at:
+                return
+
+            self.fetched_at = time.monotonic()
+            try:
+                keys, max_age = await asyncio.to_thread(self.fetch)
+            except (OSError, ValueError, KeyError, jwt.PyJWTError):
+                if not self.keys:
+                    raise ValueError("Couldn't fetch Firebase's public keys")
+                # Keep using the old keys and try again in a minute, Google
+                # publishes new keys well before it signs with them
+                self.expires_at = time.monotonic() + MIN_KEYS_REFETCH_SECONDS
+                return
+
+            self.keys = keys
+            self.expires_at = self.fetched_at + max_age
+
+    async def get_key(self, key_id):
+        """The key of a key id, None if Google doesn't have it."""
+        if time.monotonic() >= self.expires_at or (
+                key_id not in self.keys and time.monotonic() -
+                self.fetched_at >= MIN_KEYS_REFETCH_SECONDS):
+            await self.refresh()
+
+        return self.keys.get(key_id)
+
+
+class LocalKeys:
+    """A key set of one RSA key made on the spot, which signs tokens the way
+    Firebase does. For tests and local development only.
+    """
+
+    def __init__(self, project_id, key_id="local"):
+        from cryptography.hazmat.primitives.asymmetric import rsa
+
+        self.project_id = project_id
+        self.key_id = key_id
+        self.private_key = rsa.generate_private_key(public_exponent=65537,
+                                                    key_size=2048)
+        public_jwk = RSAAlgorithm.to_jwk(self.private_key.public_key(),
+                                         as_dict=True)
+        self.keys = {key_id: jwt.PyJWK({**public_jwk, "kid": key_id,
+                                        "alg": "RS256"})}
+
+    async def get_key(self, key_id):
+        return self.keys.get(key_id)
+
+    def sign(self, uid, lifetime=3600, **claims):
+        """A Firebase ID token of a user, valid for lifetime seconds."""
+        now = int(time.time())
+        claims = {
+            "iss": FIREBASE_ISSUER + self.project_id,
+            "aud": self.project_id,
+            "auth_time": now,
+            "iat": now,
+            "exp": now + lifetime,
+            "sub": uid,
+            **claims
+        }
+
+        return jwt.encode(claims, self.private_key, algorithm="RS256",
+                          headers={"kid": self.key_id})
+
+
+class TokenVerifier:
+    """Verifies Firebase ID tokens and keeps the verified ones, by their
+    hash, until they expire.
+
+    The tokens are an LRU of at most MAX_CACHED_TOKENS: expired ones are
+    dropped when they're looked up and the least recently used one when a
+    new token doesn't fit, so remembering a token is O(1) however full the
+    cache is.
+    """
+
+    def __init__(self, project_id, keys):
+        self.project_id = project_id
+        self.keys = keys  # PublicKeys or LocalKeys
+        self.tokens = OrderedDict()  # token hash -> (decoded token, exp)
+
+    def decode(self, token, key):
+        decoded_token = jwt.decode(
+            token, key, algorithms=["RS256"], audience=self.project_id,
+            issuer=FIREBASE_ISSUER + self.project_id,
+            options={"require": ["exp", "iat", "sub", "aud", "iss"]})
+
+        if not decoded_token["sub"] or len(decoded_token["sub"]) > 128:
+            raise jwt.InvalidTokenError("Invalid subject")
+        if decoded_token.get("auth_time", 0) > time.time():
+            raise jwt.InvalidTokenError("Authenticated in the future")
+
+        return {**decoded_token, "uid": decoded_token["sub"]}
+
+    def remember(self, token_hash, decoded_token):
+        self.tokens[token_hash] = (decoded_token, decoded_token["exp"])
+        self.tokens.move_to_end(token_hash)
+
+        while len(self.tokens) > MAX_CACHED_TOKENS:
+            self.tokens.popitem(last=False)
+
+    async def verify(self, token):
+        token_hash = hashlib.sha256(token.encode()).digest()
+        entry = self.tokens.get(token_hash)
+
+        if entry is not None:
+            if entry[1] > time.time():
+                self.tokens.move_to_end(token_hash)
+                return entry[0]
+            del self.tokens[token_hash]
+
+        try:
+            key_id = jwt.get_unverified_header(token).get("kid")
+            key = await self.keys.get_key(key_id)
+            if key is None:
+                raise jwt.InvalidTokenError("Unknown key id")
+            decoded_token = await asyncio.to_thread(self.decode, token, key)
+        except jwt.PyJWTError:
+            raise ValueError("Invalid Firebase token")
+
+        self.remember(token_hash, decoded_token)
+
+        return decoded_token
+
+
+token_verifier = None
+
+
+def get_token_verifier():
+    global token_verifier
+
+    if token_verifier is None:
+        token_verifier = TokenVerifier(get_project_id(), PublicKeys())
+
+    return token_verifier
+
+
+def use_local_keys(project_id="timewise-local"):
+    """Verify tokens against a new LocalKeys from now on, and return it to
+    sign tokens with.
+    """
+    global token_verifier
+
+    keys = LocalKeys(project_id)
+    token_verifier = TokenVerifier(project_id, keys)
+
+    return keys
 
-# Initialize Firebase Admin SDK
-cred = credentials.Certificate(FIREBASE_KEY_PATH)
-firebase_admin.initialize_app(cred)
 
-def verify_firebase_token(token: str):
+async def verify_firebase_token(token: str):
     """
     Verify Firebase ID token received from the frontend.
-    Returns user data if valid, raises error otherwise.
+    Returns user data if valid, raises ValueError otherwise.
     """
-    try:
-        decoded_token = auth.verify_id_token(token)
-        return decoded_token  # Returns user details
-    except Exception:
-        raise ValueError("Invalid Firebase token")
+    return await get_token_verifier().verify(token)
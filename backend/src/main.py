@@ -1,3 +1,9 @@
+import sys
+from pathlib import Path
+# The scheduling and scraping modules import each other relative to the src
+# directory (see backend/README.md), so it has to be importable from the app
+sys.path.append(str(Path(__file__).resolve().parent))
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
@@ -6,14 +12,25 @@ from src.routes.auth.register import router as auth_router
 from src.routes.plans import router as plans_router
 from src.routes.overview import router as overview_router 
 from src.routes.schedules import router as schedules_router
+from src.routes.courses import router as courses_router
+from src.routes.admin import router as admin_router
+from src.routes.audit import router as audit_router
 from src.routes import friends_routes
+from semester_scheduling.section_fetcher import close_section_fetcher
+from semester_scheduling.schedule_solver import close_schedule_solver_pool
+from degree_planning.model_plans_snapshot import get_model_plans_snapshot, close_model_plans_snapshot
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     await database.connect()
-    await database.create_tables()
+    await database.migrate()
+    # Maps the model plans, compiling them first if backend/data changed
+    get_model_plans_snapshot()
     yield
+    await close_section_fetcher()
+    close_schedule_solver_pool()
+    close_model_plans_snapshot()
     await database.disconnect()
 
 app = FastAPI(lifespan=lifespan)
@@ -33,8 +50,11 @@ app.add_middleware(
 app.include_router(auth_router, prefix="/api")
 app.include_router(plans_router, prefix="/api")
 app.include_router(schedules_router, prefix="/api")
+app.include_router(courses_router, prefix="/api")
 app.include_router(overview_router, prefix="/api")
 app.include_router(friends_routes.router, prefix="/api")
+app.include_router(admin_router, prefix="/api")
+app.include_router(audit_router, prefix="/api")
 
 @app.get("/")
 async def root():
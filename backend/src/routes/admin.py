@@ -0,0 +1,37 @@
+from fastapi import APIRouter, status
+from src.routes.dependencies import AdminUID
+from src.db.postgres import database
+from semester_scheduling.schedule_result_cache import schedule_result_cache
+
+router = APIRouter(
+    prefix="/admin"
+)
+
+@router.get("/cache-stats", status_code=status.HTTP_200_OK)
+async def cache_stats(uid: AdminUID):
+    """
+    Returns this worker's schedule result cache statistics: hits (in memory and from Postgres), misses, evictions,
+    invalidations by a new section snapshot and the hit rate.
+
+    Args:
+        uid (AdminUID): The user ID of the admin asking.
+
+    Raises:
+        HTTPException: 403 if the user isn't an admin.
+    """
+    return {"schedule_results": schedule_result_cache.get_stats()}
+
+@router.get("/db-stats", status_code=status.HTTP_200_OK)
+async def db_stats(uid: AdminUID):
+    """
+    Returns this worker's Postgres pool statistics: pool size, connections in use, acquires waiting and how often
+    every connection was in use (the pool is the bottleneck when acquire waits grow while queries stay fast), plus
+    latency histograms of waiting for a connection and of every named statement.
+
+    Args:
+        uid (AdminUID): The user ID of the admin asking.
+
+    Raises:
+        HTTPException: 403 if the user isn't an admin.
+    """
+    return database.get_stats()
@@ -0,0 +1,68 @@
+from typing import Literal
+from fastapi import APIRouter, status, HTTPException
+from pydantic import BaseModel, Field
+from src.routes.dependencies import AuthorizedUID
+from src.db.postgres import database
+from degree_planning.degree_audit import get_audit_index
+from degree_planning.model_plans_snapshot import get_model_plans_snapshot
+
+router = APIRouter(
+    prefix="/audit"
+)
+
+ProgramKind = Literal["major", "minor", "certificate"]
+
+class ProgramAudit(BaseModel):
+    programs: list[str]  # names of the majors, minors and certificates to audit
+    kind: ProgramKind | None = None  # only audit programs of this kind
+    completed: list[str]  # course codes of the student's transcript
+
+class WhatIfAudit(BaseModel):
+    completed: list[str]
+    kind: ProgramKind | None = None
+    limit: int = Field(default=25, ge=1, le=500)
+
+async def get_index():
+    try:
+        async with database.acquire() as connection:
+            return await get_audit_index(connection, get_model_plans_snapshot())
+    except Exception:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Error loading program requirements")
+
+@router.post("/programs", status_code=status.HTTP_200_OK)
+async def audit_programs(program_audit: ProgramAudit, uid: AuthorizedUID):
+    """
+    Audits a transcript against a set of programs: progress, completed and remaining courses and choices.
+
+    Args:
+        program_audit (ProgramAudit): The program names, an optional kind and the completed course codes.
+        uid (AuthorizedUID): The authorized user ID of the user auditing.
+
+    Raises:
+        HTTPException: 404 if none of the programs exist, 500 if the program requirements couldn't be loaded.
+    """
+    index = await get_index()
+    programs = index.find_programs(set(program_audit.programs), program_audit.kind)
+
+    if not programs:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="No programs with these names")
+
+    completed_bits = index.bits_of(program_audit.completed)
+
+    return [index.audit(program, completed_bits) for program in programs]
+
+@router.post("/what-if", status_code=status.HTTP_200_OK)
+async def what_if(what_if_audit: WhatIfAudit, uid: AuthorizedUID):
+    """
+    Compares a transcript against every program (of a kind), the most completed first.
+
+    Args:
+        what_if_audit (WhatIfAudit): The completed course codes, an optional kind and how many programs to return.
+        uid (AuthorizedUID): The authorized user ID of the user auditing.
+
+    Raises:
+        HTTPException: If the program requirements couldn't be loaded, an HTTP 500 error is raised with a relevant message.
+    """
+    index = await get_index()
+
+    return index.what_if(index.bits_of(what_if_audit.completed), what_if_audit.kind, what_if_audit.limit)
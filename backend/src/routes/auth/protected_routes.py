@@ -1,5 +1,5 @@
 from fastapi import APIRouter, Depends, HTTPException, Header
-from src.auth.firebase import verify_firebase_token
+from src.firebase import verify_firebase_token
 
 router = APIRouter()
 
@@ -14,7 +14,7 @@ async def protected_route(authorization: str = Header(None)):
     token = authorization.split("Bearer ")[1]
 
     try:
-        user = verify_firebase_token(token)
+        user = await verify_firebase_token(token)
         return {"message": "Access granted", "user": user}
 
     except ValueError:
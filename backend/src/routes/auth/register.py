@@ -22,7 +22,7 @@ async def register(account: AccountInfo, authorization: Annotated[str, Header()]
     token = authorization.split("Bearer ")[1]
 
     try:
-        decoded_user = verify_firebase_token(token)
+        decoded_user = await verify_firebase_token(token)
         uid = decoded_user["uid"]
         email = decoded_user.get("email")
 
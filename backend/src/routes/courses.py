@@ -0,0 +1,34 @@
+from fastapi import APIRouter, status, HTTPException, Query
+from src.routes.dependencies import AuthorizedUID
+from src.db.courses.courses_model import search_courses
+
+router = APIRouter(
+    prefix="/courses"
+)
+
+@router.get("/search", status_code=status.HTTP_200_OK)
+async def search(
+    uid: AuthorizedUID,
+    q: str = Query(min_length=1, max_length=100),
+    subject: str | None = None,
+    level: str | None = None,
+    limit: int = Query(default=10, ge=1, le=50)
+):
+    """
+    Searches the course catalog for autocomplete: course codes starting with q first, then courses whose name or
+    description matches q.
+
+    Args:
+        uid (AuthorizedUID): The authorized user ID of the user searching.
+        q (str): What the user typed so far, e.g., "MAC23" or "calculus".
+        subject (str | None): Only return courses of this subject.
+        level (str | None): Only return courses of this level (Undergraduate or Graduate).
+        limit (int): The most courses to return.
+
+    Raises:
+        HTTPException: If an error occurs while searching, an HTTP 500 error is raised with a relevant message.
+    """
+    try:
+        return await search_courses(q, subject, level, limit)
+    except Exception:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Error searching courses")
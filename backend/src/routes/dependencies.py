@@ -1,17 +1,36 @@
+import os
 from typing import Annotated
 from fastapi import Header, HTTPException, Depends
 from src.firebase import verify_firebase_token
 
-async def verifyUser(authorization: Annotated[str, Header()]):
+# Comma separated UIDs that may use the admin routes, besides users with an admin custom claim
+ADMIN_UIDS = frozenset(uid.strip() for uid in os.environ.get("ADMIN_UIDS", "").split(",") if uid.strip())
+
+async def verifyToken(authorization: Annotated[str, Header()]):
     if not authorization or not authorization.startswith("Bearer "):
         raise HTTPException(status_code=401, detail="Authorization header missing or invalid")
 
     token = authorization.split("Bearer ")[1]
 
     try:
-        user = verify_firebase_token(token)
-        return user["uid"]
+        return await verify_firebase_token(token)
     except ValueError:
         raise HTTPException(status_code=401, detail="Invalid Firebase token")
 
-AuthorizedUID = Annotated[str, Depends(verifyUser)]
\ No newline at end of file
+async def verifyUser(user: Annotated[dict, Depends(verifyToken)]):
+    return user["uid"]
+
+async def verifyAdmin(user: Annotated[dict, Depends(verifyToken)]):
+    """
+    Lets through users with an admin custom claim (set with the Firebase Admin SDK) or in ADMIN_UIDS.
+
+    Raises:
+        HTTPException: 403 if the user isn't an admin.
+    """
+    if user.get("admin") is not True and user["uid"] not in ADMIN_UIDS:
+        raise HTTPException(status_code=403, detail="Admins only")
+
+    return user["uid"]
+
+AuthorizedUID = Annotated[str, Depends(verifyUser)]
+AdminUID = Annotated[str, Depends(verifyAdmin)]
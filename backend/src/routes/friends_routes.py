@@ -1,10 +1,25 @@
+import json
 from fastapi import APIRouter, Depends, HTTPException
+from pydantic import BaseModel, Field
 from src.firebase import verify_firebase_token
-from src.db.users.friendship_model import insert_friendship, list_friendships, get_user_by_uid
+from src.db.users.friendship_model import insert_friendship, is_friend, list_friend_profiles, get_user_by_uid, \
+    get_friend_schedules
 from src.db.schedules.schedules_model import get_schedule_by_uid
+from src.routes.utils import get_semester_str
+from semester_scheduling.friend_overlap import compare_schedules, person_schedule_from_row
 
 router = APIRouter()
 
+# Military time from 0000 to 2400 on the 5 minute slots of data_templates/time_slots.py
+SLOT_TIME_PATTERN = r"^(([01]\d|2[0-3])[0-5][05]|2400)$"
+
+class FriendOverlap(BaseModel):
+    semester: str  # client semester string (see routes/utils.py)
+    friend_uids: list[str] | None = Field(default=None, max_length=500)  # None compares with every friend
+    day_start: str = Field(default="0800", pattern=SLOT_TIME_PATTERN)  # free time is only looked for in this window
+    day_end: str = Field(default="2200", pattern=SLOT_TIME_PATTERN)
+    min_minutes: int = Field(default=30, ge=5, le=600)  # shortest free time block to return
+
 @router.get("/friends/search/{uid}")
 async def search_user(uid: str):
     user = await get_user_by_uid(uid)
@@ -25,20 +40,65 @@ async def add_friend(friend_uid: str, user=Depends(verify_firebase_token)):
     return {"message": f"Added {friend_uid} as a friend."}
 
 @router.get("/friends/list")
-async def list_friends(user=Depends(verify_firebase_token)):
-    friendships = await list_friendships(user["uid"])
-    return [{"friend_id": f["friend_id"]} for f in friendships]
+async def list_friends(semester: str | None = None, user=Depends(verify_firebase_token)):
+    """
+    Lists the user's friends with their profiles and a summary of their schedules (of the semester if given), so the
+    friends page doesn't have to look every friend up.
+
+    Raises:
+        HTTPException: If the semester is invalid
+    """
+    if semester is not None:
+        try:
+            semester = get_semester_str(semester)
+        except (KeyError, IndexError):
+            raise HTTPException(status_code=400, detail="Invalid semester")
+
+    friends = await list_friend_profiles(user["uid"], semester)
+    return [{
+        "friend_id": friend["uid"],
+        "name": friend["name"],
+        "username": friend["username"],
+        "email": friend["email"],
+        "schedule_count": friend["schedule_count"],
+        "latest_schedule": {
+            "id": friend["schedule_id"],
+            "name": friend["schedule_name"],
+            "semester": friend["semester"],
+            "date": friend["date"]
+        } if friend["schedule_id"] is not None else None
+    } for friend in friends]
 
 @router.get("/friends/{friend_uid}/schedule")
 async def get_friend_schedule(friend_uid: str, user=Depends(verify_firebase_token)):
     if friend_uid == user["uid"]:
         raise HTTPException(status_code=400, detail="Use your own schedule route.")
 
-    friendships = await list_friendships(user["uid"])
-    friend_ids = [f["friend_id"] for f in friendships]
-
-    if friend_uid not in friend_ids:
+    if not await is_friend(user["uid"], friend_uid):
         raise HTTPException(status_code=403, detail="You are not friends with this user.")
 
     schedule = await get_schedule_by_uid(friend_uid)
-    return [dict(row) for row in schedule]
+    return [{**dict(row), "sections": json.loads(row["sections"])} for row in schedule]
+
+@router.post("/friends/overlap")
+async def friends_overlap(friend_overlap: FriendOverlap, user=Depends(verify_firebase_token)):
+    """
+    Compares the user's latest schedule of a semester with their friends': shared classes, shared courses in other
+    sections, free time with each friend and free time common to everyone. Every schedule is fetched in one query,
+    friend_uids that aren't the user's friends are left out.
+    """
+    try:
+        semester = get_semester_str(friend_overlap.semester)
+    except (KeyError, IndexError):
+        raise HTTPException(status_code=400, detail="Invalid semester")
+    if friend_overlap.day_start >= friend_overlap.day_end:
+        raise HTTPException(status_code=400, detail="day_start has to be before day_end")
+
+    rows = await get_friend_schedules(user["uid"], friend_overlap.friend_uids, semester)
+    own, *friends = [person_schedule_from_row(row) for row in rows]
+
+    if own.schedule_id is None:
+        raise HTTPException(status_code=404, detail="You don't have a schedule for this semester.")
+
+    return compare_schedules(own, friends, friend_overlap.day_start, friend_overlap.day_end,
+                             friend_overlap.min_minutes)
@@ -6,23 +6,25 @@ router = APIRouter(
     prefix="/overview"
 )
 
+OVERVIEW_PLANS = database.statement("overview_plans", "SELECT * FROM plans WHERE plans.owner_uid = $1")
+OVERVIEW_SCHEDULES = database.statement(
+    "overview_schedules", "SELECT id, owner_uid, semester, name, date FROM schedules WHERE schedules.owner_uid = $1"
+)
+
 @router.get("/", status_code=status.HTTP_200_OK)
 async def get_overview(uid: AuthorizedUID):
     try:
-        async with database.pool.acquire() as connection:
-            async with connection.transaction():
-                plans_query = "SELECT * FROM plans WHERE plans.owner_uid = $1"
-                plans_data = await connection.fetch(plans_query, uid)
-
-                schedules_query = "SELECT * FROM schedules WHERE schedules.owner_uid = $1"
-                schedules_data = await connection.fetch(schedules_query, uid)
+        # Two reads, no transaction (its BEGIN and COMMIT would be two more round trips)
+        async with database.acquire() as connection:
+            plans_data = await connection.fetch(OVERVIEW_PLANS, uid)
+            schedules_data = await connection.fetch(OVERVIEW_SCHEDULES, uid)
 
-                result = {
-                    "plans": plans_data,
-                    "schedules": schedules_data,
-                }
+            result = {
+                "plans": plans_data,
+                "schedules": schedules_data,
+            }
 
-                return result
+            return result
     except Exception as e:
         print(e)
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Error fetching overview data")
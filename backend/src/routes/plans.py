@@ -1,7 +1,12 @@
 from fastapi import APIRouter, status, HTTPException
 from src.routes.dependencies import AuthorizedUID
-from src.db.plans.plans_model import PlanCreate, PlanEdit, PlanDelete, insert_plan, edit_plan, delete_plan
+from src.db.postgres import database
+from src.db.plans.plans_model import PlanCreate, PlanEdit, PlanDelete, PlanValidate, PlanGenerate, insert_plan, \
+    edit_plan, delete_plan
 from src.routes.utils import get_semester_str
+from degree_planning.four_year_planner import InfeasiblePlanError, generate_plan, validate_plan
+from degree_planning.model_plans_snapshot import get_model_plans_snapshot
+from degree_planning.prerequisite_graph import get_prerequisite_graph
 
 router = APIRouter(
     prefix="/plans"
@@ -39,4 +44,56 @@ async def delete(plan: PlanDelete, uid: AuthorizedUID):
     try:
         await delete_plan(plan, uid)
     except Exception:
-        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Error deleting 4-year plan")
\ No newline at end of file
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Error deleting 4-year plan")
+
+async def get_graph():
+    try:
+        async with database.acquire() as connection:
+            return await get_prerequisite_graph(connection)
+    except Exception:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Error loading the course catalog")
+
+@router.post("/validate", status_code=status.HTTP_200_OK)
+async def validate(plan: PlanValidate, uid: AuthorizedUID):
+    """
+    Checks a 4-year plan's prerequisites, corequisites and credits per semester. Fast enough to run on every edit.
+
+    Args:
+        plan (PlanValidate): The course codes of every semester, the courses completed before it and the credit limit.
+        uid (AuthorizedUID): The authorized user ID of the user checking the plan.
+
+    Raises:
+        HTTPException: If the course catalog couldn't be loaded, an HTTP 500 error is raised with a relevant message.
+    """
+    graph = await get_graph()
+    issues = validate_plan(graph, plan.semesters, plan.completed, plan.max_credits)
+
+    return {
+        "valid": not any(issue.is_error() for issue in issues),
+        "issues": [issue.to_dict() for issue in issues]
+    }
+
+@router.post("/generate", status_code=status.HTTP_200_OK)
+async def generate(plan: PlanGenerate, uid: AuthorizedUID):
+    """
+    Generates a 4-year plan from a major's model plan, leaving out the courses already completed.
+
+    Args:
+        plan (PlanGenerate): The major, the completed courses, the number of semesters and the credit limit.
+        uid (AuthorizedUID): The authorized user ID of the user generating the plan.
+
+    Raises:
+        HTTPException: 404 if the major has no model plan, 400 if the plan can't fit in the semesters, 500 if the
+        course catalog couldn't be loaded.
+    """
+    try:
+        model_plan = get_model_plans_snapshot().get(plan.program)
+    except KeyError:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="No model plan for this major")
+
+    graph = await get_graph()
+
+    try:
+        return generate_plan(graph, model_plan, plan.completed, plan.semesters, plan.max_credits).to_dict()
+    except InfeasiblePlanError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
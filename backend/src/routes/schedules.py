@@ -1,12 +1,245 @@
-from fastapi import APIRouter, status, HTTPException
+import hashlib
+import json
+import time
+from fastapi import APIRouter, status, HTTPException, Request
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field
 from src.routes.dependencies import AuthorizedUID
+from src.db.postgres import database
 from src.db.schedules.schedules_model import ScheduleCreate, ScheduleEdit, ScheduleDelete, insert_schedule, edit_schedule, delete_schedule
 from src.routes.utils import get_semester_str
+from semester_scheduling.semester_schedule import SemesterScheduler, semester_course_to_dict
+from semester_scheduling.schedule_filters import compile_filters
+from semester_scheduling.schedule_ranking import DEFAULT_SCORE_WEIGHTS
+from semester_scheduling.schedule_result_cache import schedule_result_cache, schedule_result_key
+from semester_scheduling.section_snapshot import get_current_snapshot_id
+from semester_scheduling.schedule_solver import ClientDisconnectedError, InvalidCursorError, SolverBusyError, \
+    get_schedule_solver_pool, page_semester_schedules, rank_semester_schedules, solve_semester_schedules
 
 router = APIRouter(
     prefix="/schedules"
 )
 
+# A streamed search runs in the solver's process pool a chunk of schedules at a time, the first chunk small so the
+# first schedules come back quickly and every next one twice as big so fewer searches are started for a whole page
+FIRST_SEARCH_CHUNK_SIZE = 10
+
+class ScheduleFilters(BaseModel):
+    earliest_time: str = ""
+    latest_time: str = ""
+    period_blackouts: list[str] = []
+    day_blackouts: list[str] = []
+    min_instructor_rating: str = ""
+    max_level_of_difficulty: str = ""
+    min_would_take_again: str = ""
+
+class ScheduleSearch(BaseModel):
+    codes: list[str]
+    filters: ScheduleFilters = ScheduleFilters()
+    limit: int = Field(default=50, ge=1, le=500)
+    cursor: str | None = None  # cursor of the last schedule of the previous page
+    time_budget: float = Field(default=2.0, gt=0, le=10)  # seconds, per page
+
+class ScheduleRanking(BaseModel):
+    codes: list[str]
+    filters: ScheduleFilters = ScheduleFilters()
+    k: int = Field(default=20, ge=1, le=100)
+    weights: dict[str, float] = {}  # overrides of schedule_ranking.DEFAULT_SCORE_WEIGHTS
+    time_budget: float = Field(default=2.0, gt=0, le=10)  # seconds
+
+class ScheduleGenerate(BaseModel):
+    codes: list[str]
+    filters: ScheduleFilters = ScheduleFilters()
+    max_results: int = Field(default=100, ge=1, le=1000)
+    time_budget: float = Field(default=2.0, gt=0, le=10)  # seconds
+
+def schedule_search_hash(scheduler, filters):
+    """
+    Hash of the ordered course codes and the normalized filters of a search. Cursor positions only mean something for
+    the search they came from, so a cursor carries it.
+    """
+    search = json.dumps([list(scheduler.semester_class_data), list(compile_filters(**filters).key())])
+    return hashlib.sha256(search.encode()).hexdigest()[:16]
+
+def encode_schedule_cursor(snapshot_id, search_hash, positions):
+    # Cursors are only valid for the section snapshot and the search they were made from
+    snapshot = snapshot_id if snapshot_id is not None else "live"
+    return f"{snapshot}:{search_hash}:{'.'.join(str(position) for position in positions)}"
+
+def decode_schedule_cursor(cursor, scheduler, search_hash):
+    """
+    Returns the positions of a cursor. Whether they're positions of the search is checked where the search runs (see
+    schedule_solver.page_semester_schedules).
+
+    Raises:
+        HTTPException: 409 if the cursor is from another section snapshot, 400 if it's from another search (other
+            courses, course order or filters) or is malformed.
+    """
+    parts = cursor.split(":")
+    if len(parts) != 3:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+    snapshot, cursor_search_hash, positions = parts
+
+    if snapshot != encode_schedule_cursor(scheduler.snapshot_id, "", []).split(":")[0]:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Course sections changed, start a new search")
+    if cursor_search_hash != search_hash:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Cursor is from a different search")
+
+    try:
+        return [int(position) for position in positions.split(".")] if positions else []
+    except ValueError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+
+async def stream_schedules(request, scheduler, filters, search_hash, limit, deadline, chunk, chunk_size):
+    """
+    Streams the NDJSON lines of a search: one {"schedule", "cursor"} line per schedule and a final {"done", "cursor",
+    "stopped_by"} line. chunk is the result of the search's first chunk of chunk_size schedules (see
+    page_semester_schedules), the next chunks are searched in the solver's process pool until limit schedules were
+    found, the search ends or the deadline passes. stopped_by is "time" if the deadline passed or "busy" if the solver
+    had no room for the next chunk before limit schedules were found (continue from the cursor with another request),
+    null otherwise. The search is cancelled as soon as the client disconnects.
+    """
+    cursor = None
+    count = 0
+
+    while True:
+        for schedule, positions in chunk["schedules"]:
+            cursor = encode_schedule_cursor(scheduler.snapshot_id, search_hash, positions)
+            yield json.dumps({"schedule": schedule, "cursor": cursor}) + "\n"
+            count += 1
+
+        if count == limit:
+            yield json.dumps({"done": False, "cursor": cursor, "stopped_by": None}) + "\n"
+            return
+        if chunk["stopped_by"] != "results":
+            stopped_by = chunk["stopped_by"]
+            yield json.dumps({"done": stopped_by is None, "cursor": cursor, "stopped_by": stopped_by}) + "\n"
+            return
+
+        chunk_size = min(2 * chunk_size, limit - count)
+        resume_after = chunk["schedules"][-1][1]
+        try:
+            chunk = await get_schedule_solver_pool().run(
+                request, page_semester_schedules, max(deadline - time.time(), 0), scheduler.semester_class_data,
+                scheduler.snapshot_id, filters, resume_after, chunk_size)
+        except ClientDisconnectedError:
+            return
+        except SolverBusyError:
+            yield json.dumps({"done": False, "cursor": cursor, "stopped_by": "busy"}) + "\n"
+            return
+
+async def get_scheduler(codes):
+    scheduler = SemesterScheduler(codes)
+
+    try:
+        async with database.acquire() as connection:
+            await scheduler.get_semester_class_data_from_db(connection)
+    except Exception:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Error fetching course sections")
+
+    return scheduler
+
+async def run_solver(request, solve, time_budget, *args):
+    """
+    Runs a schedule search in the solver's process pool so it can't stall the event loop.
+    """
+    try:
+        return await get_schedule_solver_pool().run(request, solve, time_budget, *args)
+    except SolverBusyError:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Too many schedule searches running, try again")
+    except ClientDisconnectedError:
+        # Nobody is listening anymore, the search was already cancelled
+        raise HTTPException(status_code=499, detail="Client closed request")
+
+def reorder_schedule_courses(result, result_codes, codes):
+    """
+    Puts the courses of every schedule in a cached result in the order they were requested in.
+    """
+    result_codes = list(dict.fromkeys(result_codes))
+    codes = list(dict.fromkeys(codes))
+
+    if result_codes == codes:
+        return result
+
+    order = [result_codes.index(code) for code in codes]
+    schedules = []
+
+    for schedule in result["schedules"]:
+        if isinstance(schedule, dict):
+            schedules.append({**schedule, "schedule": [schedule["schedule"][i] for i in order]})
+        else:
+            schedules.append([schedule[i] for i in order])
+
+    return {**result, "schedules": schedules}
+
+async def run_cached_solver(request, kind, codes, filters, options, time_budget, solve, *args):
+    """
+    Returns a cached result for the same courses, filters and options on the current section snapshot, runs
+    solve(semester class data, snapshot ID, filters, *args) in the solver's process pool with time_budget otherwise. Only complete
+    results are cached, not ones cut short by the time budget or a disconnect.
+    """
+    try:
+        async with database.acquire() as connection:
+            snapshot_id = await get_current_snapshot_id(connection)
+            key = schedule_result_key(kind, codes, filters, snapshot_id, options)
+            # Sections fetched live from the UF API have no version to invalidate results by
+            cached = await schedule_result_cache.get(key, snapshot_id, connection) if snapshot_id is not None else None
+    except Exception:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Error fetching course sections")
+
+    if cached is not None:
+        result_codes, result = cached
+        return reorder_schedule_courses(result, result_codes, codes)
+
+    scheduler = await get_scheduler(codes)
+    result = await run_solver(request, solve, time_budget, scheduler.semester_class_data, scheduler.snapshot_id, filters,
+                              *args)
+
+    if scheduler.snapshot_id is not None and result["stopped_by"] in (None, "results"):
+        key = schedule_result_key(kind, codes, filters, scheduler.snapshot_id, options)
+        async with database.acquire() as connection:
+            await schedule_result_cache.set(key, scheduler.snapshot_id, list(scheduler.semester_class_data), result, connection)
+
+    return result
+
+@router.post("/search", status_code=status.HTTP_200_OK)
+async def search(schedule_search: ScheduleSearch, uid: AuthorizedUID, request: Request):
+    """
+    Streams the valid schedules for a set of course codes as NDJSON, at most limit schedules per request and for at
+    most time_budget seconds. The search runs in the solver pool in chunks, each resuming after the last schedule of
+    the one before, so the stream can start before the whole page is found.
+
+    Args:
+        schedule_search (ScheduleSearch): The course codes, filters, page size, time budget and the cursor to resume
+            after (if any).
+        uid (AuthorizedUID): The authorized user ID of the user searching.
+        request (Request): Used to stop the search if the client disconnects.
+
+    Raises:
+        HTTPException: 409 if the cursor is from an older section snapshot, 400 if it's from another search or invalid,
+            500 if the sections couldn't be fetched, 503 if the solver pool is busy, 499 if the client disconnects
+            before the first chunk is found.
+    """
+    scheduler = await get_scheduler(schedule_search.codes)
+    filters = schedule_search.filters.model_dump()
+    search_hash = schedule_search_hash(scheduler, filters)
+    resume_after = decode_schedule_cursor(schedule_search.cursor, scheduler, search_hash) if schedule_search.cursor else None
+    deadline = time.time() + schedule_search.time_budget
+    chunk_size = min(FIRST_SEARCH_CHUNK_SIZE, schedule_search.limit)
+
+    # The first chunk is searched before the response starts, so a busy solver or a cursor that isn't a position of
+    # the search still gets its status code
+    try:
+        chunk = await run_solver(request, page_semester_schedules, schedule_search.time_budget,
+                                 scheduler.semester_class_data, scheduler.snapshot_id, filters, resume_after, chunk_size)
+    except InvalidCursorError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+
+    return StreamingResponse(
+        stream_schedules(request, scheduler, filters, search_hash, schedule_search.limit, deadline, chunk, chunk_size),
+        media_type="application/x-ndjson"
+    )
+
 @router.post("/create", status_code=status.HTTP_201_CREATED)
 async def create(schedule: ScheduleCreate, uid: AuthorizedUID):
     try:
@@ -36,4 +269,49 @@ async def delete(schedule: ScheduleDelete, uid: AuthorizedUID):
     try:
         await delete_schedule(schedule, uid)
     except Exception:
-        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Error deleting schedule")
\ No newline at end of file
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Error deleting schedule")
+
+@router.post("/top", status_code=status.HTTP_200_OK)
+async def top(schedule_ranking: ScheduleRanking, uid: AuthorizedUID, request: Request):
+    """
+    Returns the k best scoring valid schedules for a set of course codes, best first.
+
+    Args:
+        schedule_ranking (ScheduleRanking): The course codes, filters, k, score weights and time budget.
+        uid (AuthorizedUID): The authorized user ID of the user searching.
+        request (Request): Used to stop the search if the client disconnects.
+
+    Raises:
+        HTTPException: 400 if a weight is negative, 500 if the sections couldn't be fetched, 503 if the solver is busy.
+    """
+    try:
+        return await run_cached_solver(
+            request, "top", schedule_ranking.codes, schedule_ranking.filters.model_dump(),
+            {"k": schedule_ranking.k, "weights": {**DEFAULT_SCORE_WEIGHTS, **schedule_ranking.weights}},
+            schedule_ranking.time_budget, rank_semester_schedules, schedule_ranking.k, schedule_ranking.weights
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+@router.post("/generate", status_code=status.HTTP_200_OK)
+async def generate(schedule_generate: ScheduleGenerate, uid: AuthorizedUID, request: Request):
+    """
+    Finds up to max_results valid schedules for a set of course codes within time_budget seconds.
+
+    Results for the same courses and filters are cached until the section snapshot changes. The search runs in a
+    worker process; stopped_by in the response says whether it ended early because of the
+    result limit ("results") or the time budget ("time"), and is null if every valid schedule was returned.
+
+    Args:
+        schedule_generate (ScheduleGenerate): The course codes, filters and budgets.
+        uid (AuthorizedUID): The authorized user ID of the user searching.
+        request (Request): Used to stop the search if the client disconnects.
+
+    Raises:
+        HTTPException: 500 if the sections couldn't be fetched, 503 if the solver is busy.
+    """
+    return await run_cached_solver(
+        request, "generate", schedule_generate.codes, schedule_generate.filters.model_dump(),
+        {"max_results": schedule_generate.max_results}, schedule_generate.time_budget,
+        solve_semester_schedules, schedule_generate.max_results
+    )
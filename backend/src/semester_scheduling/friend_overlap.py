@@ -0,0 +1,65 @@
+import json
+from data_templates.time_slots import free_blocks, mask_from_bytes
+
+
+class PersonSchedule:
+    def __init__(self, uid, schedule_id, sections, time_mask):
+        self.uid = uid
+        self.schedule_id = schedule_id  # None if there's no schedule
+        self.sections = sections  # list of {code, unique_id, times}
+        self.time_mask = time_mask  # week mask of every section
+        self.section_ids = {(section["code"], section["unique_id"])
+                            for section in sections}
+        self.codes = {section["code"] for section in sections}
+
+
+def person_schedule_from_row(row):
+    sections = json.loads(row["sections"]) if row["sections"] else []
+
+    return PersonSchedule(row["uid"], row["id"] and str(row["id"]), sections,
+                          mask_from_bytes(row["time_mask"]))
+
+
+def format_blocks(blocks):
+    return [{"day": day, "start": start, "end": end}
+            for day, start, end in blocks]
+
+
+def compare_schedules(own, friends, day_start="0800", day_end="2200",
+                      min_minutes=30):
+    """Shared classes and free time of a user's schedule with each friend's.
+
+    Free time is found from the precomputed week masks alone: free time with
+    a friend is the gaps of the OR of the two masks and common free time of
+    everyone the gaps of the OR of all of them, so no meeting times are
+    looked at again however many friends there are.
+    """
+    results = []
+    busy_mask = own.time_mask
+
+    for friend in friends:
+        if friend.schedule_id is None:
+            results.append({"uid": friend.uid, "schedule_id": None})
+            continue
+
+        busy_mask |= friend.time_mask
+        shared_sections = own.section_ids & friend.section_ids
+        shared_codes = {code for code, _ in shared_sections}
+        results.append({
+            "uid": friend.uid,
+            "schedule_id": friend.schedule_id,
+            "shared_classes": [{"code": code, "unique_id": unique_id}
+                               for code, unique_id in sorted(shared_sections)],
+            # Same course, different section
+            "shared_courses": sorted(own.codes & friend.codes - shared_codes),
+            "free_together": format_blocks(free_blocks(
+                own.time_mask | friend.time_mask, day_start, day_end,
+                min_minutes))
+        })
+
+    return {
+        "schedule_id": own.schedule_id,
+        "friends": results,
+        "common_free_time": format_blocks(free_blocks(
+            busy_mask, day_start, day_end, min_minutes))
+    }
@@ -0,0 +1,223 @@
+import asyncio
+import json
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+import requests
+from bs4 import BeautifulSoup
+
+RATINGS_DB_PATH = Path(__file__).resolve().parents[2] / "cache" / \
+    "professor_ratings.sqlite3"
+RATING_TTL_SECONDS = 14 * 24 * 60 * 60  # ratings change on the order of weeks
+MAX_IN_MEMORY_RATINGS = 4096
+MAX_CONCURRENT_SCRAPES = 8
+SCRAPE_TIMEOUT_SECONDS = 10  # per request, connecting and reading each
+# Errors that mean Rate My Professors couldn't be reached, those results are
+# not cached so the next request tries again
+TRANSIENT_ERRORS = {"Failed to retrieve search results.",
+                    "Failed to retrieve professor page.",
+                    "Failed to reach Rate My Professors."}
+
+
+def scrape_professor_rating(professor_name):
+    # Construct the search URL
+    search_url = f"https://www.ratemyprofessors.com/search/professors/1100?q={professor_name.replace(' ', '%20')}"
+    headers = {
+        "User-Agent": "Mozilla/5.0"
+    }
+
+    # Send a GET request to the search page
+    response = requests.get(search_url, headers=headers,
+                            timeout=SCRAPE_TIMEOUT_SECONDS)
+    if response.status_code != 200:
+        return {"error": "Failed to retrieve search results."}
+
+    # Parse the search results page
+    soup = BeautifulSoup(response.text, 'html.parser')
+    # Find the first professor link
+    professor_link = soup.find('a', href=re.compile(r'/professor/\d+'))
+    if not professor_link:
+        return {"error": "Professor not found."}
+
+    # Construct the professor's page URL
+    professor_url = f"https://www.ratemyprofessors.com{professor_link['href']}"
+    # Send a GET request to the professor's page
+    prof_response = requests.get(professor_url, headers=headers,
+                                 timeout=SCRAPE_TIMEOUT_SECONDS)
+    if prof_response.status_code != 200:
+        return {"error": "Failed to retrieve professor page."}
+
+    # Parse the professor's page
+    prof_soup = BeautifulSoup(prof_response.text, 'html.parser')
+
+    # Extract overall rating
+    overall_rating_tag = prof_soup.find('div', class_='RatingValue__Numerator-qw8sqy-2')
+    overall_rating = overall_rating_tag.text.strip() if overall_rating_tag else "N/A"
+
+    # Extract level of difficulty
+    difficulty_tag = prof_soup.find('div', class_='FeedbackItem__FeedbackNumber-uof32n-1')
+    difficulty = difficulty_tag.text.strip() if difficulty_tag else "N/A"
+
+    # Extract "would take again" percentage
+    would_take_again_tag = prof_soup.find_all('div', class_='FeedbackItem__FeedbackNumber-uof32n-1')
+    would_take_again = would_take_again_tag[1].text.strip() if len(would_take_again_tag) > 1 else "N/A"
+
+    return {
+        "professor": professor_name,
+        "overall_rating": overall_rating,
+        "level_of_difficulty": difficulty,
+        "would_take_again": would_take_again
+    }
+
+
+def normalize_instructor_name(professor_name):
+    """Cache key of an instructor, ignores case and extra whitespace."""
+    return " ".join(professor_name.split()).casefold()
+
+
+class ProfessorRatingCache:
+    """Rate My Professors ratings cached by normalized instructor name.
+
+    Lookups check an in-process LRU first and then a SQLite table shared by
+    every worker, and both expire entries after ttl seconds. Only misses are
+    scraped, so a professor is scraped at most once per TTL no matter how
+    many sections or requests they show up in.
+    """
+
+    def __init__(self, db_path=RATINGS_DB_PATH, ttl=RATING_TTL_SECONDS,
+                 max_in_memory=MAX_IN_MEMORY_RATINGS,
+                 scrape=scrape_professor_rating):
+        self.db_path = Path(db_path)
+        self.ttl = ttl
+        self.max_in_memory = max_in_memory
+        self.scrape = scrape
+        self.in_memory = OrderedDict()  # name -> (rating, expires at)
+        self.lock = threading.Lock()
+        self.connection = None
+
+    def get_connection(self):
+        if self.connection is None:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            self.connection = sqlite3.connect(self.db_path,
+                                              check_same_thread=False)
+            self.connection.execute('''
+                CREATE TABLE IF NOT EXISTS professor_ratings (
+                    name TEXT PRIMARY KEY,
+                    rating TEXT NOT NULL,
+                    expires_at REAL NOT NULL
+                )
+            ''')
+
+        return self.connection
+
+    def remember(self, name, rating, expires_at):
+        self.in_memory[name] = (rating, expires_at)
+        self.in_memory.move_to_end(name)
+
+        while len(self.in_memory) > self.max_in_memory:
+            self.in_memory.popitem(last=False)
+
+    def get_cached(self, professor_name):
+        """Return the cached rating or None if it's missing or expired."""
+        name = normalize_instructor_name(professor_name)
+        now = time.time()
+
+        with self.lock:
+            if name in self.in_memory:
+                rating, expires_at = self.in_memory[name]
+                if expires_at > now:
+                    self.in_memory.move_to_end(name)
+                    return rating
+                del self.in_memory[name]
+
+            row = self.get_connection().execute(
+                "SELECT rating, expires_at FROM professor_ratings "
+                "WHERE name = ? AND expires_at > ?", (name, now)).fetchone()
+            if row is None:
+                return None
+
+            rating = json.loads(row[0])
+            self.remember(name, rating, row[1])
+
+            return rating
+
+    def set_cached(self, professor_name, rating):
+        if rating.get("error") in TRANSIENT_ERRORS:
+            return
+
+        name = normalize_instructor_name(professor_name)
+        expires_at = time.time() + self.ttl
+
+        with self.lock:
+            self.remember(name, rating, expires_at)
+            connection = self.get_connection()
+            connection.execute(
+                "INSERT OR REPLACE INTO professor_ratings "
+                "(name, rating, expires_at) VALUES (?, ?, ?)",
+                (name, json.dumps(rating), expires_at))
+            connection.commit()
+
+    def scrape_rating(self, professor_name):
+        """Scrape a rating, a timeout or connection error is a transient
+        error like any other failed request instead of an exception, so one
+        professor can't fail a whole batch.
+        """
+        try:
+            return self.scrape(professor_name)
+        except requests.RequestException:
+            return {"error": "Failed to reach Rate My Professors."}
+
+    def get_rating(self, professor_name):
+        rating = self.get_cached(professor_name)
+
+        if rating is None:
+            rating = self.scrape_rating(professor_name)
+            self.set_cached(professor_name, rating)
+
+        return rating
+
+    def get_ratings(self, professor_names):
+        """Batch lookup of every instructor in professor_names.
+
+        Names are deduplicated before anything is looked up and the misses
+        are scraped concurrently. Returns a dictionary from each name in
+        professor_names to its rating.
+        """
+        ratings_by_key = {}
+        misses = {}  # normalized name -> name to scrape with
+
+        for professor_name in professor_names:
+            name = normalize_instructor_name(professor_name)
+            if name in ratings_by_key or name in misses:
+                continue
+
+            rating = self.get_cached(professor_name)
+            if rating is None:
+                misses[name] = professor_name
+            else:
+                ratings_by_key[name] = rating
+
+        if misses:
+            with ThreadPoolExecutor(
+                    max_workers=min(MAX_CONCURRENT_SCRAPES, len(misses))
+            ) as executor:
+                scraped = executor.map(self.scrape_rating, misses.values())
+
+                for (name, professor_name), rating in zip(misses.items(),
+                                                          scraped):
+                    self.set_cached(professor_name, rating)
+                    ratings_by_key[name] = rating
+
+        return {professor_name:
+                ratings_by_key[normalize_instructor_name(professor_name)]
+                for professor_name in professor_names}
+
+    async def get_ratings_async(self, professor_names):
+        return await asyncio.to_thread(self.get_ratings, professor_names)
+
+
+professor_rating_cache = ProfessorRatingCache()
@@ -0,0 +1,152 @@
+from functools import lru_cache
+from data_templates.time_slots import SLOT_MINUTES, blackout_mask, \
+    time_to_minutes
+
+MAX_FILTER_RESULTS_PER_SECTION = 64
+
+
+def parse_threshold(value):
+    """Number from a filter or rating string (e.g., "4.5" or "80%").
+
+    Returns None for empty and non-numeric values (N/A, ...).
+    """
+    try:
+        return float(str(value).strip().rstrip("%"))
+    except ValueError:
+        return None
+
+
+def off_slot_minutes(time):
+    """Minutes of a filter time that isn't on a slot boundary (e.g., 0727),
+    None for one that is or an empty one.
+
+    The blackout mask only covers the slots entirely outside such a bound,
+    so a section meeting in the slot it falls in is compared to it exactly.
+    """
+    if not time or time_to_minutes(time) % SLOT_MINUTES == 0:
+        return None
+
+    return time_to_minutes(time)
+
+
+class CompiledScheduleFilters:
+    """Schedule filters parsed once into a week mask and numeric thresholds.
+
+    Instances are hashable and equal when they filter the same way, so they
+    can key caches of filter results. Build them with compile_filters.
+    """
+
+    def __init__(self, blackout_mask, min_instructor_rating,
+                 max_level_of_difficulty, min_would_take_again,
+                 earliest_minutes=None, latest_minutes=None):
+        self.blackout_mask = blackout_mask  # int: time slots a section
+        # can't meet in (see data_templates.time_slots)
+        self.earliest_minutes = earliest_minutes  # int or None: see
+        # off_slot_minutes
+        self.latest_minutes = latest_minutes  # int or None
+        self.min_instructor_rating = min_instructor_rating  # float or None
+        self.max_level_of_difficulty = max_level_of_difficulty  # float or
+        # None
+        self.min_would_take_again = min_would_take_again  # float or None
+
+    def key(self):
+        return (self.blackout_mask, self.min_instructor_rating,
+                self.max_level_of_difficulty, self.min_would_take_again,
+                self.earliest_minutes, self.latest_minutes)
+
+    def __eq__(self, other):
+        return (isinstance(other, CompiledScheduleFilters) and
+                self.key() == other.key())
+
+    def __hash__(self):
+        return hash(self.key())
+
+    def check(self, semester_course):
+        if semester_course.time_mask & self.blackout_mask:
+            return False
+        if (self.earliest_minutes is not None or
+                self.latest_minutes is not None) and not self.within_bounds(
+                semester_course.times):
+            return False
+
+        # Sections without a rating (Staff, N/A) aren't filtered out by it
+        if self.min_instructor_rating is not None and (
+                semester_course.instructors != ["Staff"]):
+            ratings = [parse_threshold(rating) for rating in
+                       semester_course.instructor_ratings]
+            ratings = [rating for rating in ratings if rating is not None]
+            if ratings and min(ratings) < self.min_instructor_rating:
+                return False
+        if self.max_level_of_difficulty is not None:
+            level_of_difficulty = parse_threshold(
+                semester_course.level_of_difficulty)
+            if level_of_difficulty is not None and (
+                    level_of_difficulty > self.max_level_of_difficulty):
+                return False
+        if self.min_would_take_again is not None:
+            would_take_again = parse_threshold(
+                semester_course.would_take_again)
+            if would_take_again is not None and (
+                    would_take_again < self.min_would_take_again):
+                return False
+
+        return True
+
+    def within_bounds(self, times):
+        """Whether every meeting of a section's times starts no earlier than
+        earliest_minutes and ends no later than latest_minutes.
+        """
+        for time_for_location in times:
+            for start_time, end_time, *_ in time_for_location.values():
+                if self.earliest_minutes is not None and (
+                        time_to_minutes(start_time) < self.earliest_minutes):
+                    return False
+                if self.latest_minutes is not None and (
+                        time_to_minutes(end_time) > self.latest_minutes):
+                    return False
+
+        return True
+
+    def passes(self, semester_course):
+        """Memoized check, the result is stored on the section itself."""
+        results = semester_course.filter_results
+
+        if self not in results:
+            if len(results) >= MAX_FILTER_RESULTS_PER_SECTION:
+                results.clear()
+            results[self] = self.check(semester_course)
+
+        return results[self]
+
+
+@lru_cache(maxsize=1024)
+def compile_canonical_filters(earliest_time, latest_time, period_blackouts,
+                              day_blackouts, min_instructor_rating,
+                              max_level_of_difficulty, min_would_take_again):
+    return CompiledScheduleFilters(
+        blackout_mask(earliest_time, latest_time, period_blackouts,
+                      day_blackouts),
+        parse_threshold(min_instructor_rating) if min_instructor_rating
+        else None,
+        parse_threshold(max_level_of_difficulty) if max_level_of_difficulty
+        else None,
+        parse_threshold(min_would_take_again) if min_would_take_again
+        else None,
+        off_slot_minutes(earliest_time), off_slot_minutes(latest_time))
+
+
+def compile_filters(earliest_time="", latest_time="", period_blackouts=None,
+                    day_blackouts=None, min_instructor_rating="",
+                    max_level_of_difficulty="", min_would_take_again=""):
+    """Compile the scheduler's filter arguments, same requests share the
+    result.
+
+    Blackout lists are deduplicated and sorted first so the order they're
+    given in doesn't matter.
+    """
+    return compile_canonical_filters(
+        earliest_time or "", latest_time or "",
+        tuple(sorted(set(period_blackouts or ()), key=str)),
+        tuple(sorted(set(day_blackouts or ()))),
+        str(min_instructor_rating or ""), str(max_level_of_difficulty or ""),
+        str(min_would_take_again or ""))
@@ -0,0 +1,183 @@
+import heapq
+from itertools import count
+from data_templates.time_slots import DAY_MASK, SLOT_MINUTES, SLOTS_PER_DAY, \
+    WEEK_DAYS, time_to_minutes
+
+# How much each part of a schedule's score counts, users can override any of
+# them. Section scores are rewards: the instructor rating (out of 5), would
+# take again (out of 100, scaled to 5) and minus the level of difficulty (out
+# of 5). Schedule scores are penalties: hours of gaps between classes on the
+# same day, hours the earliest class of the week starts before
+# EARLY_START_CUTOFF and the number of days on campus.
+DEFAULT_SCORE_WEIGHTS = {
+    "instructor_rating": 1.0,
+    "level_of_difficulty": 1.0,
+    "would_take_again": 1.0,
+    "gaps": 1.0,
+    "early_start": 1.0,
+    "days_on_campus": 1.0,
+}
+EARLY_START_CUTOFF = "1000"
+
+# Ratings that are missing (N/A, Staff sections, ...) count as average
+NEUTRAL_INSTRUCTOR_RATING = 2.5
+NEUTRAL_LEVEL_OF_DIFFICULTY = 2.5
+NEUTRAL_WOULD_TAKE_AGAIN = 50.0
+
+
+def parse_rating(value, default):
+    try:
+        return float(str(value).strip().rstrip("%"))
+    except ValueError:
+        return default
+
+
+def section_score(semester_course, weights):
+    ratings = [parse_rating(rating, None) for rating in
+               semester_course.instructor_ratings]
+    ratings = [rating for rating in ratings if rating is not None]
+    instructor_rating = min(ratings) if ratings else NEUTRAL_INSTRUCTOR_RATING
+    level_of_difficulty = parse_rating(semester_course.level_of_difficulty,
+                                       NEUTRAL_LEVEL_OF_DIFFICULTY)
+    would_take_again = parse_rating(semester_course.would_take_again,
+                                    NEUTRAL_WOULD_TAKE_AGAIN)
+
+    return (weights["instructor_rating"] * instructor_rating -
+            weights["level_of_difficulty"] * level_of_difficulty +
+            weights["would_take_again"] * would_take_again / 20)
+
+
+def day_masks(time_mask):
+    return [(time_mask >> (day_index * SLOTS_PER_DAY)) & DAY_MASK
+            for day_index in range(len(WEEK_DAYS))]
+
+
+def days_on_campus(time_mask):
+    return sum(1 for day_mask in day_masks(time_mask) if day_mask)
+
+
+def early_start_hours(time_mask):
+    """Hours the week's earliest class starts before EARLY_START_CUTOFF."""
+    start_slots = [(day_mask & -day_mask).bit_length() - 1 for day_mask in
+                   day_masks(time_mask) if day_mask]
+
+    if not start_slots:
+        return 0
+
+    minutes_early = (time_to_minutes(EARLY_START_CUTOFF) -
+                     min(start_slots) * SLOT_MINUTES)
+
+    return max(minutes_early, 0) / 60
+
+
+def gap_hours(time_mask):
+    """Hours between the first and last class of each day not in class."""
+    gap_slots = 0
+
+    for day_mask in day_masks(time_mask):
+        if day_mask:
+            first_slot = (day_mask & -day_mask).bit_length() - 1
+            span = day_mask.bit_length() - first_slot
+            gap_slots += span - day_mask.bit_count()
+
+    return gap_slots * SLOT_MINUTES / 60
+
+
+def growing_penalty(time_mask, weights):
+    """Penalties that can only grow as classes are added to a schedule."""
+    return (weights["early_start"] * early_start_hours(time_mask) +
+            weights["days_on_campus"] * days_on_campus(time_mask))
+
+
+def schedule_penalty(time_mask, weights):
+    return (growing_penalty(time_mask, weights) +
+            weights["gaps"] * gap_hours(time_mask))
+
+
+def top_semester_schedules(conflict_index, section_ids_grouped_by_code,
+                           search_order, k, weights=None, should_stop=None):
+    """Return the k best scoring valid schedules as (score, schedule) pairs.
+
+    The search is the scheduler's backtracking search with branch-and-bound
+    on top: the best k schedules so far are kept in a min-heap and a partial
+    schedule is dropped as soon as the best score it could still reach is
+    no better than the worst of them. That bound is the partial score plus
+    the best section score left for every remaining course, minus the
+    penalties that can only grow (gaps can shrink when a class fills them,
+    so they don't count toward the bound). Weights can't be negative or the
+    bound wouldn't hold. The search ends early once should_stop returns
+    True.
+    """
+    weights = {**DEFAULT_SCORE_WEIGHTS, **(weights or {})}
+
+    if any(weight < 0 for weight in weights.values()):
+        raise ValueError("Schedule score weights can't be negative")
+
+    sections = conflict_index.sections
+    section_scores = {
+        section_id: section_score(sections[section_id], weights)
+        for section_ids in section_ids_grouped_by_code
+        for section_id in section_ids
+    }
+    # Best sections first so good schedules fill the heap early
+    groups = [sorted(section_ids_grouped_by_code[course_index],
+                     key=lambda section_id: -section_scores[section_id])
+              for course_index in search_order]
+
+    if k <= 0 or any(not group for group in groups):
+        return []
+
+    # best_remaining[depth] is the best possible score of courses depth..end
+    best_remaining = [0.0] * (len(groups) + 1)
+    for depth in range(len(groups) - 1, -1, -1):
+        best_remaining[depth] = (best_remaining[depth + 1] +
+                                 section_scores[groups[depth][0]])
+
+    top_schedules = []  # min-heap of (score, tiebreaker, section IDs)
+    tiebreaker = count()
+    chosen_section_ids = [None] * len(groups)
+
+    def search(depth, chosen_bits, time_mask, partial_score):
+        if should_stop is not None and should_stop():
+            return
+
+        if depth == len(groups):
+            score = partial_score - schedule_penalty(time_mask, weights)
+            entry = (score, next(tiebreaker), tuple(chosen_section_ids))
+
+            if len(top_schedules) < k:
+                heapq.heappush(top_schedules, entry)
+            elif score > top_schedules[0][0]:
+                heapq.heapreplace(top_schedules, entry)
+            return
+
+        penalty = growing_penalty(time_mask, weights)
+
+        for section_id in groups[depth]:
+            bound = (partial_score + section_scores[section_id] +
+                     best_remaining[depth + 1] - penalty)
+
+            # Sections are sorted by score, so no later one can do better
+            if len(top_schedules) == k and bound <= top_schedules[0][0]:
+                break
+            if conflict_index.conflicts_with(section_id, chosen_bits):
+                continue
+
+            chosen_section_ids[depth] = section_id
+            search(depth + 1, chosen_bits | 1 << section_id,
+                   time_mask | sections[section_id].time_mask,
+                   partial_score + section_scores[section_id])
+
+        chosen_section_ids[depth] = None
+
+    search(0, 0, 0, 0.0)
+
+    # Put every schedule back in the requested course order
+    top_semester_schedules = []
+    for score, _, section_ids in sorted(top_schedules, reverse=True):
+        schedule = [None] * len(search_order)
+        for depth, course_index in enumerate(search_order):
+            schedule[course_index] = sections[section_ids[depth]]
+        top_semester_schedules.append((score, schedule))
+
+    return top_semester_schedules
@@ -0,0 +1,144 @@
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+import asyncpg
+from semester_scheduling.schedule_filters import compile_filters
+
+MAX_IN_MEMORY_RESULTS = 1024
+
+# Results are shared between app workers through the schedule_results table
+# (made by migration 4, see src/db/migrations.py). Rows belong to a section
+# snapshot, so they're deleted along with it when a newer snapshot is
+# ingested.
+SCHEDULE_RESULT_QUERY = '''
+    SELECT codes, result FROM schedule_results
+    WHERE key = $1 AND snapshot_id = $2
+'''
+
+INSERT_SCHEDULE_RESULT = '''
+    INSERT INTO schedule_results (key, snapshot_id, codes, result)
+    VALUES ($1, $2, $3, $4) ON CONFLICT (key) DO NOTHING
+'''
+
+
+def schedule_result_key(kind, codes, filters, snapshot_id, options=None):
+    """Cache key of a schedule search.
+
+    kind is the kind of search (e.g., "generate" or "top"), filters are the
+    scheduler's filter arguments and options anything else the result
+    depends on (result limits, score weights, ...). The course codes are
+    sorted and the filters compiled first, so requests that only differ in
+    their order or in how a filter is spelled share a key.
+    """
+    key = json.dumps([
+        kind, snapshot_id, sorted(set(codes)),
+        list(compile_filters(**filters).key()), options or {}
+    ], sort_keys=True)
+
+    return hashlib.sha256(key.encode()).hexdigest()
+
+
+class ScheduleResultCache:
+    """Results of schedule searches, for every user asking the same thing.
+
+    A small LRU in memory sits in front of the schedule_results table in
+    Postgres, which is shared by every app worker. Without a connection
+    (e.g., before a section snapshot is ingested) only the in-memory LRU is
+    used. Every result is stored under the section snapshot it was computed
+    from, and in-memory results of older snapshots are dropped as soon as a
+    newer one shows up.
+    """
+
+    def __init__(self, max_in_memory=MAX_IN_MEMORY_RESULTS):
+        self.max_in_memory = max_in_memory
+        self.results = OrderedDict()  # key -> (codes, result), least
+        # recently used first
+        self.snapshot_id = None  # snapshot of the results in memory
+        self.stats = {"hits": 0, "shared_hits": 0, "misses": 0,
+                      "evictions": 0, "invalidations": 0, "errors": 0}
+        self.lock = threading.Lock()
+
+    def use_snapshot(self, snapshot_id):
+        # Caller holds the lock
+        if snapshot_id != self.snapshot_id:
+            self.stats["invalidations"] += len(self.results)
+            self.results.clear()
+            self.snapshot_id = snapshot_id
+
+    def get_cached(self, key, snapshot_id):
+        with self.lock:
+            self.use_snapshot(snapshot_id)
+
+            if key not in self.results:
+                return None
+
+            self.results.move_to_end(key)
+            self.stats["hits"] += 1
+
+            return self.results[key]
+
+    def set_cached(self, key, snapshot_id, codes, result):
+        with self.lock:
+            self.use_snapshot(snapshot_id)
+            self.results[key] = (list(codes), result)
+            self.results.move_to_end(key)
+
+            while len(self.results) > self.max_in_memory:
+                self.results.popitem(last=False)
+                self.stats["evictions"] += 1
+
+    async def get(self, key, snapshot_id, connection=None):
+        """Return (codes, result) for a key, None on a miss.
+
+        codes is the order of the courses in the result's schedules.
+        """
+        cached = self.get_cached(key, snapshot_id)
+
+        if cached is not None:
+            return cached
+
+        if connection is not None and snapshot_id is not None:
+            try:
+                row = await connection.fetchrow(SCHEDULE_RESULT_QUERY, key,
+                                                snapshot_id)
+            except (asyncpg.PostgresError, OSError):
+                row = None
+                self.stats["errors"] += 1
+
+            if row is not None:
+                codes, result = list(row["codes"]), json.loads(row["result"])
+                self.set_cached(key, snapshot_id, codes, result)
+                self.stats["shared_hits"] += 1
+
+                return codes, result
+
+        self.stats["misses"] += 1
+
+        return None
+
+    async def set(self, key, snapshot_id, codes, result, connection=None):
+        self.set_cached(key, snapshot_id, codes, result)
+
+        if connection is not None and snapshot_id is not None:
+            try:
+                await connection.execute(INSERT_SCHEDULE_RESULT, key,
+                                         snapshot_id, list(codes),
+                                         json.dumps(result))
+            except (asyncpg.PostgresError, OSError):
+                self.stats["errors"] += 1
+
+    def get_stats(self):
+        with self.lock:
+            lookups = (self.stats["hits"] + self.stats["shared_hits"] +
+                       self.stats["misses"])
+            hit_rate = (self.stats["hits"] + self.stats["shared_hits"]) / \
+                lookups if lookups else 0.0
+
+            return {**self.stats, "hit_rate": hit_rate,
+                    "in_memory": len(self.results),
+                    "max_in_memory": self.max_in_memory,
+                    "snapshot_id": self.snapshot_id}
+
+
+schedule_result_cache = ScheduleResultCache()  # shared by every request
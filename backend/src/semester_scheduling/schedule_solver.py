@@ -0,0 +1,232 @@
+import asyncio
+import functools
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+from semester_scheduling.section_conflict_index import \
+    get_snapshot_conflict_index
+from semester_scheduling.semester_schedule import SemesterScheduler, \
+    semester_course_to_dict
+
+MAX_CONCURRENT_SOLVES = 64  # solves that can be queued or running at once
+DISCONNECT_POLL_SECONDS = 0.1
+STOP_CHECK_INTERVAL = 256  # search steps between time budget checks
+
+cancel_flags = None  # shared with the worker processes, one per solve slot
+
+
+class SolverBusyError(Exception):
+    pass
+
+
+class ClientDisconnectedError(Exception):
+    pass
+
+
+class InvalidCursorError(ValueError):
+    pass
+
+
+def init_worker(shared_cancel_flags):
+    global cancel_flags
+    cancel_flags = shared_cancel_flags
+
+
+def is_slot_cancelled(cancel_slot):
+    return cancel_flags is not None and bool(cancel_flags[cancel_slot])
+
+
+class SearchBudget:
+    """should_stop callable for a search with a deadline and a way of being
+    cancelled.
+
+    deadline is a time.time() timestamp, so it can be set when a search is
+    submitted and still be right in the worker process running it: time
+    spent queued counts against the budget, and a search whose deadline
+    passed while it was queued stops before its first step. is_cancelled is
+    called to check if the search was cancelled. Checking the clock and
+    is_cancelled costs more than a search step, so they're only looked at
+    every STOP_CHECK_INTERVAL steps.
+    """
+
+    def __init__(self, deadline, is_cancelled=None):
+        self.deadline = deadline
+        self.is_cancelled = is_cancelled
+        self.steps = 0
+        self.stopped_by = None  # "time" or "cancelled" once it has stopped
+        if time.time() > deadline:
+            self.stopped_by = "time"
+
+    def __call__(self):
+        if self.stopped_by is not None:
+            return True
+
+        self.steps += 1
+        if self.steps % STOP_CHECK_INTERVAL:
+            return False
+
+        if self.is_cancelled is not None and self.is_cancelled():
+            self.stopped_by = "cancelled"
+        elif time.time() > self.deadline:
+            self.stopped_by = "time"
+
+        return self.stopped_by is not None
+
+
+def get_worker_scheduler(semester_class_data, snapshot_id):
+    # Each worker keeps its own conflict index for the current snapshot
+    conflict_index = get_snapshot_conflict_index(snapshot_id) if (
+        snapshot_id is not None) else None
+    scheduler = SemesterScheduler(list(semester_class_data), conflict_index)
+    scheduler.semester_class_data = semester_class_data
+    scheduler.snapshot_id = snapshot_id
+
+    return scheduler
+
+
+def page_semester_schedules(cancel_slot, deadline, semester_class_data,
+                            snapshot_id, filters, resume_after, max_results):
+    """Run in a worker process: find up to max_results valid schedules after
+    the search position resume_after (None to start from the beginning).
+
+    Returns the schedules as (list of section dictionaries, position) pairs
+    and what stopped the search early ("results", "time" or "cancelled"),
+    None if it ran to the end. Passing the last position back as
+    resume_after continues the search, so it can be run a page at a time.
+    Raises InvalidCursorError if resume_after isn't a position of the
+    search.
+    """
+    budget = SearchBudget(deadline, functools.partial(is_slot_cancelled,
+                                                      cancel_slot))
+    if budget.stopped_by is not None:
+        return {"schedules": [], "stopped_by": budget.stopped_by}
+
+    scheduler = get_worker_scheduler(semester_class_data, snapshot_id)
+    scheduler.prepare_semester_schedule_search(**filters)
+    if resume_after is not None and not scheduler.is_search_position(
+            resume_after):
+        raise InvalidCursorError(resume_after)
+    schedules = []
+    stopped_by = None
+
+    for schedule, positions in scheduler.iter_valid_semester_schedules(
+            resume_after, should_stop=budget):
+        schedules.append(([semester_course_to_dict(course) for course in
+                           schedule], positions))
+
+        if len(schedules) == max_results:
+            stopped_by = "results"
+            break
+
+    return {"schedules": schedules,
+            "stopped_by": stopped_by or budget.stopped_by}
+
+
+def solve_semester_schedules(cancel_slot, deadline, semester_class_data,
+                             snapshot_id, filters, max_results):
+    """Run in a worker process: find up to max_results valid schedules.
+
+    Returns the schedules as dictionaries and what stopped the search
+    early, like page_semester_schedules.
+    """
+    result = page_semester_schedules(cancel_slot, deadline,
+                                     semester_class_data, snapshot_id,
+                                     filters, None, max_results)
+
+    return {"schedules": [schedule for schedule, _ in result["schedules"]],
+            "stopped_by": result["stopped_by"]}
+
+
+def rank_semester_schedules(cancel_slot, deadline, semester_class_data,
+                            snapshot_id, filters, k, weights):
+    """Run in a worker process: find the k best scoring valid schedules."""
+    budget = SearchBudget(deadline, functools.partial(is_slot_cancelled,
+                                                      cancel_slot))
+    if budget.stopped_by is not None:
+        return {"schedules": [], "stopped_by": budget.stopped_by}
+
+    scheduler = get_worker_scheduler(semester_class_data, snapshot_id)
+    top_schedules = scheduler.get_top_semester_schedules(
+        k=k, weights=weights, should_stop=budget, **filters)
+
+    return {"schedules": [
+                {"score": score,
+                 "schedule": [semester_course_to_dict(course) for course in
+                              schedule]}
+                for score, schedule in top_schedules
+            ],
+            "stopped_by": budget.stopped_by}
+
+
+class ScheduleSolverPool:
+    """Runs schedule searches in worker processes, off the event loop.
+
+    A CPU heavy search can't hold the GIL of the worker serving the app's
+    other routes this way. Every solve gets a slot in a shared array of
+    cancel flags, which the search checks while it runs, so a solve can be
+    stopped when its client goes away instead of running to its time
+    budget.
+    """
+
+    def __init__(self, max_workers=None, max_concurrent=MAX_CONCURRENT_SOLVES):
+        context = multiprocessing.get_context("spawn")
+        self.cancel_flags = context.Array("b", max_concurrent, lock=False)
+        self.free_slots = list(range(max_concurrent))
+        self.executor = ProcessPoolExecutor(
+            max_workers=max_workers, mp_context=context,
+            initializer=init_worker, initargs=(self.cancel_flags,))
+
+    async def run(self, request, solve, time_budget, *args):
+        """Run solve(cancel slot, deadline, *args) in a worker and return its
+        result. The deadline is time_budget seconds from now (see
+        SearchBudget), waiting for a free worker included.
+
+        Raises SolverBusyError when every slot is taken and
+        ClientDisconnectedError if the client disconnects first.
+        """
+        if not self.free_slots:
+            raise SolverBusyError()
+
+        loop = asyncio.get_running_loop()
+        slot = self.free_slots.pop()
+        self.cancel_flags[slot] = 0
+        future = self.executor.submit(solve, slot, time.time() + time_budget,
+                                      *args)
+        # The slot is only reused once the worker is really done with it
+        future.add_done_callback(
+            lambda _: loop.call_soon_threadsafe(self.free_slots.append, slot))
+        result = asyncio.wrap_future(future)
+
+        while True:
+            done, _ = await asyncio.wait({result},
+                                         timeout=DISCONNECT_POLL_SECONDS)
+            if done:
+                return result.result()
+
+            if await request.is_disconnected():
+                self.cancel_flags[slot] = 1
+                future.cancel()
+                raise ClientDisconnectedError()
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+schedule_solver_pool = None  # shared by every request
+
+
+def get_schedule_solver_pool():
+    global schedule_solver_pool
+
+    if schedule_solver_pool is None:
+        schedule_solver_pool = ScheduleSolverPool()
+
+    return schedule_solver_pool
+
+
+def close_schedule_solver_pool():
+    global schedule_solver_pool
+
+    if schedule_solver_pool is not None:
+        schedule_solver_pool.shutdown()
+        schedule_solver_pool = None
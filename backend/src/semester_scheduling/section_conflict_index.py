@@ -0,0 +1,135 @@
+import threading
+from collections import OrderedDict
+
+MAX_FILTERED_SECTION_SETS = 1024  # (course, filters) pairs cached per index
+
+
+class SectionConflictIndex:
+    """Pairwise conflict table for semester course sections.
+
+    Every section added to the index gets an integer ID (its position in
+    self.sections) and self.conflicts[section_id] is a Python int used as a
+    bitset: bit j is set when section j can't be taken together with it.
+    The table is filled in once, when a course is added, so checking a
+    schedule afterward is only bitwise ANDs instead of comparing meeting
+    time strings again.
+
+    One index can be shared by every request for the same term snapshot.
+    Courses are added lazily, so it only ever holds the courses that
+    somebody actually asked for.
+    """
+
+    def __init__(self):
+        self.sections = []  # section ID -> SemesterCourse
+        self.conflicts = []  # section ID -> bitset of conflicting IDs
+        self.section_ids_by_code = {}  # course code -> list of section IDs
+        self.filtered_section_sets = OrderedDict()  # (course code,
+        # compiled filters) -> IDs of the course's sections passing them,
+        # least recently used first
+        self.lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.sections)
+
+    def add_course(self, code, sections):
+        """Index the sections of a course and return their section IDs.
+
+        A course that is already in the index is not compared again, its
+        existing section IDs are returned instead.
+        """
+        with self.lock:
+            if code in self.section_ids_by_code:
+                return self.section_ids_by_code[code]
+
+            return self.index_course(code, sections)
+
+    def index_course(self, code, sections):
+        section_ids = []
+
+        for section in sections:
+            new_id = len(self.sections)
+            conflict_bits = 0
+
+            for other_id, other in enumerate(self.sections):
+                if not section.is_compatible(other):
+                    conflict_bits |= 1 << other_id
+                    self.conflicts[other_id] |= 1 << new_id
+
+            self.sections.append(section)
+            self.conflicts.append(conflict_bits)
+            section_ids.append(new_id)
+
+        self.section_ids_by_code[code] = section_ids
+
+        return section_ids
+
+    def filtered_section_ids(self, code, filters):
+        """Return the IDs of a course's sections that pass some filters.
+
+        filters is a schedule_filters.CompiledScheduleFilters. Repeated
+        searches with the same filters reuse the earlier result, the course
+        has to be added first.
+        """
+        key = (code, filters)
+
+        with self.lock:
+            if key in self.filtered_section_sets:
+                self.filtered_section_sets.move_to_end(key)
+                return self.filtered_section_sets[key]
+
+            section_ids = [section_id for section_id in
+                           self.section_ids_by_code[code]
+                           if filters.passes(self.sections[section_id])]
+            self.filtered_section_sets[key] = section_ids
+
+            if len(self.filtered_section_sets) > MAX_FILTERED_SECTION_SETS:
+                self.filtered_section_sets.popitem(last=False)
+
+            return section_ids
+
+    def conflicts_with(self, section_id, chosen_bits):
+        """Check a section against a bitset of already chosen section IDs."""
+        return self.conflicts[section_id] & chosen_bits != 0
+
+    def is_valid_schedule(self, section_ids):
+        chosen_bits = 0
+
+        for section_id in section_ids:
+            if self.conflicts_with(section_id, chosen_bits):
+                return False
+            chosen_bits |= 1 << section_id
+
+        return True
+
+    def fitting_sections(self, code, chosen_section_ids):
+        """Return the IDs of a course's sections that fit a schedule.
+
+        This answers "fits my schedule" queries: chosen_section_ids is the
+        schedule the student already has.
+        """
+        chosen_bits = 0
+
+        for section_id in chosen_section_ids:
+            chosen_bits |= 1 << section_id
+
+        return [section_id for section_id in
+                self.section_ids_by_code.get(code, [])
+                if not self.conflicts_with(section_id, chosen_bits)]
+
+
+snapshot_conflict_indexes = {}  # section snapshot ID -> SectionConflictIndex
+snapshot_conflict_indexes_lock = threading.Lock()
+
+
+def get_snapshot_conflict_index(snapshot_id):
+    """Return the index shared by every scheduler reading a snapshot.
+
+    Sections never change within a snapshot, so their conflicts only have
+    to be computed once. Only the newest snapshot's index is kept.
+    """
+    with snapshot_conflict_indexes_lock:
+        if snapshot_id not in snapshot_conflict_indexes:
+            snapshot_conflict_indexes.clear()
+            snapshot_conflict_indexes[snapshot_id] = SectionConflictIndex()
+
+        return snapshot_conflict_indexes[snapshot_id]
@@ -0,0 +1,100 @@
+import asyncio
+import json
+import time
+from urllib.parse import urlsplit
+import httpx
+from semester_scheduling.soc_api import SOC_SCHEDULE_URL, TERM, \
+    soc_schedule_url
+
+
+class HostRateLimiter:
+    """Spaces out requests so each host gets at most requests_per_second."""
+
+    def __init__(self, requests_per_second):
+        self.interval = 1 / requests_per_second if requests_per_second else 0
+        self.next_request_times = {}  # host -> earliest time of next request
+        self.lock = asyncio.Lock()
+
+    async def wait(self, host):
+        async with self.lock:
+            now = time.monotonic()
+            request_time = max(now, self.next_request_times.get(host, now))
+            self.next_request_times[host] = request_time + self.interval
+
+        if request_time > now:
+            await asyncio.sleep(request_time - now)
+
+
+class SectionFetcher:
+    """Concurrent client for the UF schedule API.
+
+    Every request goes through one pooled httpx.AsyncClient, at most
+    max_concurrency requests are in flight at once and each host is rate
+    limited, so fetching all of a query's course codes in parallel doesn't
+    flood One.UF.
+    """
+
+    def __init__(self, base_url=SOC_SCHEDULE_URL, max_concurrency=8,
+                 requests_per_second=10, timeout=5):
+        self.base_url = base_url  # point this at a stub server to run offline
+        self.semaphore = asyncio.Semaphore(max_concurrency)
+        self.rate_limiter = HostRateLimiter(requests_per_second)
+        self.client = httpx.AsyncClient(
+            timeout=timeout,
+            limits=httpx.Limits(max_connections=max_concurrency,
+                                max_keepalive_connections=max_concurrency))
+
+    async def fetch_json(self, url):
+        async with self.semaphore:
+            await self.rate_limiter.wait(urlsplit(url).netloc)
+            response = await self.client.get(url)
+            response.raise_for_status()
+
+            return response.json()
+
+    async def fetch_course(self, course_code, term=TERM):
+        """Return the API response for one course code, None on failure."""
+        url = soc_schedule_url(course_code, term=term, base_url=self.base_url)
+
+        try:
+            return await self.fetch_json(url)
+        except (httpx.HTTPError, json.JSONDecodeError) as e:
+            print(f"Error fetching data for {course_code}: {e}")
+            return None
+
+    async def fetch_courses(self, course_codes, term=TERM):
+        """Fetch every course code in parallel.
+
+        Returns a dictionary from course code to API response (None for the
+        codes that failed) in the same order as course_codes.
+        """
+        responses = await asyncio.gather(*(
+            self.fetch_course(course_code, term) for course_code in
+            course_codes
+        ))
+
+        return dict(zip(course_codes, responses))
+
+    async def aclose(self):
+        await self.client.aclose()
+
+
+section_fetcher = None  # shared by every request, see get_section_fetcher
+
+
+def get_section_fetcher():
+    """Return the process-wide SectionFetcher, creating it on first use."""
+    global section_fetcher
+
+    if section_fetcher is None:
+        section_fetcher = SectionFetcher()
+
+    return section_fetcher
+
+
+async def close_section_fetcher():
+    global section_fetcher
+
+    if section_fetcher is not None:
+        await section_fetcher.aclose()
+        section_fetcher = None
@@ -0,0 +1,102 @@
+import json
+import asyncpg
+from data_templates.semester_course import SemesterCourse
+from semester_scheduling.soc_api import TERM, soc_schedule_url
+
+# A snapshot is one full pull of a term's sections. Only one snapshot per
+# term is current, schedulers read from it instead of calling the UF API. The
+# section_snapshots and sections tables are made by migration 4 (see
+# src/db/migrations.py).
+SECTION_COLUMNS = (
+    "snapshot_id", "code", "unique_id", "credit", "name", "subject", "times",
+    "locations", "instructors", "instructor_ratings", "mode_type",
+    "final_exam_date", "class_dates", "department", "gen_ed",
+    "level_of_difficulty", "would_take_again"
+)
+
+CURRENT_SNAPSHOT_QUERY = '''
+    SELECT id FROM section_snapshots WHERE term = $1 AND is_current
+'''
+
+SECTIONS_QUERY = '''
+    SELECT * FROM sections WHERE snapshot_id = $1 AND code = ANY($2::text[])
+    ORDER BY code, unique_id
+'''
+
+
+def section_record(snapshot_id, semester_course):
+    """sections row for a SemesterCourse, ordered like SECTION_COLUMNS."""
+    gen_ed = semester_course.gen_ed if isinstance(semester_course.gen_ed,
+                                                  list) else []
+
+    # Stored like the API's course codes (MAC2313, not MAC 2313) so rows can
+    # be looked up with the codes users ask for
+    code = semester_course.code.replace(" ", "")
+
+    return (
+        snapshot_id, code, str(semester_course.unique_id),
+        str(semester_course.credit), semester_course.name,
+        semester_course.subject, json.dumps(semester_course.times),
+        semester_course.locations, semester_course.instructors,
+        semester_course.instructor_ratings, semester_course.mode_type,
+        semester_course.final_exam_date, semester_course.class_dates,
+        semester_course.department, gen_ed,
+        semester_course.level_of_difficulty, semester_course.would_take_again
+    )
+
+
+def semester_course_from_row(row):
+    credit = row["credit"]
+
+    return SemesterCourse(
+        code=row["code"],
+        credit=int(credit) if credit and credit.isdigit() else credit,
+        name=row["name"],
+        subject=row["subject"],
+        unique_id=row["unique_id"],
+        times=json.loads(row["times"]),
+        locations=list(row["locations"]),
+        instructors=list(row["instructors"]),
+        instructor_ratings=list(row["instructor_ratings"]),
+        mode_type=row["mode_type"],
+        final_exam_date=row["final_exam_date"],
+        class_dates=row["class_dates"],
+        department=row["department"],
+        gen_ed=list(row["gen_ed"]),
+        level_of_difficulty=row["level_of_difficulty"],
+        would_take_again=row["would_take_again"]
+    )
+
+
+async def fetch_term_courses(fetcher, term=TERM):
+    """Yield every course of a term from the UF schedule API.
+
+    Leaving the course code empty returns the whole term one page at a
+    time; each page's LASTCONTROLNUMBER is where the next page starts.
+    """
+    last_control_number = 0
+
+    while True:
+        url = soc_schedule_url("", last_control_number, term,
+                               fetcher.base_url)
+        pages = await fetcher.fetch_json(url)
+        page = pages[0] if pages else {}
+        courses = page.get("COURSES", [])
+
+        for course in courses:
+            yield course
+
+        next_control_number = page.get("LASTCONTROLNUMBER", 0)
+        if not courses or next_control_number <= last_control_number:
+            break
+        last_control_number = next_control_number
+
+
+async def get_current_snapshot_id(connection, term=TERM):
+    """ID of the term's current section snapshot, None if there isn't one
+    (e.g., the section tables haven't been created yet).
+    """
+    try:
+        return await connection.fetchval(CURRENT_SNAPSHOT_QUERY, term)
+    except asyncpg.UndefinedTableError:
+        return None
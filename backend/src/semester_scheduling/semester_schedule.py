@@ -1,19 +1,176 @@
-from itertools import product
-from itertools import combinations
-from bs4 import BeautifulSoup
+import asyncio
 import requests
-import re
 import json
 from datetime import datetime
 from data_templates.semester_course import SemesterCourse
+from semester_scheduling.section_conflict_index import \
+    SectionConflictIndex, get_snapshot_conflict_index
+from semester_scheduling.professor_ratings import professor_rating_cache
+from semester_scheduling.schedule_filters import compile_filters
+from semester_scheduling.schedule_ranking import top_semester_schedules
+from semester_scheduling.section_fetcher import get_section_fetcher
+from semester_scheduling.section_snapshot import SECTIONS_QUERY, \
+    get_current_snapshot_id, semester_course_from_row
+from semester_scheduling.soc_api import TERM, soc_schedule_url
+
+
+def first_instructors(course_code, data):
+    """Names of the first instructor of each section in an API response."""
+    return [
+        section['instructors'][0].get('name', '')
+        for course_data in data
+        for course in course_data.get('COURSES', [])
+        if course.get('code', '') == course_code
+        for section in course.get('sections', [])
+        if section.get('instructors')
+    ]
+
+
+def semester_courses_from_api_course(course, professor_ratings):
+    """Turn one course of a UF schedule API response into SemesterCourses.
+
+    professor_ratings maps instructor names to their ratings, instructors
+    that aren't in it get N/A ratings.
+    """
+    semester_courses = []
+    code = course.get('code', '')
+    name = course.get('name', '')
+    department = course.get('sections', [{}])[0].get('deptName', '')
+    gen_ed = course.get('sections', [{}])[0].get('genEd', [])
+
+    for section in course.get('sections', []):
+        credit = section.get('credits', 0)
+        unique_id = section.get('classNumber', '')
+        instructors = [instr.get('name', '') for instr in section.get('instructors', [])]
+        meet_times = section.get('meetTimes', [])
+        final_exam_date = section.get('finalExam', '')
+        class_dates = f"{section.get('startDate', '')} - {section.get('endDate', '')}"
+        additional_course_fee = section.get('courseFee', 0)
+        mode_type = section.get('sectWeb', '')  # e.g., 'PC' for in-person
+
+        # Format times and locations
+        period_lookup = {
+            "0725": "Period 1", "0830": "Period 2", "0935": "Period 3",
+            "1040": "Period 4", "1145": "Period 5", "1250": "Period 6",
+            "1355": "Period 7", "1500": "Period 8", "1605": "Period 9",
+            "1710": "Period 10", "1815": "Period 11", "1920": "Period 12"
+        }
+
+        def convert_to_military(time_str):
+            dt = datetime.strptime(time_str.strip(), '%I:%M %p')
+            return dt.strftime('%H%M')
+
+        # Initialize reformatted times list
+        formatted_times = []
+        location_groups = {}
+
+        for mt in meet_times:
+            day = mt.get('meetDays', '')  # E.g., "MWF"
+            raw_start = mt.get('meetTimeBegin', '')
+            raw_end = mt.get('meetTimeEnd', '')
+            location = f"{mt.get('meetBuilding', '')} {mt.get('meetRoom', '')}".strip()
+
+            if not raw_start or not raw_end:
+                continue
+
+            try:
+                start_time = convert_to_military(raw_start)
+                end_time = convert_to_military(raw_end)
+            except ValueError:
+                continue
+
+            period = period_lookup.get(start_time, "")  # labs and
+            # evening classes don't always start at a period
+            day_dict = {d: [start_time, end_time, period] for d in day}
+
+            # Group by location
+            if location not in location_groups:
+                location_groups[location] = {}
+            location_groups[location].update(day_dict)
+
+        # Convert location groups to formatted times
+        for location, times in location_groups.items():
+            formatted_times.append(times)
+
+        times = formatted_times if formatted_times else []
+
+        locations = list(location_groups.keys()) if (
+            location_groups) else ["Online"]
+
+        # Fetch instructor ratings
+        instructor_ratings = []
+        level_of_difficulty = "N/A"
+        would_take_again = "N/A"
+        if instructors:
+            prof_rating = professor_ratings.get(instructors[0], {})
+            instructor_ratings = [prof_rating.get('overall_rating', 'N/A')]
+            level_of_difficulty = prof_rating.get('level_of_difficulty', 'N/A')
+            would_take_again = prof_rating.get('would_take_again', 'N/A')
+
+        # Derive subject from course code (e.g., 'COP' from 'COP4600')
+        subject = ''.join([c for c in code if c.isalpha()])
+
+        if not final_exam_date:
+            final_exam_date = "N/A"
+
+        # Append SemesterCourse object
+        semester_courses.append(
+            SemesterCourse(
+                code=code,
+                credit=credit,
+                name=name,
+                subject=subject,
+                unique_id=unique_id,
+                times=times,
+                locations=locations,
+                instructors=instructors,
+                instructor_ratings=instructor_ratings,
+                mode_type=mode_type,
+                final_exam_date=final_exam_date,
+                class_dates=class_dates,
+                department=department,
+                gen_ed=gen_ed,
+                level_of_difficulty=level_of_difficulty,
+                would_take_again=would_take_again
+            )
+        )
+
+    return semester_courses
+
+
+def semester_course_to_dict(semester_course):
+    """JSON friendly view of a SemesterCourse for the frontend."""
+    return {
+        "code": semester_course.code,
+        "name": semester_course.name,
+        "credit": semester_course.credit,
+        "unique_id": semester_course.unique_id,
+        "times": semester_course.times,
+        "locations": semester_course.locations,
+        "instructors": semester_course.instructors,
+        "instructor_ratings": semester_course.instructor_ratings,
+        "level_of_difficulty": semester_course.level_of_difficulty,
+        "would_take_again": semester_course.would_take_again,
+        "mode_type": semester_course.mode_type,
+        "final_exam_date": semester_course.final_exam_date,
+        "class_dates": semester_course.class_dates,
+        "department": semester_course.department
+    }
 
 
 class SemesterScheduler:
-    def __init__(self, semester_class_codes):
+    def __init__(self, semester_class_codes, conflict_index=None):
         self.semester_class_codes = semester_class_codes  # give it a list of
         # course codes that the user wants to take for the semester
         self.semester_class_data = {}
+        self.snapshot_id = None  # section snapshot the data was read from
+        self.conflict_index = conflict_index if conflict_index is not None \
+            else SectionConflictIndex()  # pass in a shared index to reuse
+        # the conflicts already computed for the same term snapshot
         self.semester_courses_grouped_by_code = []
+        self.section_ids_grouped_by_code = []
+        self.search_order = []  # course indexes in the order they're searched
+        self.should_stop = None  # see iter_valid_semester_schedules
         self.valid_semester_schedules = []
         self.have_valid_semester_schedules = False
         
@@ -21,7 +178,7 @@ class SemesterScheduler:
         """Fetch course data from UF API for all course codes and populate self.semester_class_data."""
 
         for course_code in self.semester_class_codes:
-            url = f"https://one.uf.edu/apix/soc/schedule?ai=false&auf=false&category=CWSP&class-num=&course-code={course_code}&course-title=&cred-srch=&credits=&day-f=&day-m=&day-r=&day-s=&day-t=&day-w=&dept=&eep=&fitsSchedule=false&ge=&ge-b=&ge-c=&ge-d=&ge-h=&ge-m=&ge-n=&ge-p=&ge-s=&instructor=&last-control-number=0&level-max=&level-min=&no-open-seats=false&online-a=&online-c=&online-h=&online-p=&period-b=&period-e=&prog-level=&qst-1=&qst-2=&qst-3=&quest=false&term=2258&wr-2000=&wr-4000=&wr-6000=&writing=false&var-cred=&hons=false"
+            url = soc_schedule_url(course_code)
 
             try:
                 response = requests.get(url, timeout=5)
@@ -31,113 +188,7 @@ class SemesterScheduler:
                 print(f"Error fetching data for {course_code}: {e}")
                 continue
 
-            if course_code not in self.semester_class_data:
-                self.semester_class_data[course_code] = []
-
-            for course_data in data:
-                for course in course_data.get('COURSES', []):
-                    code = course.get('code', '')
-                    if code != course_code:
-                        continue
-                    name = course.get('name', '')
-                    department = course.get('sections', [{}])[0].get('deptName', '')
-                    gen_ed = course.get('sections', [{}])[0].get('genEd', [])
-
-                    for section in course.get('sections', []):
-                        credit = section.get('credits', 0)
-                        unique_id = section.get('classNumber', '')
-                        instructors = [instr.get('name', '') for instr in section.get('instructors', [])]
-                        meet_times = section.get('meetTimes', [])
-                        final_exam_date = section.get('finalExam', '')
-                        class_dates = f"{section.get('startDate', '')} - {section.get('endDate', '')}"
-                        additional_course_fee = section.get('courseFee', 0)
-                        mode_type = section.get('sectWeb', '')  # e.g., 'PC' for in-person
-
-                        # Format times and locations
-                        period_lookup = {
-                            "0725": "Period 1", "0830": "Period 2", "0935": "Period 3",
-                            "1040": "Period 4", "1145": "Period 5", "1250": "Period 6",
-                            "1355": "Period 7", "1500": "Period 8", "1605": "Period 9",
-                            "1710": "Period 10", "1815": "Period 11", "1920": "Period 12"
-                        }
-
-                        def convert_to_military(time_str):
-                            dt = datetime.strptime(time_str.strip(), '%I:%M %p')
-                            return dt.strftime('%H%M')
-
-                        # Initialize reformatted times list
-                        formatted_times = []
-                        location_groups = {}
-
-                        for mt in meet_times:
-                            day = mt.get('meetDays', '')  # E.g., "MWF"
-                            raw_start = mt.get('meetTimeBegin', '')
-                            raw_end = mt.get('meetTimeEnd', '')
-                            location = f"{mt.get('meetBuilding', '')} {mt.get('meetRoom', '')}".strip()
-
-                            if not raw_start or not raw_end:
-                                continue
-
-                            try:
-                                start_time = convert_to_military(raw_start)
-                                end_time = convert_to_military(raw_end)
-                            except ValueError:
-                                continue
-
-                            period = period_lookup[start_time]
-                            day_dict = {d: [start_time, end_time, period] for d in day}
-
-                            # Group by location
-                            if location not in location_groups:
-                                location_groups[location] = {}
-                            location_groups[location].update(day_dict)
-
-                        # Convert location groups to formatted times
-                        for location, times in location_groups.items():
-                            formatted_times.append(times)
-
-                        times = formatted_times if formatted_times else []
-
-                        locations = list(location_groups.keys()) if (
-                            location_groups) else ["Online"]
-
-                        # Fetch instructor ratings
-                        instructor_ratings = []
-                        level_of_difficulty = "N/A"
-                        would_take_again = "N/A"
-                        if instructors:
-                            prof_rating = self.professor_rating(instructors[0])
-                            instructor_ratings = [prof_rating.get('overall_rating', 'N/A')]
-                            level_of_difficulty = prof_rating.get('level_of_difficulty', 'N/A')
-                            would_take_again = prof_rating.get('would_take_again', 'N/A')
-
-                        # Derive subject from course code (e.g., 'COP' from 'COP4600')
-                        subject = ''.join([c for c in code if c.isalpha()])
-
-                        if not final_exam_date:
-                            final_exam_date = "N/A"
-
-                        # Append SemesterCourse object
-                        self.semester_class_data[code].append(
-                            SemesterCourse(
-                                code=code,
-                                credit=credit,
-                                name=name,
-                                subject=subject,
-                                unique_id=unique_id,
-                                times=times,
-                                locations=locations,
-                                instructors=instructors,
-                                instructor_ratings=instructor_ratings,
-                                mode_type=mode_type,
-                                final_exam_date=final_exam_date,
-                                class_dates=class_dates,
-                                department=department,
-                                gen_ed=gen_ed,
-                                level_of_difficulty=level_of_difficulty,
-                                would_take_again=would_take_again
-                            )
-                        )
+            self.add_semester_class_data(course_code, data)
         # self.semester_class_data = func() # call webscrapper function that
         # self.semester_class_data = func() # call the API Hieu used that
         # (using the semester_course class as a data holder/template)
@@ -145,92 +196,225 @@ class SemesterScheduler:
         # code and the values being a list of the semester_course objects
         # associated with said course code
 
-    def professor_rating(self, professor_name):
-        # Construct the search URL
-        search_url = f"https://www.ratemyprofessors.com/search/professors/1100?q={professor_name.replace(' ', '%20')}"
-        headers = {
-            "User-Agent": "Mozilla/5.0"
-        }
+    async def get_semester_class_data_async(self, fetcher=None):
+        """Awaitable version of get_semester_class_data.
+
+        All course codes are fetched concurrently through fetcher (the
+        shared SectionFetcher by default), then the ratings of every
+        instructor in the responses are looked up in one batch. The
+        responses are turned into SemesterCourse objects off the event loop
+        since a rating that couldn't be cached is scraped again there.
+        """
+        fetcher = fetcher if fetcher is not None else get_section_fetcher()
+        responses = await fetcher.fetch_courses(self.semester_class_codes)
+
+        await professor_rating_cache.get_ratings_async([
+            instructor for course_code, data in responses.items()
+            if data is not None
+            for instructor in first_instructors(course_code, data)
+        ])
+
+        for course_code, data in responses.items():
+            if data is not None:
+                self.semester_class_data.setdefault(course_code, [])
+
+        await asyncio.gather(*(
+            asyncio.to_thread(self.add_semester_class_data, course_code, data)
+            for course_code, data in responses.items() if data is not None
+        ))
+
+    async def get_semester_class_data_from_db(self, connection, term=TERM):
+        """Read the course codes' sections from the term's current snapshot.
+
+        This keeps outbound HTTP off the request path entirely. Until a
+        snapshot has been ingested (see database_interface.ingest_sections)
+        the sections are fetched from the UF API instead.
+        """
+        snapshot_id = await get_current_snapshot_id(connection, term)
+
+        if snapshot_id is None:
+            await self.get_semester_class_data_async()
+            return
+
+        self.snapshot_id = snapshot_id
+        if len(self.conflict_index) == 0:
+            self.conflict_index = get_snapshot_conflict_index(snapshot_id)
+
+        rows = await connection.fetch(SECTIONS_QUERY, snapshot_id,
+                                      list(self.semester_class_codes))
 
-        # Send a GET request to the search page
-        response = requests.get(search_url, headers=headers)
-        if response.status_code != 200:
-            return {"error": "Failed to retrieve search results."}
-
-        # Parse the search results page
-        soup = BeautifulSoup(response.text, 'html.parser')
-        # Find the first professor link
-        professor_link = soup.find('a', href=re.compile(r'/professor/\d+'))
-        if not professor_link:
-            return {"error": "Professor not found."}
-
-        # Construct the professor's page URL
-        professor_url = f"https://www.ratemyprofessors.com{professor_link['href']}"
-        # Send a GET request to the professor's page
-        prof_response = requests.get(professor_url, headers=headers)
-        if prof_response.status_code != 200:
-            return {"error": "Failed to retrieve professor page."}
-
-        # Parse the professor's page
-        prof_soup = BeautifulSoup(prof_response.text, 'html.parser')
-
-        # Extract overall rating
-        overall_rating_tag = prof_soup.find('div', class_='RatingValue__Numerator-qw8sqy-2')
-        overall_rating = overall_rating_tag.text.strip() if overall_rating_tag else "N/A"
-
-        # Extract level of difficulty
-        difficulty_tag = prof_soup.find('div', class_='FeedbackItem__FeedbackNumber-uof32n-1')
-        difficulty = difficulty_tag.text.strip() if difficulty_tag else "N/A"
-
-        # Extract "would take again" percentage
-        would_take_again_tag = prof_soup.find_all('div', class_='FeedbackItem__FeedbackNumber-uof32n-1')
-        would_take_again = would_take_again_tag[1].text.strip() if len(would_take_again_tag) > 1 else "N/A"
-
-        return {
-            "professor": professor_name,
-            "overall_rating": overall_rating,
-            "level_of_difficulty": difficulty,
-            "would_take_again": would_take_again
-        }
+        for course_code in self.semester_class_codes:
+            self.semester_class_data[course_code] = []
+        for row in rows:
+            self.semester_class_data[row["code"]].append(
+                semester_course_from_row(row))
+
+    def add_semester_class_data(self, course_code, data):
+        """Add the sections in one UF schedule API response for a course."""
+        if course_code not in self.semester_class_data:
+            self.semester_class_data[course_code] = []
+
+        # Look up every section's instructor at once instead of one rating
+        # per section
+        professor_ratings = professor_rating_cache.get_ratings(
+            first_instructors(course_code, data))
+
+        for course_data in data:
+            for course in course_data.get('COURSES', []):
+                if course.get('code', '') == course_code:
+                    self.semester_class_data[course_code].extend(
+                        semester_courses_from_api_course(course,
+                                                         professor_ratings))
+
+    def professor_rating(self, professor_name):
+        return professor_rating_cache.get_rating(professor_name)
 
     def get_all_valid_semester_schedules(
         self, earliest_time="", latest_time="", period_blackouts=None,
         day_blackouts=None, min_instructor_rating="0",
         max_level_of_difficulty="", min_would_take_again=""
     ):
-        self.valid_semester_schedules = []
-
-        self.semester_courses_grouped_by_code = list(
-            self.semester_class_data.values())
-
-        all_class_combos = list(product(*self.semester_courses_grouped_by_code))
-
-        for class_combo in all_class_combos:
-            valid_class_combo = True
-            all_class_pairs = list(combinations(class_combo, 2))
-
-            for class_pair in all_class_pairs:
-                if not class_pair[0].is_compatible(class_pair[1]):
-                    valid_class_combo = False
-                    break
-
-            for sem_class in class_combo:
-                if not sem_class.meets_requirements(
-                        earliest_time=earliest_time, latest_time=latest_time,
-                        period_blackouts=period_blackouts,
-                        day_blackouts=day_blackouts,
-                        min_instructor_rating=min_instructor_rating,
-                        max_level_of_difficulty=max_level_of_difficulty,
-                        min_would_take_again=min_would_take_again):
-                    valid_class_combo = False
-                    break
-
-            if valid_class_combo:
-                self.valid_semester_schedules.append(list(class_combo))
+        self.prepare_semester_schedule_search(
+            earliest_time=earliest_time, latest_time=latest_time,
+            period_blackouts=period_blackouts, day_blackouts=day_blackouts,
+            min_instructor_rating=min_instructor_rating,
+            max_level_of_difficulty=max_level_of_difficulty,
+            min_would_take_again=min_would_take_again)
+
+        self.valid_semester_schedules = [
+            schedule for schedule, cursor in
+            self.iter_valid_semester_schedules()
+        ]
 
         if len(self.valid_semester_schedules) != 0:
             self.have_valid_semester_schedules = True
 
+    def prepare_semester_schedule_search(
+        self, earliest_time="", latest_time="", period_blackouts=None,
+        day_blackouts=None, min_instructor_rating="0",
+        max_level_of_difficulty="", min_would_take_again=""
+    ):
+        """Filter the sections and pick the search order for some filters.
+
+        Has to be called before iter_valid_semester_schedules.
+        """
+        # Filters only depend on a single section, so they are applied once
+        # per section up front instead of once per section per combo. The
+        # filters are compiled once and the conflict index remembers which
+        # sections passed them, so searches repeating them skip this.
+        filters = compile_filters(
+            earliest_time, latest_time, period_blackouts, day_blackouts,
+            min_instructor_rating, max_level_of_difficulty,
+            min_would_take_again)
+        self.section_ids_grouped_by_code = []
+
+        for code, courses in self.semester_class_data.items():
+            self.conflict_index.add_course(code, courses)
+            self.section_ids_grouped_by_code.append(
+                self.conflict_index.filtered_section_ids(code, filters))
+
+        self.semester_courses_grouped_by_code = [
+            [self.conflict_index.sections[section_id] for section_id in
+             section_ids]
+            for section_ids in self.section_ids_grouped_by_code
+        ]
+
+        # Branch on the course with the fewest sections first so conflicts
+        # prune the search tree as close to the root as possible.
+        self.search_order = sorted(
+            range(len(self.section_ids_grouped_by_code)),
+            key=lambda i: len(self.section_ids_grouped_by_code[i]))
+
+    def get_top_semester_schedules(
+        self, k=20, weights=None, earliest_time="", latest_time="",
+        period_blackouts=None, day_blackouts=None, min_instructor_rating="0",
+        max_level_of_difficulty="", min_would_take_again="", should_stop=None
+    ):
+        """Return the k best valid schedules as (score, schedule) pairs.
+
+        weights overrides any of schedule_ranking.DEFAULT_SCORE_WEIGHTS.
+        Schedules that can't make it into the top k are never enumerated.
+        should_stop works like in iter_valid_semester_schedules, the best
+        schedules found until then are returned.
+        """
+        self.prepare_semester_schedule_search(
+            earliest_time=earliest_time, latest_time=latest_time,
+            period_blackouts=period_blackouts, day_blackouts=day_blackouts,
+            min_instructor_rating=min_instructor_rating,
+            max_level_of_difficulty=max_level_of_difficulty,
+            min_would_take_again=min_would_take_again)
+
+        return top_semester_schedules(
+            self.conflict_index, self.section_ids_grouped_by_code,
+            self.search_order, k, weights, should_stop)
+
+    def is_search_position(self, positions):
+        """True if positions can be a cursor of the prepared search: one
+        position per course, each within the course's filtered sections.
+        """
+        return len(positions) == len(self.search_order) and all(
+            0 <= position < len(self.section_ids_grouped_by_code[course])
+            for position, course in zip(positions, self.search_order))
+
+    def iter_valid_semester_schedules(self, resume_after=None,
+                                      should_stop=None):
+        """Yield (schedule, cursor) for each valid schedule as it's found.
+
+        Nothing but the current partial schedule is kept in memory, so the
+        caller decides how many schedules to hold on to. cursor is the
+        schedule's position in the search (a list of ints); passing it back
+        as resume_after continues right after that schedule, as long as the
+        sections and filters are the same. should_stop is called at every
+        step of the search and ends it early when it returns True.
+        """
+        self.should_stop = should_stop
+        chosen_section_ids = [None] * len(self.section_ids_grouped_by_code)
+        positions = [0] * len(self.search_order)
+
+        yield from self.search_valid_semester_schedules(
+            0, chosen_section_ids, 0, positions, resume_after)
+
+    def search_valid_semester_schedules(self, depth, chosen_section_ids,
+                                        chosen_bits, positions, resume_after):
+        """Depth-first backtracking search over one course at a time.
+
+        chosen_section_ids is indexed by the course's position in
+        self.section_ids_grouped_by_code so every valid schedule keeps the
+        same course order as the requested codes. chosen_bits is the same
+        partial schedule as a conflict index bitset and positions holds the
+        index of the chosen section at each depth. resume_after is only
+        passed down while the search is still on the path to the schedule
+        it resumes after.
+        """
+        if self.should_stop is not None and self.should_stop():
+            return
+
+        if depth == len(self.search_order):
+            if resume_after is None:
+                yield ([self.conflict_index.sections[section_id]
+                        for section_id in chosen_section_ids],
+                       list(positions))
+            return
+
+        course_index = self.search_order[depth]
+        section_ids = self.section_ids_grouped_by_code[course_index]
+        start = resume_after[depth] if resume_after is not None else 0
+
+        for position in range(start, len(section_ids)):
+            section_id = section_ids[position]
+            # Reject the partial schedule as soon as the new section
+            # conflicts with any section that was already picked.
+            if not self.conflict_index.conflicts_with(section_id,
+                                                      chosen_bits):
+                chosen_section_ids[course_index] = section_id
+                positions[depth] = position
+                yield from self.search_valid_semester_schedules(
+                    depth + 1, chosen_section_ids,
+                    chosen_bits | 1 << section_id, positions,
+                    resume_after if position == start else None)
+
+        chosen_section_ids[course_index] = None
+
     def print_valid_semester_schedules(self, extra_verbose=False):
         if self.have_valid_semester_schedules:
             for i, valid_semester_schedule in (
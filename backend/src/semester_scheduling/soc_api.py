@@ -0,0 +1,14 @@
+# UF schedule of courses (SOC) API that One.UF uses to search for sections
+SOC_SCHEDULE_URL = "https://one.uf.edu/apix/soc/schedule"
+TERM = "2258"  # 2 + year + month the semester starts (Fall 2025)
+
+
+def soc_schedule_query(course_code="", last_control_number=0, term=TERM):
+    return f"ai=false&auf=false&category=CWSP&class-num=&course-code={course_code}&course-title=&cred-srch=&credits=&day-f=&day-m=&day-r=&day-s=&day-t=&day-w=&dept=&eep=&fitsSchedule=false&ge=&ge-b=&ge-c=&ge-d=&ge-h=&ge-m=&ge-n=&ge-p=&ge-s=&instructor=&last-control-number={last_control_number}&level-max=&level-min=&no-open-seats=false&online-a=&online-c=&online-h=&online-p=&period-b=&period-e=&prog-level=&qst-1=&qst-2=&qst-3=&quest=false&term={term}&wr-2000=&wr-4000=&wr-6000=&writing=false&var-cred=&hons=false"
+
+
+def soc_schedule_url(course_code="", last_control_number=0, term=TERM,
+                     base_url=SOC_SCHEDULE_URL):
+    query = soc_schedule_query(course_code, last_control_number, term)
+
+    return f"{base_url}?{query}"
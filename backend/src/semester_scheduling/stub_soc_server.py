@@ -0,0 +1,118 @@
+"""Local stand-in for the UF schedule API so section fetching runs offline.
+
+Responses are served from a directory with one saved API response per course
+code, named {course code}.json (e.g., MAC2313.json). Course codes without a
+file get an empty result, like the real API, and an empty course code pages
+through every course like a term-wide query does. Run it with:
+    python -m semester_scheduling.stub_soc_server {directory} --port 8765
+and pass http://127.0.0.1:8765/apix/soc/schedule as a SectionFetcher's
+base_url. Tests can use run_stub_soc_server instead.
+"""
+import argparse
+import json
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlsplit
+
+SOC_SCHEDULE_PATH = "/apix/soc/schedule"
+TERM_PAGE_SIZE = 50  # courses per page of a term-wide query
+EMPTY_RESPONSE = [
+    {"COURSES": [], "LASTCONTROLNUMBER": 0, "RETRIEVEDROWS": 0,
+     "TOTALROWS": 0}
+]
+
+
+def load_responses(directory):
+    return {path.stem: json.loads(path.read_text()) for path in
+            Path(directory).glob("*.json")}
+
+
+class StubSocRequestHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        url = urlsplit(self.path)
+
+        if url.path != SOC_SCHEDULE_PATH:
+            self.send_error(404)
+            return
+
+        query = parse_qs(url.query)
+        course_code = query.get("course-code", [""])[0]
+
+        if course_code:
+            response = self.server.responses.get(course_code, EMPTY_RESPONSE)
+        else:
+            response = self.server.term_page(
+                int(query.get("last-control-number", ["0"])[0]))
+        body = json.dumps(response).encode()
+
+        if self.server.delay:
+            time.sleep(self.server.delay)  # simulated One.UF latency
+
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class StubSocServer(ThreadingHTTPServer):
+    # Concurrent fetchers connect all at once, and connections past the
+    # default backlog of 5 are only retried a second later
+    request_queue_size = 128
+
+    def __init__(self, responses, port=0, delay=0):
+        super().__init__(("127.0.0.1", port), StubSocRequestHandler)
+        self.responses = responses  # course code -> saved API response
+        self.delay = delay  # seconds to wait before answering each request
+
+    def term_page(self, last_control_number):
+        courses = [course for response in self.responses.values()
+                   for course_data in response
+                   for course in course_data.get("COURSES", [])]
+        page = courses[last_control_number:
+                       last_control_number + TERM_PAGE_SIZE]
+
+        return [{"COURSES": page,
+                 "LASTCONTROLNUMBER": last_control_number + len(page),
+                 "RETRIEVEDROWS": len(page), "TOTALROWS": len(courses)}]
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self.server_port}{SOC_SCHEDULE_PATH}"
+
+
+@contextmanager
+def run_stub_soc_server(responses, port=0, delay=0):
+    """Serve responses on a background thread and yield the base URL."""
+    server = StubSocServer(responses, port, delay)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    try:
+        yield server.base_url
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("directory")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--delay", type=float, default=0)
+    args = parser.parse_args()
+
+    server = StubSocServer(load_responses(args.directory), args.port,
+                           args.delay)
+    print(f"Serving the UF schedule API stub at {server.base_url}")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
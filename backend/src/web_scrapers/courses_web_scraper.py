@@ -1,12 +1,33 @@
+import argparse
+import asyncio
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from urllib.parse import urlsplit
+import httpx
 import requests
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, SoupStrainer
 # Run as modules to prevent errors
 from data_templates.course_template import Course
+from web_scrapers.scrape_cache import ScrapeCache
 from web_scrapers.web_scrapers_util import remove_html_entities
 
+BASE_URL = "https://catalog.ufl.edu"
+CATALOG_PATH = "/UGRD/courses"
+MAX_CONCURRENT_REQUESTS = 8
+MAX_RETRIES = 3
+RETRY_BACKOFF_SECONDS = 0.5  # doubled after every failed attempt
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
 def get_subjects(catalog_url):
     response = requests.get(catalog_url)
-    soup = BeautifulSoup(response.text, "html.parser")
+
+    return parse_subjects(response.text)
+
+def parse_subjects(catalog_html):
+    soup = BeautifulSoup(catalog_html, "html.parser")
     get_subjects = soup.find("div", class_="az_sitemap")
     subjects_dict = {}
     links_dict = {}
@@ -29,7 +50,14 @@ def get_subjects(catalog_url):
 
 def get_courses(subject_url, subject):
     response_2 = requests.get(subject_url)
-    soup2 = BeautifulSoup(response_2.text, "html.parser")
+
+    return parse_courses(response_2.text, subject)
+
+def parse_courses(subject_html, subject):
+    # Only the course blocks are needed, skipping the rest of the page
+    # about halves the parsing time
+    soup2 = BeautifulSoup(subject_html, "html.parser", parse_only=SoupStrainer(
+        "div", class_="courseblock courseblocktoggle"))
     courses = []
 
     course_blocks = soup2.find_all("div",
@@ -79,25 +107,186 @@ def get_courses(subject_url, subject):
     return courses
 
 
-def runner():
-    base_url = "https://catalog.ufl.edu"
-    catalog_url = f"{base_url}/UGRD/courses"
-    dicts = get_subjects(catalog_url)
+def saved_page_path(directory, url):
+    """Where a catalog page is saved: the last part of its URL path as an
+    HTML file (e.g., /UGRD/courses/accounting/ is accounting.html).
+    """
+    name = urlsplit(url).path.rstrip("/").rsplit("/", 1)[-1]
+
+    return Path(directory) / f"{name or 'index'}.html"
+
+
+class CatalogCrawler:
+    """Concurrent client for the UF course catalog.
+
+    Pages are fetched through one pooled httpx.AsyncClient, at most
+    max_concurrency at a time, and requests that fail with a network error
+    or a retryable status are tried again with exponential backoff. With
+    pages_directory set, pages are read from saved HTML files instead (see
+    saved_page_path), so a crawl can run offline; save_directory saves
+    every fetched page that way.
+    """
+
+    def __init__(self, max_concurrency=MAX_CONCURRENT_REQUESTS,
+                 max_retries=MAX_RETRIES, backoff=RETRY_BACKOFF_SECONDS,
+                 timeout=30, pages_directory=None, save_directory=None):
+        self.semaphore = asyncio.Semaphore(max_concurrency)
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.pages_directory = pages_directory
+        self.save_directory = save_directory
+        self.client = httpx.AsyncClient(
+            timeout=timeout, follow_redirects=True,
+            limits=httpx.Limits(max_connections=max_concurrency,
+                                max_keepalive_connections=max_concurrency))
+
+    async def fetch_page(self, url, scrape_cache=None):
+        """Return a page's HTML.
+
+        With a scrape_cache (see web_scrapers.scrape_cache) the request is
+        conditional, and None is returned if the page didn't change since
+        the cache's last run.
+        """
+        if self.pages_directory is not None:
+            text = await asyncio.to_thread(
+                saved_page_path(self.pages_directory, url).read_text,
+                encoding="utf-8")
+
+            if scrape_cache is not None and not scrape_cache.is_changed(
+                    url, text):
+                return None
+            return text
+
+        headers = scrape_cache.request_headers(url) if (
+            scrape_cache is not None) else {}
+
+        async with self.semaphore:
+            for attempt in range(self.max_retries + 1):
+                try:
+                    response = await self.client.get(url, headers=headers)
+                    if response.status_code == 304:
+                        scrape_cache.not_modified(url)
+                        return None
+                    if response.status_code not in RETRY_STATUS_CODES:
+                        response.raise_for_status()
+                        break
+                    error = httpx.HTTPStatusError(
+                        f"{response.status_code} for {url}",
+                        request=response.request, response=response)
+                except httpx.TransportError as e:
+                    error = e
+
+                if attempt == self.max_retries:
+                    raise error
+                # Jitter keeps retries of concurrent requests apart
+                await asyncio.sleep(self.backoff * 2 ** attempt *
+                                    random.uniform(0.5, 1.5))
 
+        if self.save_directory is not None:
+            path = saved_page_path(self.save_directory, url)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            await asyncio.to_thread(path.write_text, response.text,
+                                    encoding="utf-8")
 
-    subj_dict = dicts[0]
-    links_dict = dicts[1]
-    all_courses = []
-    for key, value in links_dict.items():
-        for index, links in enumerate(value):
-            subject_url = f"{base_url}{links}"
-            print("Subject URL: " + subject_url)
-            subj_courses = get_courses(subject_url, subj_dict[key][index])
-            for subj in subj_courses:
-                all_courses.append(subj)
+        if scrape_cache is not None and not scrape_cache.is_changed(
+                url, response.text, response.headers):
+            return None
+
+        return response.text
+
+    async def aclose(self):
+        await self.client.aclose()
+
+
+async def crawl_catalog(base_url=BASE_URL,
+                        max_concurrency=MAX_CONCURRENT_REQUESTS,
+                        parse_workers=None, pages_directory=None,
+                        save_directory=None, scrape_cache=None,
+                        failed_pages=None):
+    """Return every Course in the catalog, in the same order as a serial
+    crawl.
+
+    Subject pages are fetched concurrently and parsed in a process pool of
+    parse_workers processes (one per CPU by default), so parsing doesn't
+    hold up the downloads. With a scrape_cache only the courses of subject
+    pages that changed since its last commit are returned. The URLs of
+    subject pages that couldn't be fetched are appended to failed_pages (a
+    list), their courses are missing from the result.
+    """
+    crawler = CatalogCrawler(max_concurrency, pages_directory=pages_directory,
+                             save_directory=save_directory)
+    loop = asyncio.get_running_loop()
+
+    try:
+        subj_dict, links_dict = parse_subjects(
+            await crawler.fetch_page(f"{base_url}{CATALOG_PATH}"))
+        subjects = [(f"{base_url}{link}", subj_dict[key][index])
+                    for key, value in links_dict.items()
+                    for index, link in enumerate(value)]
+
+        with ProcessPoolExecutor(max_workers=parse_workers) as executor:
+            async def crawl_subject(subject_url, subject):
+                try:
+                    subject_html = await crawler.fetch_page(subject_url,
+                                                            scrape_cache)
+                except (httpx.HTTPError, OSError) as e:
+                    print(f"Error fetching {subject_url}: {e}")
+                    if failed_pages is not None:
+                        failed_pages.append(subject_url)
+                    return []
+
+                if subject_html is None:
+                    return []  # unchanged since the last run
+
+                return await loop.run_in_executor(
+                    executor, parse_courses, subject_html, subject)
+
+            subj_courses = await asyncio.gather(*(
+                crawl_subject(subject_url, subject) for subject_url, subject
+                in subjects
+            ))
+    finally:
+        await crawler.aclose()
+
+    return [course for courses in subj_courses for course in courses]
+
+
+def runner(**crawl_options):
+    start = time.perf_counter()
+    all_courses = asyncio.run(crawl_catalog(**crawl_options))
+    print(f"Crawled {len(all_courses)} courses in "
+          f"{time.perf_counter() - start:.1f}s")
+    if crawl_options.get("scrape_cache") is not None:
+        print(f"Subject pages: {crawl_options['scrape_cache'].report()}")
 
     return all_courses
 
 
+def main():
+    parser = argparse.ArgumentParser(
+        description="Crawl every course in the UF undergraduate catalog.")
+    parser.add_argument("--concurrency", type=int,
+                        default=MAX_CONCURRENT_REQUESTS)
+    parser.add_argument("--workers", type=int, default=None,
+                        help="parsing processes (default: one per CPU)")
+    parser.add_argument("--pages", default=None,
+                        help="directory of saved catalog pages to crawl "
+                             "instead of catalog.ufl.edu")
+    parser.add_argument("--save-pages", default=None,
+                        help="directory to save the fetched pages in")
+    parser.add_argument("--changed-only", action="store_true",
+                        help="skip subject pages that didn't change since "
+                             "the last --changed-only run")
+    args = parser.parse_args()
+    scrape_cache = ScrapeCache() if args.changed_only else None
+
+    runner(max_concurrency=args.concurrency, parse_workers=args.workers,
+           pages_directory=args.pages, save_directory=args.save_pages,
+           scrape_cache=scrape_cache)
+
+    if scrape_cache is not None:
+        scrape_cache.commit()
+
+
 if __name__ == "__main__":
-    runner()
+    main()
@@ -8,6 +8,31 @@ from data_templates.certificate_template import Certificate
 from data_templates.major_template import Major
 from data_templates.minor_template import Minor
 
+# lxml parses program pages several times faster than html.parser, use it when it's installed
+try:
+    import lxml  # noqa: F401
+    HTML_PARSER = "lxml"
+except ImportError:
+    HTML_PARSER = "html.parser"
+
+BASE_URL = "https://catalog.ufl.edu"
+session = requests.Session()  # reuses connections to the catalog between pages
+
+def get_page(url, scrape_cache=None):
+    # With a scrape cache (see web_scrapers.scrape_cache) the request is conditional and None is returned for
+    # pages that didn't change since the cache's last run, so they aren't parsed again
+    if scrape_cache is None:
+        return session.get(url).text
+
+    response = session.get(url, headers=scrape_cache.request_headers(url))
+    if response.status_code == 304:
+        scrape_cache.not_modified(url)
+        return None
+    if not scrape_cache.is_changed(url, response.text, response.headers):
+        return None
+
+    return response.text
+
 def print_semester_courses(courses_dict):
     for semester, courses in courses_dict.items():
         print(f"{semester}:")
@@ -31,7 +56,7 @@ def save_courses_to_json(courses_dict, filename):
 
 # Get links on all majors, minors, and certificates offered at UF
 def get_all_data(catalog_url):
-    response = requests.get(catalog_url)
+    response = session.get(catalog_url)
     soup = BeautifulSoup(response.text, "html.parser")
     items = soup.find_all("li", id=lambda x: x and x.startswith("isotope-item"))
 
@@ -46,236 +71,193 @@ def get_all_data(catalog_url):
 
     return all_data
 
+def get_program_kind(name):
+    lowered_name = name.lower()
+    if "minor" in lowered_name:
+        return "minor"
+    elif "certificate" in lowered_name:
+        return "certificate"
+    else:
+        return "major"
+
 def split_dict(input_dict):
     minor = {}
     certificates = {}
     major = {}
 
     for key, value in input_dict.items():
-        lowered_key = key.lower()
-        if "minor" in lowered_key:
+        kind = get_program_kind(key)
+        if kind == "minor":
             minor[key] = value
-        elif "certificate" in lowered_key:
+        elif kind == "certificate":
             certificates[key] = value
         else:
             major[key] = value
 
     return minor, certificates, major
 
+def get_table_courses(soup, heading):
+    # Course codes in the table after a heading like "Required Courses"
+    section = soup.find('h2', string=heading)
+    table = section.find_next('table') if section else None
+    if not table:
+        return []
+
+    return [link.text.strip().replace('\xa0', '') for link in table.find_all('a', class_='bubblelink code')]
+
+def get_college_and_credits(list_items, credits_label, college_from_link=False):
+    college_name = "-1"
+    credits = -1
+
+    for li in list_items:
+        strong = li.find('strong')
+        if not strong:
+            continue
+        if 'College:' in strong.text:
+            link = li.find('a')
+            if college_from_link and link:
+                college_name = link.text.strip()
+            else:
+                college_name = li.text.strip().replace('College: ', '')
+        if credits_label in strong.text:
+            match = re.search(r'\d+', li.text.strip())
+            credits = match.group() if match else -1
+
+    return college_name, int(credits)
+
+def get_semester_plan(soup):
+    # The model semester plan: semester name -> list of course strings (see backend/data)
+    table = soup.find('table', class_='sc_plangrid')
+
+    semester_courses = {}
+    course_credits = {}
+    current_semester = None
+    semester_count = 1
+
+    if table:
+        for tr in table.find_all('tr'):
+            if 'plangridterm' in tr.get('class', []):
+                current_semester = f"Semester {semester_count}"
+                semester_courses[current_semester] = []
+                semester_count += 1
+            elif current_semester and (codecell := tr.find(class_='codecol')):
+                course = codecell.get_text(strip=True).replace('\xa0', ' ')
+                course = f"{course} (CT)" if 'Critical Tracking' in tr.get_text() else course
+                course = course.replace('&', ' & ')
+                credit_cell = tr.find(class_='hourscol')
+                credits = credit_cell.get_text(strip=True) if credit_cell and credit_cell.get_text(
+                    strip=True).isdigit() else None
+                course_credits[course] = credits
+                semester_courses[current_semester].append(course)
+
+        for semester, courses in semester_courses.items():
+            i = 0
+            while i < len(courses):
+                if courses[i] == "Select one:" and i + 2 < len(courses):
+                    combined = f"Select one: {courses[i + 1]} OR {courses[i + 2]}"
+                    if "(CT)" in combined and courses[i + 1].endswith("(CT)") and courses[i + 2].endswith("(CT)"):
+                        combined = combined.replace(" (CT)", "", 1)
+                    courses[i] = combined
+                    del courses[i + 1:i + 3]
+                else:
+                    i += 1
+
+        for semester, courses in semester_courses.items():
+            for i, course in enumerate(courses):
+                if not course.startswith("Select one:"):
+                    course_code = course.split(' (')[0].strip()
+                    credits = course_credits.get(course, None)
+                    if (not bool(re.search(r'\d{4}', course_code)) or '3000' in course_code) and credits:
+                        courses[i] = f"{course} ({credits} credits)"
+
+    return semester_courses
+
 # Some formatting issues like in
 # https://catalog.ufl.edu/UGRD/colleges-schools/UGART/ART_UCT06/
 # College name structured differently so difficult to get name
 # Credits don't display sometimes
 # Sometimes required courses don't show up
 # Possibly more issues as I have checked each individiual certificate
-def get_certificate_data(dict):
-    all_certificates = []
-    max_val = 0
-    base_url = "https://catalog.ufl.edu"
-    counter = 0
-    for name, value in dict.items():
-        url = f"{base_url}{value}"
-        response = requests.get(url)
-        soup = BeautifulSoup(response.text, 'html.parser')
-        list_items = soup.find_all('li')
-        p_elements = soup.find_all('p')
-        print("Certificate URL: " + url)
-        description = ' '.join([p.get_text() for p in soup.find_all('p') if 'certificate' in p.get_text().lower()])
-        prerequisite_courses = []
-        required_courses = []
-        # Extract courses from Prerequisite Courses
-        prerequisite_section = soup.find('h2', string='Prerequisite Courses')
-        if prerequisite_section:
-            prerequisite_table = prerequisite_section.find_next('table')
-            if prerequisite_table:
-                prerequisite_links = prerequisite_table.find_all('a', class_='bubblelink code')
-                prerequisite_courses = [link.text.strip().replace('\xa0', '') for link in prerequisite_links]
-        else:
-            prerequisite_courses = []  # No prerequisite courses found
-
-        # Extract courses from Required Courses
-        required_section = soup.find('h2', string='Required Courses')
-        if required_section:
-            required_table = required_section.find_next('table')
-            if required_table:
-                required_links = required_table.find_all('a', class_='bubblelink code')
-                required_courses = [link.text.strip().replace('\xa0', '') for link in required_links]
-        credits = -1
-        college_name = "-1"
-        # Get all the College Names
-        for li in list_items:
-            if li.find('strong') and 'College:' in li.find('strong').text:
-                college_name = li.find('a').text.strip()
-            if li.find('strong') and 'Credits:' in li.find('strong').text:
-                credits_text = li.text.strip()
-                credits = re.search(r'\d+', credits_text.lstrip()).group()
-        # scrape the admissions criteria (ex: https://catalog.ufl.edu/UGRD/colleges-schools/UGENG/ENG_UCT12/)
-        # Add the electives
-        certificate = Certificate(name, int(credits), description, college_name, "Work in Progress", "Undergraduate", required_courses, [])
-        all_certificates.append(certificate)
-        if len(description) > max_val:
-            max_val = len(description)
-        counter += 1
-    return all_certificates
-
-def get_minor_data(dict):
+# Minors: add non-eligible majors (ex:https://catalog.ufl.edu/UGRD/colleges-schools/UGENG/CIE_UMN/)
+# Certificates: scrape the admissions criteria (ex: https://catalog.ufl.edu/UGRD/colleges-schools/UGENG/ENG_UCT12/)
+# and add the electives
+def parse_program_page(page, name, kind):
+    """
+    Parses a program page once into its Major, Minor or Certificate (kind is "major", "minor" or "certificate")
+    and its model semester plan ({} if it doesn't have one). The model semester plan is on the same page as the
+    rest of the program (#modelsemesterplantext is only a fragment of it), so it doesn't need its own request.
+    """
+    soup = BeautifulSoup(page, HTML_PARSER)
+    list_items = soup.find_all('li')
+    p_texts = [p.get_text() for p in soup.find_all('p')]
+
+    if kind == "major":
+        intro_text_div = soup.find('div', id='intro-text')
+        intro_p = intro_text_div.find_all('p') if intro_text_div else []
+        description = str(intro_p[0]) if intro_p else ''
+        description = description.replace('<p>', '').replace('</p>', '')
+        college_name, credits = get_college_and_credits(list_items, 'Credits for Degree:')
+        required_courses = [link.text.strip().replace('\xa0', '') for link in
+                            soup.find_all('a', class_='bubblelink code')]
+        program = Major(name, credits, description, college_name, "Work in Progress", "Undergraduate",
+                        required_courses, [], "Elective Description Needed")
+    elif kind == "minor":
+        description = ' '.join([text for text in p_texts if 'minor' in text.lower()])
+        college_name, credits = get_college_and_credits(list_items, 'Credits:')
+        program = Minor(name, credits, description, college_name, "Work in Progress", "", "Undergraduate",
+                        get_table_courses(soup, 'Required Courses'), [])
+    else:
+        description = ' '.join([text for text in p_texts if 'certificate' in text.lower()])
+        college_name, credits = get_college_and_credits(list_items, 'Credits:', college_from_link=True)
+        program = Certificate(name, credits, description, college_name, "Work in Progress", "Undergraduate",
+                              get_table_courses(soup, 'Required Courses'), [])
+
+    return program, get_semester_plan(soup) if kind == "major" else {}
+
+def scrape_programs(programs_dict, scrape_cache=None, save_plans=True, kind=None):
+    """
+    Fetches and parses every program page once. Returns the minors, certificates and majors like
+    get_minor_data, get_certificate_data and get_major_data, and saves the majors' four year plans to
+    backend/data like four_year_plans if save_plans is set. Programs are sorted by their name like split_dict
+    does unless kind says what they all are.
+    """
     all_minors = []
-    base_url = "https://catalog.ufl.edu"
-    for name, value in dict.items():
-        url = f"{base_url}{value}"
-        response = requests.get(url)
-        soup = BeautifulSoup(response.text, 'html.parser')
-        print("Minor URL: " + url)
-        list_items = soup.find_all('li')
-        p_elements = soup.find_all('p')
-        description = ' '.join([p.get_text() for p in soup.find_all('p') if 'minor' in p.get_text().lower()])
-        prerequisite_courses = []
-        required_courses = []
-        # Extract courses from Prerequisite Courses
-        prerequisite_section = soup.find('h2', string='Prerequisite Courses')
-        if prerequisite_section:
-            prerequisite_table = prerequisite_section.find_next('table')
-            if prerequisite_table:
-                prerequisite_links = prerequisite_table.find_all('a', class_='bubblelink code')
-                prerequisite_courses = [link.text.strip().replace('\xa0', '') for link in prerequisite_links]
+    all_certificates = []
+    all_majors = []
 
+    for name, value in programs_dict.items():
+        url = f"{BASE_URL}{value}"
+        page = get_page(url, scrape_cache)
+        if page is None:
+            continue
+        program_kind = kind or get_program_kind(name)
+        print(f"{program_kind.capitalize()} URL: " + url)
+        program, semester_courses = parse_program_page(page, name, program_kind)
+
+        if program_kind == "minor":
+            all_minors.append(program)
+        elif program_kind == "certificate":
+            all_certificates.append(program)
         else:
-            prerequisite_courses = []  # No prerequisite courses found
-
-        # Extract courses from Required Courses
-        required_section = soup.find('h2', string='Required Courses')
-        if required_section:
-            required_table = required_section.find_next('table')
-            if required_table:
-                required_links = required_table.find_all('a', class_='bubblelink code')
-                required_courses = [link.text.strip().replace('\xa0', '') for link in required_links]
-                or_cols = soup.find_all('td', class_='codecol orclass')
-                for course in or_cols:
-                    course_code = course.find('a').text
-        college_name = "-1"
-        credits = -1
-        # Get all the College Names
-        for li in list_items:
-            if li.find('strong') and 'College:' in li.find('strong').text:
-                college_name = li.text.strip()
-                college_name = college_name.replace('College: ', '')
-            if li.find('strong') and 'Credits:' in li.find('strong').text:
-                credits_text = li.text.strip()
-                credits = re.search(r'\d+', credits_text.lstrip())
-                if credits:
-                    credits = credits.group().strip()
-                else:
-                    credits = -1
-        # Add non-eligible majors (ex:https://catalog.ufl.edu/UGRD/colleges-schools/UGENG/CIE_UMN/)
-        minor = Minor(name, int(credits), description, college_name, "Work in Progress", "", "Undergraduate", required_courses, [])
-        all_minors.append(minor)
-    return all_minors
-
-def get_major_data(majors_dict):
-    base_url = "https://catalog.ufl.edu"
-    all_majors = []
+            all_majors.append(program)
+            if save_plans:
+                print("Major Name: " + str(name))
+                print_semester_courses(semester_courses)
+                save_courses_to_json(semester_courses, str(name) + '.json')
 
-    for name, value in majors_dict.items():
-        url = f"{base_url}{value}"
-        response = requests.get(url)
-        soup = BeautifulSoup(response.text, 'html.parser')
+    return all_minors, all_certificates, all_majors
 
-        intro_text_div = soup.find('div', id='intro-text')
-        description = str(intro_text_div.find_all('p')[0]) if intro_text_div else ''
-        description = description.replace('<p>', '').replace('</p>', '')
+def get_certificate_data(dict, scrape_cache=None):
+    return scrape_programs(dict, scrape_cache, save_plans=False, kind="certificate")[1]
 
-        prerequisite_courses = []
-        required_courses = []
-
-        prerequisite_section = soup.find('h2', string='Prerequisite Courses')
-        if prerequisite_section:
-            prerequisite_table = prerequisite_section.find_next('table')
-            if prerequisite_table:
-                prerequisite_links = prerequisite_table.find_all('a', class_='bubblelink code')
-                prerequisite_courses = [link.text.strip().replace('\xa0', '') for link in prerequisite_links]
-
-        list_items = soup.find_all('li')
-        credits = -1
-        college_name = "-1"
-        for li in list_items:
-            if li.find('strong') and 'College:' in li.find('strong').text:
-                college_name = li.text.strip().replace('College: ', '')
-            if li.find('strong') and 'Credits for Degree:' in li.find('strong').text:
-                credits_text = li.text.strip()
-                match = re.search(r'\d+', credits_text)
-                credits = match.group() if match else -1
-
-        semester_url = f"{url}#modelsemesterplantext"
-        sem_response = requests.get(semester_url)
-        sem_soup = BeautifulSoup(sem_response.text, 'html.parser')
-        required_courses = [link.text.strip().replace('\xa0', '') for link in
-                            sem_soup.find_all('a', class_='bubblelink code')]
-        credits = credits if credits is not None else "-1"
-
-        major = Major(name, int(credits), description, college_name, "Work in Progress", "Undergraduate",
-                      required_courses, [], "Elective Description Needed")
-        print(major)
-        all_majors.append(major)
-
-    return all_majors
-
-def four_year_plans(majors_dict):
-    base_url = "https://catalog.ufl.edu"
-    for name, value in majors_dict.items():
-        url = f"{base_url}{value}"
-        response = requests.get(url)
-        soup = BeautifulSoup(response.text, 'html.parser')
-        print("Major URL: " + url)
-
-        semester_url = f"{url}#modelsemesterplantext"
-        sem_response = requests.get(semester_url)
-        sem_soup = BeautifulSoup(sem_response.text, 'html.parser')
-        table = sem_soup.find('table', class_='sc_plangrid')
-
-        semester_courses = {}
-        course_credits = {}
-        current_semester = None
-        semester_count = 1
-
-        if table:
-            for tr in table.find_all('tr'):
-                if 'plangridterm' in tr.get('class', []):
-                    current_semester = f"Semester {semester_count}"
-                    semester_courses[current_semester] = []
-                    semester_count += 1
-                elif current_semester and (codecell := tr.find(class_='codecol')):
-                    course = codecell.get_text(strip=True).replace('\xa0', ' ')
-                    course = f"{course} (CT)" if 'Critical Tracking' in tr.get_text() else course
-                    course = course.replace('&', ' & ')
-                    credit_cell = tr.find(class_='hourscol')
-                    credits = credit_cell.get_text(strip=True) if credit_cell and credit_cell.get_text(
-                        strip=True).isdigit() else None
-                    course_credits[course] = credits
-                    semester_courses[current_semester].append(course)
-
-            for semester, courses in semester_courses.items():
-                i = 0
-                while i < len(courses):
-                    if courses[i] == "Select one:" and i + 2 < len(courses):
-                        combined = f"Select one: {courses[i + 1]} OR {courses[i + 2]}"
-                        if "(CT)" in combined and courses[i + 1].endswith("(CT)") and courses[i + 2].endswith("(CT)"):
-                            combined = combined.replace(" (CT)", "", 1)
-                        courses[i] = combined
-                        del courses[i + 1:i + 3]
-                    else:
-                        i += 1
-
-            for semester, courses in semester_courses.items():
-                for i, course in enumerate(courses):
-                    if not course.startswith("Select one:"):
-                        course_code = course.split(' (')[0].strip()
-                        credits = course_credits.get(course, None)
-                        if (not bool(re.search(r'\d{4}', course_code)) or '3000' in course_code) and credits:
-                            courses[i] = f"{course} ({credits} credits)"
-
-        print("Major Name: " + str(name))
-        print_semester_courses(semester_courses)
-        save_courses_to_json(semester_courses, str(name) + '.json')
+def get_minor_data(dict, scrape_cache=None):
+    return scrape_programs(dict, scrape_cache, save_plans=False, kind="minor")[0]
+
+def get_major_data(majors_dict, scrape_cache=None):
+    return scrape_programs(majors_dict, scrape_cache, save_plans=False, kind="major")[2]
+
+def four_year_plans(majors_dict, scrape_cache=None):
+    scrape_programs(majors_dict, scrape_cache, kind="major")
 
 # Code to run four_year plans to generate json files
 # catalog_url = "https://catalog.ufl.edu/UGRD/programs/#filter=.filter_24"
@@ -283,3 +265,11 @@ def four_year_plans(majors_dict):
 # split_data = split_dict(all_data) # Split data into three dictionaries
 # majors = split_data[2]
 # four_year_plans(majors)
+# Or get every program and the four year plans with one request per program page:
+# all_minors, all_certificates, all_majors = scrape_programs(all_data)
+# To only redo the plans whose pages changed since the last run:
+# from web_scrapers.scrape_cache import ScrapeCache
+# scrape_cache = ScrapeCache()
+# four_year_plans(majors, scrape_cache)
+# print(scrape_cache.report())
+# scrape_cache.commit()
@@ -0,0 +1,111 @@
+import hashlib
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+SCRAPE_CACHE_DB_PATH = Path(__file__).resolve().parents[2] / "cache" / \
+    "scrape_cache.sqlite3"
+
+
+def content_hash(text):
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+class ScrapeCache:
+    """What the scrapers last saw of each catalog page.
+
+    Stores every page's ETag, Last-Modified and a hash of its content in
+    SQLite, so the next run can send conditional requests and skip parsing
+    (and writing to the database) the pages that didn't change. New state
+    is only saved by commit, once the changed pages were actually processed,
+    so a failed run doesn't make them look unchanged to the next one.
+    """
+
+    def __init__(self, db_path=SCRAPE_CACHE_DB_PATH):
+        self.db_path = Path(db_path)
+        self.pending = {}  # url -> (etag, last modified, hash) to commit
+        self.counts = {"fetched": 0, "skipped": 0, "changed": 0}
+        self.lock = threading.Lock()
+        self.connection = None
+
+    def get_connection(self):
+        if self.connection is None:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            self.connection = sqlite3.connect(self.db_path,
+                                              check_same_thread=False)
+            self.connection.execute('''
+                CREATE TABLE IF NOT EXISTS scraped_pages (
+                    url TEXT PRIMARY KEY,
+                    etag TEXT,
+                    last_modified TEXT,
+                    content_hash TEXT NOT NULL,
+                    scraped_at REAL NOT NULL
+                )
+            ''')
+
+        return self.connection
+
+    def get_page(self, url):
+        with self.lock:
+            return self.get_connection().execute(
+                "SELECT etag, last_modified, content_hash FROM scraped_pages "
+                "WHERE url = ?", (url,)).fetchone()
+
+    def request_headers(self, url):
+        """Headers that make the server answer 304 if the page is the same."""
+        page = self.get_page(url)
+        headers = {}
+
+        if page is not None:
+            etag, last_modified, _ = page
+            if etag:
+                headers["If-None-Match"] = etag
+            if last_modified:
+                headers["If-Modified-Since"] = last_modified
+
+        return headers
+
+    def not_modified(self, url):
+        """Count a page the server answered 304 Not Modified for."""
+        with self.lock:
+            self.counts["skipped"] += 1
+
+    def is_changed(self, url, text, headers=None):
+        """Check a fetched page against the last run, True if it changed.
+
+        headers are the response's headers, their validators are sent with
+        the next request for the page.
+        """
+        headers = headers or {}
+        page = self.get_page(url)
+        new_hash = content_hash(text)
+        changed = page is None or page[2] != new_hash
+
+        with self.lock:
+            self.counts["fetched"] += 1
+            self.counts["changed" if changed else "skipped"] += 1
+            self.pending[url] = (headers.get("ETag"),
+                                 headers.get("Last-Modified"), new_hash)
+
+        return changed
+
+    def commit(self):
+        """Save what was seen of every page checked since the last commit."""
+        with self.lock:
+            connection = self.get_connection()
+            now = time.time()
+            connection.executemany(
+                "INSERT OR REPLACE INTO scraped_pages "
+                "(url, etag, last_modified, content_hash, scraped_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                [(url, etag, last_modified, page_hash, now) for
+                 url, (etag, last_modified, page_hash) in
+                 self.pending.items()])
+            connection.commit()
+            self.pending.clear()
+
+    def report(self):
+        return (f"{self.counts['fetched']} pages fetched, "
+                f"{self.counts['skipped']} skipped as unchanged, "
+                f"{self.counts['changed']} changed")
@@ -0,0 +1,43 @@
+import asyncio
+import os
+import sys
+import uuid
+from pathlib import Path
+import pytest
+
+# The app imports modules both as src.<module> and relative to src (see main.py)
+BACKEND_DIRECTORY = Path(__file__).resolve().parents[1]
+sys.path[:0] = [str(BACKEND_DIRECTORY), str(BACKEND_DIRECTORY / "src")]
+
+
+@pytest.fixture
+def database_url():
+    """Postgres to run database tests against, they're skipped without
+    TEST_DATABASE_URL.
+    """
+    url = os.environ.get("TEST_DATABASE_URL")
+    if url is None:
+        pytest.skip("TEST_DATABASE_URL isn't set")
+
+    return url
+
+
+@pytest.fixture
+def test_schema(database_url):
+    """A new schema dropped after the test, connect with
+    server_settings={"search_path": test_schema}.
+    """
+    import asyncpg
+
+    schema = f"test_{uuid.uuid4().hex}"
+
+    async def execute(query):
+        connection = await asyncpg.connect(database_url)
+        try:
+            await connection.execute(query)
+        finally:
+            await connection.close()
+
+    asyncio.run(execute(f"CREATE SCHEMA {schema}"))
+    yield schema
+    asyncio.run(execute(f"DROP SCHEMA {schema} CASCADE"))
@@ -0,0 +1,53 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from src import firebase
+from src.routes import dependencies
+from src.routes.admin import router
+
+
+@pytest.fixture
+def keys(monkeypatch):
+    monkeypatch.setattr(firebase, "token_verifier", None)
+    return firebase.use_local_keys("demo-project")
+
+
+@pytest.fixture
+def client():
+    app = FastAPI()
+    app.include_router(router, prefix="/api")
+    return TestClient(app)
+
+
+def get_cache_stats(client, token):
+    return client.get("/api/admin/cache-stats",
+                      headers={"Authorization": f"Bearer {token}"})
+
+
+def test_users_without_admin_claim_are_forbidden(keys, client):
+    assert get_cache_stats(client, keys.sign("user")).status_code == 403
+    assert get_cache_stats(client, keys.sign(
+        "user", admin="true")).status_code == 403
+    assert client.get("/api/admin/db-stats", headers={
+        "Authorization": f"Bearer {keys.sign('user')}"}).status_code == 403
+
+
+def test_admin_claim_is_let_through(keys, client):
+    response = get_cache_stats(client, keys.sign("user", admin=True))
+
+    assert response.status_code == 200
+    assert "schedule_results" in response.json()
+
+
+def test_allow_listed_uids_are_let_through(keys, client, monkeypatch):
+    monkeypatch.setattr(dependencies, "ADMIN_UIDS", frozenset({"admin"}))
+
+    assert get_cache_stats(client, keys.sign("admin")).status_code == 200
+    assert get_cache_stats(client, keys.sign("user")).status_code == 403
+
+
+def test_invalid_tokens_are_unauthorized(keys, client):
+    other_keys = firebase.LocalKeys("demo-project")
+
+    assert get_cache_stats(client, other_keys.sign(
+        "user", admin=True)).status_code == 401
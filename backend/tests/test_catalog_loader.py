@@ -0,0 +1,86 @@
+import asyncio
+import asyncpg
+from database_interface.create_db import CREATE_CATALOG_TABLES, load_table
+from web_scrapers.courses_web_scraper import crawl_catalog
+
+CATALOG_INDEX = '''
+<div class="az_sitemap">
+  <h2 class="letternav-head">A</h2>
+  <ul>
+    <li><a href="/UGRD/courses/accounting/">Accounting</a></li>
+    <li><a href="/UGRD/courses/anthropology/">Anthropology</a></li>
+  </ul>
+</div>
+'''
+
+def major(name, credit=120):
+    return (name, credit, "", "", "", "Undergraduate", [], [], "")
+
+
+def test_crawl_reports_failed_pages(tmp_path):
+    (tmp_path / "courses.html").write_text(CATALOG_INDEX)
+    (tmp_path / "accounting.html").write_text("<html></html>")
+    failed_pages = []
+
+    courses = asyncio.run(crawl_catalog(
+        parse_workers=1, pages_directory=tmp_path,
+        failed_pages=failed_pages))
+
+    assert courses == []
+    assert failed_pages == ["https://catalog.ufl.edu/UGRD/courses/"
+                            "anthropology/"]
+
+
+def load(database_url, schema, records, full_refresh):
+    async def run():
+        connection = await asyncpg.connect(
+            database_url, server_settings={"search_path": schema})
+        try:
+            await connection.execute(CREATE_CATALOG_TABLES)
+            await load_table(connection, "Majors", records, full_refresh)
+            return [row["name"] for row in await connection.fetch(
+                "SELECT name FROM Majors ORDER BY name")]
+        finally:
+            await connection.close()
+
+    return asyncio.run(run())
+
+
+def test_full_refresh_deletes_missing_rows(database_url, test_schema):
+    load(database_url, test_schema, [major("A"), major("B")], True)
+
+    assert load(database_url, test_schema, [major("B")], True) == ["B"]
+
+
+def test_empty_scrape_deletes_nothing(database_url, test_schema):
+    load(database_url, test_schema, [major("A"), major("B")], True)
+
+    assert load(database_url, test_schema, [], True) == ["A", "B"]
+
+
+def test_changed_only_load_deletes_nothing(database_url, test_schema):
+    load(database_url, test_schema, [major("A"), major("B")], True)
+
+    assert load(database_url, test_schema, [major("C", 60)], False) == \
+        ["A", "B", "C"]
+
+
+def test_duplicates_are_removed_before_the_keys(database_url, test_schema):
+    """Tables from before the natural keys had a row per load."""
+    async def run():
+        connection = await asyncpg.connect(
+            database_url, server_settings={"search_path": test_schema})
+        try:
+            await connection.execute(CREATE_CATALOG_TABLES.split(
+                "-- Natural keys")[0])
+            await connection.executemany(
+                "INSERT INTO Courses (code, credit, name) VALUES ($1, '3', $2)",
+                [("MAC 2311", "old"), ("MAC 2311", "new"), ("MAC 2312", "")])
+            await connection.execute(CREATE_CATALOG_TABLES)
+            await connection.execute(CREATE_CATALOG_TABLES)
+            return [tuple(row) for row in await connection.fetch(
+                "SELECT code, name FROM Courses ORDER BY code")]
+        finally:
+            await connection.close()
+
+    assert asyncio.run(run()) == [("MAC 2311", "new"), ("MAC 2312", "")]
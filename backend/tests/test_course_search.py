@@ -0,0 +1,89 @@
+import asyncio
+import asyncpg
+import pytest
+from database_interface.create_db import CREATE_CATALOG_TABLES, \
+    CREATE_COURSE_SEARCH_INDEXES, course_record, load_table
+from data_templates.course_template import Course
+from src.db.courses import courses_model
+from src.db.postgres import Postgres
+
+COURSES = [
+    Course("MAC 2311", "4", "Analytic Geometry and Calculus 1", "Mathematics",
+           "Limits, derivatives and integrals."),
+    Course("MAC 2312", "4", "Analytic Geometry and Calculus 2", "Mathematics",
+           "Techniques of integration, sequences and series."),
+    Course("MAC 2313", "4", "Analytic Geometry and Calculus 3", "Mathematics",
+           "Vectors and multivariable calculus."),
+    Course("MAP 2302", "3", "Elementary Differential Equations",
+           "Mathematics", "First order equations and Laplace transforms."),
+    Course("COP 3502", "3", "Programming Fundamentals 1",
+           "Computer and Information Science and Engineering",
+           "Problem solving with a programming language."),
+    Course("CHM 2045", "3", "General Chemistry 1", "Chemistry",
+           "Stoichiometry, with a little calculus."),
+]
+
+
+def schema_url(database_url, schema):
+    # asyncpg passes unknown DSN parameters on as server settings, public is
+    # where pg_trgm may already be installed
+    separator = "&" if "?" in database_url else "?"
+    return f"{database_url}{separator}search_path={schema},public"
+
+
+@pytest.fixture
+def search(database_url, test_schema, monkeypatch):
+    url = schema_url(database_url, test_schema)
+    database = Postgres(url, min_size=1, max_size=1)
+    monkeypatch.setattr(courses_model, "database", database)
+
+    async def load():
+        connection = await asyncpg.connect(url)
+        try:
+            await connection.execute(CREATE_CATALOG_TABLES)
+            try:
+                await connection.execute(CREATE_COURSE_SEARCH_INDEXES)
+            except asyncpg.FeatureNotSupportedError:
+                pytest.skip("pg_trgm isn't installed on the test server")
+            await load_table(connection, "Courses",
+                             [course_record(course) for course in COURSES])
+        finally:
+            await connection.close()
+
+    asyncio.run(load())
+
+    def search(query, subject=None, level=None, limit=10):
+        async def run():
+            await database.connect()
+            try:
+                return await courses_model.search_courses(query, subject,
+                                                          level, limit)
+            finally:
+                await database.disconnect()
+
+        return [course.code for course in asyncio.run(run())]
+
+    return search
+
+
+def test_code_prefixes_match_in_code_order(search):
+    assert search("MAC") == ["MAC 2311", "MAC 2312", "MAC 2313"]
+    assert search("mac 231") == ["MAC 2311", "MAC 2312", "MAC 2313"]
+    assert search("MAC2313") == ["MAC 2313"]
+    assert search("MA") == ["MAC 2311", "MAC 2312", "MAC 2313", "MAP 2302"]
+    assert search("MAC", limit=2) == ["MAC 2311", "MAC 2312"]
+
+
+def test_names_and_descriptions_match_after_codes(search):
+    assert search("calculus 3")[0] == "MAC 2313"
+    assert set(search("calculus")) >= {"MAC 2311", "MAC 2312", "MAC 2313"}
+    # A typo still finds the name
+    assert "COP 3502" in search("programing")
+    # Full-text search stems description words
+    assert search("transform") == ["MAP 2302"]
+    assert search("zzzz") == []
+
+
+def test_filters(search):
+    assert search("calculus", subject="Chemistry") == ["CHM 2045"]
+    assert search("MAC", subject="Chemistry") == []
@@ -0,0 +1,108 @@
+import asyncio
+import httpx
+import pytest
+from web_scrapers.courses_web_scraper import CatalogCrawler, crawl_catalog, \
+    parse_courses, saved_page_path
+
+URL = "https://catalog.ufl.edu/UGRD/courses/accounting/"
+SUBJECTS = ["Accounting", "Anthropology", "Biology", "Chemistry"]
+CATALOG_INDEX = '''
+<div class="az_sitemap">
+  <h2 class="letternav-head">A</h2>
+  <ul>
+    <li><a href="/UGRD/courses/accounting/">Accounting</a></li>
+    <li><a href="/UGRD/courses/anthropology/">Anthropology</a></li>
+  </ul>
+  <h2 class="letternav-head">B</h2>
+  <ul><li><a href="/UGRD/courses/biology/">Biology</a></li></ul>
+  <h2 class="letternav-head">C</h2>
+  <ul><li><a href="/UGRD/courses/chemistry/">Chemistry</a></li></ul>
+</div>
+'''
+
+
+def subject_page(subject, course_count):
+    return "<html><body><h1>Courses</h1>" + "".join(f'''
+        <div class="courseblock courseblocktoggle">
+          <p class="courseblocktitle">{subject[:3].upper()} {1000 + i}
+            {subject} {i} 3 Credits</p>
+          <p class="courseblockdesc">About {subject} {i}.</p>
+          <p class="courseblockextra noindent">Grading Scheme: Letter</p>
+          <p class="courseblockextra noindent">Prerequisite: (<a>MAC 1105</a>
+            , <a>MAC 1140</a>) .</p>
+        </div>''' for i in range(course_count)) + "</body></html>"
+
+
+@pytest.fixture
+def pages_directory(tmp_path):
+    (tmp_path / "courses.html").write_text(CATALOG_INDEX)
+    for index, subject in enumerate(SUBJECTS):
+        (tmp_path / f"{subject.lower()}.html").write_text(
+            subject_page(subject, index + 1))
+
+    return tmp_path
+
+
+def test_crawl_matches_a_serial_crawl(pages_directory):
+    courses = asyncio.run(crawl_catalog(parse_workers=2,
+                                        pages_directory=pages_directory))
+
+    expected = [course for subject in SUBJECTS for course in parse_courses(
+        (pages_directory / f"{subject.lower()}.html").read_text(), subject)]
+    assert [vars(course) for course in courses] == \
+        [vars(course) for course in expected]
+    assert len(courses) == 10
+    course = courses[0]
+    assert (course.code, course.credit, course.name, course.subject) == \
+        ("ACC 1000", "3", "Accounting 0", "Accounting")
+    assert course.prereq_description == "(MAC 1105, MAC 1140)."
+
+
+def serve(responses, requests):
+    """Transport answering with the next of responses every request."""
+    def handle(request):
+        requests.append(request)
+        status_code = responses.pop(0)
+        if status_code is None:
+            raise httpx.ConnectError("connection refused", request=request)
+        return httpx.Response(status_code, text=f"<html>{status_code}</html>")
+
+    return httpx.MockTransport(handle)
+
+
+def fetch_page(transport, **crawler_options):
+    async def run():
+        crawler = CatalogCrawler(backoff=0, **crawler_options)
+        await crawler.client.aclose()
+        crawler.client = httpx.AsyncClient(transport=transport)
+        try:
+            return await crawler.fetch_page(URL)
+        finally:
+            await crawler.aclose()
+
+    return asyncio.run(run())
+
+
+def test_failed_requests_are_retried(tmp_path):
+    requests = []
+
+    text = fetch_page(serve([503, None, 200], requests),
+                      save_directory=tmp_path)
+
+    assert text == "<html>200</html>"
+    assert len(requests) == 3
+    assert saved_page_path(tmp_path, URL).read_text() == text
+
+
+@pytest.mark.parametrize("responses, error", [
+    ([503, 503, 503], httpx.HTTPStatusError),
+    ([None, None, None], httpx.ConnectError),
+    ([404], httpx.HTTPStatusError),
+])
+def test_requests_fail_after_the_retries(responses, error):
+    requests = []
+
+    with pytest.raises(error):
+        fetch_page(serve(list(responses), requests), max_retries=2)
+    # Only retryable failures are retried
+    assert len(requests) == len(responses)
@@ -0,0 +1,120 @@
+import asyncio
+import asyncpg
+import pytest
+from database_interface.create_db import CREATE_CATALOG_TABLES
+from degree_planning import degree_audit, prerequisite_graph
+from degree_planning.catalog_version import get_catalog_version
+from degree_planning.degree_audit import AuditIndex, get_audit_index, \
+    normalize_code
+from degree_planning.model_plans import PlanItem
+from degree_planning.prerequisite_graph import get_prerequisite_graph
+
+PROGRAMS = [
+    ("major", "Computer Science", 120,
+     ["COP3502", "COP3503", "MAC2311", "PHY2048", "CHM2045"]),
+    ("minor", "Mathematics", 18, ["MAC2311", "MAC2312", "MAC2313"]),
+    ("certificate", "Music", 12, ["MUT1111"]),
+]
+# The major's plan has a choice between physics and chemistry
+MODEL_PLANS = {"Computer Science": [[
+    PlanItem("COP 3502", 1, [("COP 3502",)], False, 3, True),
+    PlanItem("Select one", 1, [("PHY 2048",), ("CHM 2045",)], False, 4,
+             False),
+    PlanItem("Elective", 1, [], True, 3, False),
+]]}
+
+
+@pytest.mark.parametrize("code, normalized", [
+    ("mac2311", "MAC 2311"), ("MAC 2311", "MAC 2311"),
+    (" chm2045l ", "CHM 2045L"), ("Elective", None), (None, None),
+])
+def test_normalize_code(code, normalized):
+    assert normalize_code(code) == normalized
+
+
+def test_audit_of_required_courses():
+    index = AuditIndex(PROGRAMS)
+    minor, = index.find_programs(["Mathematics"])
+
+    audit = index.audit(minor, index.bits_of(["mac 2311", "MAC2313",
+                                              "ABC1000"]))
+
+    assert (audit["completed"], audit["total"]) == (2, 3)
+    assert audit["completed_courses"] == ["MAC 2311", "MAC 2313"]
+    assert audit["remaining_courses"] == ["MAC 2312"]
+    assert audit["choices"] == []
+
+
+def test_choice_groups_from_model_plans():
+    index = AuditIndex(PROGRAMS, MODEL_PLANS)
+    major, = index.find_programs(["Computer Science"], kind="major")
+
+    # PHY 2048 and CHM 2045 are one requirement, either of them
+    assert index.get_progress(major, 0) == (0, 4)
+    assert index.get_progress(major, index.bits_of(["PHY2048"])) == (1, 4)
+    assert index.get_progress(major, index.bits_of(
+        ["PHY2048", "CHM2045"])) == (1, 4)
+
+    audit = index.audit(major, index.bits_of(["CHM2045"]))
+    assert audit["choices"] == [{"options": [["PHY 2048"], ["CHM 2045"]],
+                                 "count": 1, "satisfied": True}]
+    assert "CHM 2045" not in audit["remaining_courses"]
+
+
+def test_what_if_matches_auditing_every_program():
+    index = AuditIndex(PROGRAMS, MODEL_PLANS)
+    completed_bits = index.bits_of(["MAC2311", "MAC2312", "COP3502"])
+
+    results = index.what_if(completed_bits)
+
+    assert [result["name"] for result in results] == [
+        "Mathematics", "Computer Science", "Music"]
+    for result in results:
+        program, = index.find_programs([result["name"]])
+        assert (result["completed"], result["total"]) == \
+            index.get_progress(program, completed_bits)
+    assert [result["name"] for result in index.what_if(
+        completed_bits, kind="minor")] == ["Mathematics"]
+    assert len(index.what_if(completed_bits, limit=1)) == 1
+
+
+def test_indexes_are_reloaded_after_a_catalog_load(database_url, test_schema,
+                                                   monkeypatch):
+    monkeypatch.setattr(degree_audit, "audit_index", None)
+    monkeypatch.setattr(prerequisite_graph, "prerequisite_graph", None)
+
+    async def run():
+        connection = await asyncpg.connect(
+            database_url, server_settings={"search_path": test_schema})
+        try:
+            # Catalogs loaded before loads were recorded have no version
+            assert await get_catalog_version(connection) == 0
+            await connection.execute(CREATE_CATALOG_TABLES)
+            await connection.execute(
+                "INSERT INTO Minors (name, credit, required_courses) "
+                "VALUES ('Mathematics', 18, '{MAC2311}')")
+            await connection.execute(
+                "INSERT INTO Courses (code, credit) VALUES ('MAC 2311', '4')")
+            index = await get_audit_index(connection)
+            graph = await get_prerequisite_graph(connection)
+            assert await get_audit_index(connection) is index
+            assert await get_prerequisite_graph(connection) is graph
+
+            # Loaded by another process, which records the load
+            await connection.execute(
+                "INSERT INTO Minors (name, credit, required_courses) "
+                "VALUES ('Music', 12, '{MUT1111}')")
+            await connection.execute(
+                "INSERT INTO Courses (code, credit) VALUES ('MAC 2312', '4')")
+            await connection.execute("INSERT INTO CatalogLoads DEFAULT VALUES")
+
+            new_index = await get_audit_index(connection)
+            new_graph = await get_prerequisite_graph(connection)
+            assert [program.name for program in new_index.programs] == [
+                "Mathematics", "Music"]
+            assert "MAC 2312" in new_graph.ids
+            assert await get_audit_index(connection) is new_index
+        finally:
+            await connection.close()
+
+    asyncio.run(run())
@@ -0,0 +1,85 @@
+from web_scrapers import degrees_web_scraper
+from web_scrapers.degrees_web_scraper import parse_program_page, \
+    scrape_programs
+
+MAJOR_PAGE = '''
+<html><body>
+<div id="intro-text"><p>Study computers.</p><p>More.</p></div>
+<ul>
+  <li><strong>College:</strong> Engineering</li>
+  <li><strong>Credits for Degree:</strong> 120</li>
+</ul>
+<a class="bubblelink code">COP&#160;3502</a>
+<table class="sc_plangrid">
+  <tr class="plangridterm"><th>Semester One</th></tr>
+  <tr><td class="codecol">MAC&#160;2311</td><td>Critical Tracking</td>
+      <td class="hourscol">4</td></tr>
+  <tr><td class="codecol">Select one:</td><td class="hourscol"></td></tr>
+  <tr><td class="codecol">PHY&#160;2048</td><td class="hourscol">3</td></tr>
+  <tr><td class="codecol">CHM&#160;2045</td><td class="hourscol">3</td></tr>
+  <tr class="plangridterm"><th>Semester Two</th></tr>
+  <tr><td class="codecol">BSC&#160;2010&amp;2010L</td>
+      <td class="hourscol">4</td></tr>
+  <tr><td class="codecol">Elective</td><td class="hourscol">3</td></tr>
+</table>
+</body></html>
+'''
+
+MINOR_PAGE = '''
+<html><body>
+<p>The chemistry minor is for students who like reactions.</p>
+<p>Unrelated.</p>
+<ul>
+  <li><strong>College:</strong> Liberal Arts and Sciences</li>
+  <li><strong>Credits:</strong> 15</li>
+</ul>
+<h2>Required Courses</h2>
+<table><tr><td><a class="bubblelink code">CHM&#160;2045</a></td></tr>
+       <tr><td><a class="bubblelink code">CHM&#160;2046</a></td></tr></table>
+</body></html>
+'''
+
+
+def test_major_page_and_plan_are_parsed_at_once():
+    major, plan = parse_program_page(MAJOR_PAGE, "Computer Science", "major")
+
+    assert (major.name, major.credit, major.college_under) == \
+        ("Computer Science", 120, "Engineering")
+    assert major.description == "Study computers."
+    assert major.required_courses == ["COP3502"]
+    assert plan == {
+        "Semester 1": ["MAC 2311 (CT)", "Select one: PHY 2048 OR CHM 2045"],
+        "Semester 2": ["BSC 2010 & 2010L", "Elective (3 credits)"],
+    }
+
+
+def test_minor_page():
+    minor, plan = parse_program_page(MINOR_PAGE, "Chemistry Minor", "minor")
+
+    assert (minor.credit, minor.college_under) == \
+        (15, "Liberal Arts and Sciences")
+    assert minor.description == \
+        "The chemistry minor is for students who like reactions."
+    assert minor.required_courses == ["CHM2045", "CHM2046"]
+    assert plan == {}
+
+
+def test_every_program_page_is_fetched_once(monkeypatch):
+    pages = {"/cs/": MAJOR_PAGE, "/chm-minor/": MINOR_PAGE,
+             "/unchanged/": None}
+    fetched = []
+
+    def get_page(url, scrape_cache=None):
+        fetched.append(url)
+        return pages[url.removeprefix(degrees_web_scraper.BASE_URL)]
+
+    monkeypatch.setattr(degrees_web_scraper, "get_page", get_page)
+
+    minors, certificates, majors = scrape_programs(
+        {"Computer Science": "/cs/", "Chemistry Minor": "/chm-minor/",
+         "Unchanged Certificate": "/unchanged/"}, save_plans=False)
+
+    assert len(fetched) == 3
+    assert [minor.name for minor in minors] == ["Chemistry Minor"]
+    assert certificates == []
+    assert [major.name for major in majors] == ["Computer Science"]
@@ -0,0 +1,99 @@
+import asyncio
+import time
+import pytest
+from src import firebase
+from src.firebase import LocalKeys, TokenVerifier
+
+
+class CountingKeys:
+    """LocalKeys counting how often a key is looked up, which only happens
+    for tokens that aren't cached.
+    """
+
+    def __init__(self, keys):
+        self.keys = keys
+        self.lookups = 0
+
+    async def get_key(self, key_id):
+        self.lookups += 1
+        return await self.keys.get_key(key_id)
+
+
+@pytest.fixture(scope="module")
+def local_keys():
+    return LocalKeys("demo-project")
+
+
+@pytest.fixture
+def keys(local_keys):
+    return CountingKeys(local_keys)
+
+
+@pytest.fixture
+def verifier(keys):
+    return TokenVerifier("demo-project", keys)
+
+
+def verify(verifier, token):
+    return asyncio.run(verifier.verify(token))
+
+
+def test_verifies_local_tokens(local_keys, verifier):
+    decoded_token = verify(verifier, local_keys.sign(
+        "some-uid", email="someone@ufl.edu"))
+
+    assert decoded_token["uid"] == "some-uid"
+    assert decoded_token["email"] == "someone@ufl.edu"
+
+
+@pytest.mark.parametrize("make_token", [
+    lambda keys: LocalKeys("demo-project").sign("some-uid"),
+    lambda keys: LocalKeys("other-project", keys.key_id).sign("some-uid"),
+    lambda keys: keys.sign("some-uid", lifetime=-10),
+    lambda keys: keys.sign(""),
+    lambda keys: "not a token",
+])
+def test_rejects_invalid_tokens(local_keys, verifier, make_token):
+    with pytest.raises(ValueError):
+        verify(verifier, make_token(local_keys))
+
+    assert not verifier.tokens
+
+
+def test_verified_tokens_are_cached(local_keys, keys, verifier):
+    token = local_keys.sign("some-uid")
+
+    assert verify(verifier, token) == verify(verifier, token)
+    assert keys.lookups == 1
+
+
+def test_expired_tokens_are_verified_again(local_keys, keys, verifier,
+                                           monkeypatch):
+    token = local_keys.sign("some-uid", lifetime=60)
+    verify(verifier, token)
+
+    # Only the cache's clock moves, so the token still passes verification
+    now = time.time()
+    monkeypatch.setattr(firebase.time, "time", lambda: now + 120)
+    verify(verifier, token)
+
+    assert keys.lookups == 2
+
+
+def test_least_recently_used_token_is_evicted(local_keys, keys, verifier,
+                                              monkeypatch):
+    monkeypatch.setattr(firebase, "MAX_CACHED_TOKENS", 2)
+    first, second, third = (local_keys.sign(f"uid-{i}") for i in range(3))
+
+    verify(verifier, first)
+    verify(verifier, second)
+    verify(verifier, first)  # now second is the least recently used
+    verify(verifier, third)
+    assert len(verifier.tokens) == 2
+    assert keys.lookups == 3
+
+    verify(verifier, first)
+    verify(verifier, third)
+    assert keys.lookups == 3
+    verify(verifier, second)
+    assert keys.lookups == 4
@@ -0,0 +1,171 @@
+import random
+import pytest
+from data_templates.course_template import Course
+from degree_planning.four_year_planner import InfeasiblePlanError, \
+    generate_plan, validate_plan
+from degree_planning.model_plans import parse_plan_item
+from degree_planning.prerequisite_graph import PrerequisiteGraph
+
+
+def make_graph(courses):
+    """Graph of (code, credits, prerequisites, corequisites) tuples."""
+    return PrerequisiteGraph(
+        Course(code, str(credits), code, code[:3], prereq_description=prereqs,
+               coreq_description=coreqs)
+        for code, credits, prereqs, coreqs in courses)
+
+
+GRAPH = make_graph([
+    ("MAC 2311", 4, "", ""),
+    ("MAC 2312", 4, "MAC 2311", ""),
+    ("MAC 2313", 4, "MAC 2312", ""),
+    ("PHY 2048", 3, "MAC 2311", "PHY 2048L"),
+    ("PHY 2048L", 1, "", "PHY 2048"),
+    ("PHY 2049", 3, "PHY 2048 and (MAC 2312 or MAC 2313)", ""),
+    ("COP 3502", 4, "", ""),
+    ("COP 3503", 4, "COP 3502", ""),
+    ("COP 3530", 4, "COP 3503 and MAC 2312", ""),
+])
+
+
+@pytest.mark.parametrize("text, options, flexible, credits, critical", [
+    ("MAC 2311 (CT)", [("MAC 2311",)], False, None, True),
+    ("BSC 2010 & 2010L (4 credits)", [("BSC 2010", "BSC 2010L")], False, 4,
+     False),
+    ("Select one: PHY 2048 & 2048L OR PHY 2053 & 2053L (CT)",
+     [("PHY 2048", "PHY 2048L"), ("PHY 2053", "PHY 2053L")], False, None,
+     True),
+    ("Select one: POS 4934 OR Elective", [("POS 4934",)], True, None, False),
+    ("Elective (3 credits)", [], True, 3, False),
+])
+def test_parse_plan_item(text, options, flexible, credits, critical):
+    item = parse_plan_item(text, 0)
+
+    assert (item.options, item.flexible, item.credits,
+            item.critical_tracking) == (options, flexible, credits, critical)
+
+
+def model_plan(*semesters):
+    return [[parse_plan_item(text, index) for text in texts]
+            for index, texts in enumerate(semesters)]
+
+
+def errors(issues):
+    return [(issue.kind, issue.semester, issue.code) for issue in issues
+            if issue.is_error()]
+
+
+def test_valid_plan_has_no_issues():
+    plan = [["MAC 2311", "COP 3502"], ["MAC 2312", "PHY 2048", "PHY 2048L"],
+            ["PHY 2049", "COP 3503"], ["COP 3530"]]
+
+    assert validate_plan(GRAPH, plan) == []
+
+
+def test_plan_issues():
+    plan = [["MAC 2312", "PHY 2048"], ["MAC 2311", "MAC 2311", "ENC 1101"],
+            ["COP 3502", "COP 3503", "MAC 2313", "PHY 2049", "COP 3530"]]
+
+    issues = validate_plan(GRAPH, plan, max_credits=15)
+
+    assert errors(issues) == [
+        ("prerequisite", 0, "MAC 2312"), ("prerequisite", 0, "PHY 2048"),
+        ("corequisite", 0, "PHY 2048"), ("duplicate", 1, "MAC 2311"),
+        ("prerequisite", 2, "COP 3503"), ("prerequisite", 2, "COP 3530"),
+        ("credits", 2, None)]
+    warning, = [issue for issue in issues if not issue.is_error()]
+    assert (warning.kind, warning.code) == ("unknown_course", "ENC 1101")
+    assert issues[1].missing == [["MAC 2311"]]
+    assert issues[2].missing == [["PHY 2048L"]]
+
+
+def test_completed_courses_satisfy_prerequisites():
+    plan = [["MAC 2313", "COP 3530"]]
+
+    assert errors(validate_plan(GRAPH, plan, ["MAC 2312"])) == [
+        ("prerequisite", 0, "COP 3530")]
+    assert validate_plan(GRAPH, plan, ["MAC 2312", "COP 3503"]) == []
+    assert errors(validate_plan(GRAPH, [["MAC 2311"]], ["MAC 2311"])) == [
+        ("duplicate", 0, "MAC 2311")]
+
+
+def test_generated_plan_is_valid():
+    plan = model_plan(
+        ["COP 3530", "PHY 2049"], ["MAC 2313", "COP 3503"],
+        ["PHY 2048 & 2048L", "MAC 2312"], ["MAC 2311", "COP 3502"])
+
+    generated = generate_plan(GRAPH, plan, semesters=4, max_credits=12)
+
+    assert validate_plan(GRAPH, generated.codes(), max_credits=12) == []
+    assert sorted(code for codes in generated.codes() for code in codes) == \
+        sorted(GRAPH.codes)
+    # The course and its lab are one unit of 4 credits
+    unit, = [unit for units in generated.semesters for unit in units
+             if "PHY 2048" in unit.codes]
+    assert (unit.codes, unit.credits) == (("PHY 2048", "PHY 2048L"), 4)
+
+
+def test_completed_and_assumed_courses():
+    plan = model_plan(["Select one: MAC 2312 OR MAC 2313", "COP 3530"],
+                      ["PHY 2049", "Elective (3 credits)"])
+
+    generated = generate_plan(GRAPH, plan, ["MAC 2311", "MAC 2312"],
+                              semesters=2)
+
+    # MAC 2312 was completed, so it satisfies the select item, and the
+    # prerequisites that aren't in the plan don't hold the courses back
+    assert sorted(generated.codes()[0]) == ["COP 3530", "PHY 2049"]
+    assert generated.assumed == {"COP 3530": [["COP 3503"]],
+                                 "PHY 2049": [["PHY 2048"]]}
+    assert sum(len(units) for units in generated.semesters) == 3
+
+
+def test_select_items_choose_the_closest_option():
+    plan = model_plan(["Select one: COP 3530 OR MAC 2313"])
+
+    generated = generate_plan(GRAPH, plan, ["MAC 2311"], semesters=2)
+
+    # MAC 2313 is one course away, COP 3530 three
+    assert sum(generated.codes(), []) == ["MAC 2313"]
+
+
+@pytest.mark.parametrize("plan, completed, semesters, max_credits", [
+    # Three courses in a chain in two semesters
+    ((["MAC 2311", "COP 3502"], ["MAC 2312", "COP 3503"], ["COP 3530"]), (),
+     2, 18),
+    # More credits than semesters hold
+    ((["Elective (12 credits)"], ["Elective (12 credits)"]), (), 2, 10),
+    # PHY 2049 needs MAC 2312 after MAC 2311, all in two semesters
+    ((["MAC 2311"], ["MAC 2312", "PHY 2049"]), ("PHY 2048",), 2, 18),
+])
+def test_infeasible_plans(plan, completed, semesters, max_credits):
+    with pytest.raises(InfeasiblePlanError):
+        generate_plan(GRAPH, model_plan(*plan), completed, semesters,
+                      max_credits)
+
+
+def random_courses(rng, course_count):
+    courses = []
+    for index in range(course_count):
+        prereqs = rng.sample(range(index), min(index, rng.randint(0, 2)))
+        courses.append((f"ABC {1000 + index}", rng.randint(1, 4),
+                        " and ".join(f"ABC {1000 + prereq}"
+                                     for prereq in prereqs), ""))
+
+    return courses
+
+
+@pytest.mark.parametrize("seed", range(30))
+def test_generated_plans_of_random_graphs_are_valid(seed):
+    rng = random.Random(seed)
+    courses = random_courses(rng, 20)
+    graph = make_graph(courses)
+    codes = [code for code, *_ in courses]
+    rng.shuffle(codes)
+    plan = model_plan(*(codes[i:i + 5] for i in range(0, len(codes), 5)))
+
+    generated = generate_plan(graph, plan, semesters=8, max_credits=12)
+
+    assert validate_plan(graph, generated.codes(), max_credits=12) == []
+    assert sorted(code for codes in generated.codes() for code in codes) == \
+        sorted(codes)
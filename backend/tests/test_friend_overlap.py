@@ -0,0 +1,74 @@
+import pydantic
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from data_templates.time_slots import week_mask
+from semester_scheduling.friend_overlap import PersonSchedule, \
+    compare_schedules
+from src import firebase
+from src.routes.friends_routes import FriendOverlap, router
+
+
+def person(uid, sections):
+    return PersonSchedule(uid, f"{uid}-schedule", sections, week_mask(
+        [section["times"] for section in sections]))
+
+
+def section(code, unique_id, day, start, end):
+    return {"code": code, "unique_id": unique_id,
+            "times": {day: [start, end, ""]}}
+
+
+def test_compare_schedules():
+    own = person("me", [section("MAC2311", "1", "M", "0800", "0950"),
+                        section("COP3502", "2", "T", "1000", "1050")])
+    friend = person("friend", [section("MAC2311", "1", "M", "0800", "0950"),
+                               section("COP3502", "3", "W", "1300", "1350")])
+    no_schedule = PersonSchedule("nobody", None, [], 0)
+
+    result = compare_schedules(own, [friend, no_schedule], "0800", "1100",
+                               60)
+
+    assert result["schedule_id"] == "me-schedule"
+    friend_result, no_schedule_result = result["friends"]
+    assert friend_result["shared_classes"] == [
+        {"code": "MAC2311", "unique_id": "1"}]
+    assert friend_result["shared_courses"] == ["COP3502"]
+    assert {"day": "T", "start": "0800", "end": "1000"} in \
+        friend_result["free_together"]
+    assert not any(block["day"] == "M" and block["start"] < "0950"
+                   for block in friend_result["free_together"])
+    assert no_schedule_result == {"uid": "nobody", "schedule_id": None}
+    # Tuesday has 1000-1050 busy, which leaves 0800-1000 and only 10 minutes
+    assert [block for block in result["common_free_time"]
+            if block["day"] == "T"] == [
+        {"day": "T", "start": "0800", "end": "1000"}]
+
+
+@pytest.mark.parametrize("time", ["0000", "0800", "1255", "2355", "2400"])
+def test_valid_day_times(time):
+    assert FriendOverlap(semester="02025", day_start=time).day_start == \
+        time
+
+
+@pytest.mark.parametrize("time", [
+    "2599", "0075", "2405", "2500", "0801", "800", "08000", "ab00"
+])
+def test_invalid_day_times(time):
+    with pytest.raises(pydantic.ValidationError):
+        FriendOverlap(semester="02025", day_end=time)
+
+
+def test_day_start_has_to_be_before_day_end(monkeypatch):
+    monkeypatch.setattr(firebase, "token_verifier", None)
+    token = firebase.use_local_keys("demo-project").sign("me")
+    app = FastAPI()
+    app.include_router(router)
+
+    response = TestClient(app).post(
+        "/friends/overlap", params={"token": token},
+        json={"semester": "02025", "day_start": "1200",
+              "day_end": "1200"})
+
+    assert response.status_code == 400
+    assert response.json()["detail"] == "day_start has to be before day_end"
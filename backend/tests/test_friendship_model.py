@@ -0,0 +1,94 @@
+import asyncio
+import datetime
+import pytest
+from src.db.migrations import run_migrations
+from src.db.postgres import Postgres
+from src.db.users import friendship_model
+
+USERS = [("me", "Me"), ("ana", "Ana"), ("bo", "Bo"), ("stranger", "Zed")]
+SCHEDULES = [
+    # owner, semester, name, date
+    ("ana", "02025", "Old", datetime.date(2025, 1, 1)),
+    ("ana", "02025", "New", datetime.date(2025, 2, 1)),
+    ("ana", "82025", "Fall", datetime.date(2025, 3, 1)),
+    ("me", "02025", "Mine", datetime.date(2025, 1, 1)),
+    ("stranger", "02025", "Theirs", datetime.date(2025, 1, 1)),
+]
+
+
+def schema_url(database_url, schema):
+    # asyncpg passes unknown DSN parameters on as server settings
+    separator = "&" if "?" in database_url else "?"
+    return f"{database_url}{separator}search_path={schema}"
+
+
+@pytest.fixture
+def run(database_url, test_schema, monkeypatch):
+    """Run a friendship_model coroutine against a schema of USERS, SCHEDULES
+    and the friendships me -> ana (added twice), me -> bo and ana -> me.
+    """
+    database = Postgres(schema_url(database_url, test_schema), min_size=1,
+                        max_size=1)
+    monkeypatch.setattr(friendship_model, "database", database)
+
+    async def populate():
+        async with database.acquire() as connection:
+            await run_migrations(connection)
+            await connection.executemany(
+                "INSERT INTO users VALUES ($1, $2, $1 || '@ufl.edu', $1)",
+                USERS)
+            await connection.executemany(
+                "INSERT INTO schedules (owner_uid, semester, name, date) "
+                "VALUES ($1, $2, $3, $4)", SCHEDULES)
+        for user_id, friend_id in [("me", "ana"), ("me", "bo"),
+                                   ("ana", "me"), ("me", "ana")]:
+            await friendship_model.insert_friendship(user_id, friend_id)
+
+    def run(coroutine_function, *args):
+        async def run_with_pool():
+            await database.connect()
+            try:
+                return await coroutine_function(*args)
+            finally:
+                await database.disconnect()
+
+        return asyncio.run(run_with_pool())
+
+    run(populate)
+    return run
+
+
+def test_is_friend(run):
+    assert run(friendship_model.is_friend, "me", "ana") is True
+    assert run(friendship_model.is_friend, "bo", "me") is False
+    assert run(friendship_model.is_friend, "me", "stranger") is False
+
+
+def test_friend_profiles_are_listed_with_their_schedules(run):
+    friends = run(friendship_model.list_friend_profiles, "me")
+
+    assert [(friend["uid"], friend["schedule_count"], friend["schedule_name"])
+            for friend in friends] == [("ana", 3, "Fall"), ("bo", 0, None)]
+    assert friends[0]["email"] == "ana@ufl.edu"
+
+
+def test_friend_profiles_of_a_semester(run):
+    friends = run(friendship_model.list_friend_profiles, "me", "02025")
+
+    assert [(friend["uid"], friend["schedule_count"], friend["schedule_name"])
+            for friend in friends] == [("ana", 2, "New"), ("bo", 0, None)]
+
+
+def test_friend_schedules_only_include_friends(run):
+    rows = run(friendship_model.get_friend_schedules, "me", None, "02025")
+
+    assert [(row["uid"], row["id"] is not None) for row in rows] == [
+        ("me", True), ("ana", True), ("bo", False)]
+
+    rows = run(friendship_model.get_friend_schedules, "me",
+               ["bo", "stranger"], "02025")
+
+    # The user comes first even without a schedule of the semester
+    assert [row["uid"] for row in rows] == ["me", "bo"]
+    rows = run(friendship_model.get_friend_schedules, "bo", ["me"], "02025")
+    assert [(row["uid"], row["id"]) for row in rows] == [("bo", None)]
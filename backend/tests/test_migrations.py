@@ -0,0 +1,139 @@
+import asyncio
+import asyncpg
+import pytest
+from src.db import migrations
+from src.db.migrations import LATEST_VERSION, MIGRATIONS, \
+    get_schema_version, run_migrations
+
+
+def connect(database_url, schema):
+    return asyncpg.connect(database_url,
+                           server_settings={"search_path": schema})
+
+
+def migrate(database_url, schema):
+    async def run():
+        connection = await connect(database_url, schema)
+        try:
+            before = await get_schema_version(connection)
+            applied = await run_migrations(connection)
+            return before, applied, await get_schema_version(connection)
+        finally:
+            await connection.close()
+
+    return asyncio.run(run())
+
+
+# Every table the app queries
+TABLES = ["users", "plans", "schedules", "friendships", "section_snapshots",
+          "sections", "schedule_results"]
+
+
+def existing_tables(database_url, schema):
+    async def run():
+        connection = await connect(database_url, schema)
+        try:
+            return [table for table in TABLES if await connection.fetchval(
+                "SELECT to_regclass($1) IS NOT NULL", table)]
+        finally:
+            await connection.close()
+
+    return asyncio.run(run())
+
+
+def test_migrations_are_applied_once(database_url, test_schema):
+    versions = [version for version, _, _ in MIGRATIONS]
+
+    assert migrate(database_url, test_schema) == (0, versions,
+                                                  LATEST_VERSION)
+    assert migrate(database_url, test_schema) == (LATEST_VERSION, [],
+                                                  LATEST_VERSION)
+    assert existing_tables(database_url, test_schema) == TABLES
+
+
+def test_databases_made_before_migrations_are_migrated(database_url,
+                                                        test_schema):
+    async def run():
+        connection = await connect(database_url, test_schema)
+        try:
+            await connection.execute('''
+                CREATE TABLE users (uid TEXT PRIMARY KEY NOT NULL,
+                                    name TEXT NOT NULL, email TEXT NOT NULL,
+                                    username TEXT NOT NULL);
+                CREATE TABLE schedules (
+                    id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+                    owner_uid TEXT REFERENCES users(uid),
+                    semester VARCHAR(15) NOT NULL, name TEXT NOT NULL,
+                    date DATE NOT NULL DEFAULT CURRENT_DATE);
+                -- Made by ingesting sections before there was a migration
+                -- for them
+                CREATE TABLE section_snapshots (
+                    id SERIAL PRIMARY KEY, term TEXT NOT NULL,
+                    created_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+                    is_current BOOLEAN NOT NULL DEFAULT FALSE);
+                INSERT INTO section_snapshots (term, is_current)
+                VALUES ('2258', TRUE);
+                INSERT INTO users VALUES ('uid', 'Name', 'a@b.c', 'name');
+                INSERT INTO schedules (owner_uid, semester, name)
+                VALUES ('uid', '02025', 'Schedule');
+            ''')
+            applied = await run_migrations(connection)
+            schedule = await connection.fetchrow(
+                "SELECT name, sections, time_mask FROM schedules")
+            snapshot_count = await connection.fetchval(
+                "SELECT count(*) FROM section_snapshots")
+        finally:
+            await connection.close()
+
+        return applied, schedule, snapshot_count
+
+    applied, schedule, snapshot_count = asyncio.run(run())
+
+    assert applied == [version for version, _, _ in MIGRATIONS]
+    assert existing_tables(database_url, test_schema) == TABLES
+    assert snapshot_count == 1
+    assert (schedule["name"], schedule["sections"],
+            schedule["time_mask"]) == ("Schedule", "[]", None)
+
+
+def test_concurrent_migrations_apply_each_once(database_url, test_schema):
+    async def run():
+        return await asyncio.gather(*(migrate_with(database_url, test_schema)
+                                      for _ in range(4)))
+
+    async def migrate_with(database_url, schema):
+        connection = await connect(database_url, schema)
+        try:
+            return await run_migrations(connection)
+        finally:
+            await connection.close()
+
+    applied = asyncio.run(run())
+
+    assert sorted(sum(applied, [])) == [version for version, _, _
+                                        in MIGRATIONS]
+
+
+def test_failed_migration_is_rolled_back(database_url, test_schema,
+                                         monkeypatch):
+    monkeypatch.setattr(migrations, "MIGRATIONS", MIGRATIONS + [
+        (LATEST_VERSION + 1, "broken", '''
+            CREATE TABLE half_done (id INTEGER);
+            SELECT * FROM missing_table;
+        ''')])
+    monkeypatch.setattr(migrations, "LATEST_VERSION", LATEST_VERSION + 1)
+
+    with pytest.raises(asyncpg.UndefinedTableError):
+        migrate(database_url, test_schema)
+
+    async def run():
+        connection = await connect(database_url, test_schema)
+        try:
+            return (await get_schema_version(connection),
+                    await connection.fetchval(
+                        "SELECT to_regclass('half_done') IS NULL"))
+        finally:
+            await connection.close()
+
+    # The migrations before the broken one are kept
+    assert asyncio.run(run()) == (LATEST_VERSION, True)
@@ -0,0 +1,99 @@
+import json
+import os
+import pytest
+from degree_planning.model_plans import MODEL_PLANS_DIRECTORY, \
+    load_model_plans
+from degree_planning.model_plans_snapshot import ModelPlansSnapshot, \
+    build_snapshot, load_snapshot
+
+PLAN = {
+    "Semester 1": ["MAC 2311 (CT)", "BSC 2010 & 2010L (4 credits)",
+                   "Elective (3 credits)"],
+    "Semester 2": ["Select one: PHY 2048 OR CHM 2045 (CT)",
+                   "Select two: (6 credits)", "ENC 3246", "ENC 3254",
+                   "SPC 2608"],
+}
+
+
+def to_dicts(plan):
+    return [[item.to_dict() for item in items] for items in plan]
+
+
+@pytest.fixture
+def plans_directory(tmp_path):
+    directory = tmp_path / "plans"
+    directory.mkdir()
+    (directory / "Biology.json").write_text(json.dumps(PLAN))
+    (directory / "Computer Science.json").write_text(json.dumps(
+        {"Semester 1": ["COP 3502 (CT)"], "Semester 2": ["COP 3503"]}))
+
+    return directory
+
+
+def test_snapshot_matches_the_parsed_plans(tmp_path):
+    path = tmp_path / "model_plans.snapshot"
+    plans = load_model_plans(MODEL_PLANS_DIRECTORY)
+    assert build_snapshot(MODEL_PLANS_DIRECTORY, path) == len(plans)
+
+    snapshot = ModelPlansSnapshot(path)
+    try:
+        assert sorted(snapshot.programs()) == sorted(plans)
+        for name, plan in plans.items():
+            assert name in snapshot
+            assert to_dicts(snapshot.get(name)) == to_dicts(plan)
+        assert snapshot.get(next(iter(plans))) is snapshot.get(
+            next(iter(plans)))
+        with pytest.raises(KeyError):
+            snapshot.get("Not A Major")
+    finally:
+        snapshot.close()
+
+
+def test_snapshot_of_a_plan_round_trips(plans_directory, tmp_path):
+    snapshot = load_snapshot(plans_directory, tmp_path / "plans.snapshot")
+    try:
+        first, second = snapshot.get("Biology")
+        assert [item.credits for item in first] == [None, 4, 3]
+        assert first[2].flexible and first[2].options == []
+        select_two = second[1]
+        assert (select_two.count, select_two.credits) == (2, 6)
+        assert select_two.options == [("ENC 3246",), ("ENC 3254",),
+                                      ("SPC 2608",)]
+        assert [item.semester for item in second] == [1, 1]
+    finally:
+        snapshot.close()
+
+
+def test_snapshot_is_rebuilt_when_plans_change(plans_directory, tmp_path):
+    path = tmp_path / "plans.snapshot"
+    load_snapshot(plans_directory, path).close()
+
+    plan_path = plans_directory / "Computer Science.json"
+    plan_path.write_text(json.dumps({"Semester 1": ["COP 3530"]}))
+    os.utime(plan_path, ns=(0, 10 ** 18))
+    snapshot = load_snapshot(plans_directory, path)
+    try:
+        item, = snapshot.get("Computer Science")[0]
+        assert item.options == [("COP 3530",)]
+    finally:
+        snapshot.close()
+
+
+def test_unreadable_snapshot_is_rebuilt(plans_directory, tmp_path):
+    path = tmp_path / "plans.snapshot"
+    path.write_bytes(b"not a snapshot")
+
+    snapshot = load_snapshot(plans_directory, path)
+    try:
+        assert sorted(snapshot.programs()) == ["Biology", "Computer Science"]
+    finally:
+        snapshot.close()
+
+    # Written by another version
+    with open(path, "r+b") as f:
+        f.write(b"TWPLANS\x00\xff")
+    snapshot = load_snapshot(plans_directory, path)
+    try:
+        assert "Biology" in snapshot
+    finally:
+        snapshot.close()
@@ -0,0 +1,87 @@
+import asyncio
+import asyncpg
+import pytest
+from src.db.pool_metrics import LATENCY_BUCKETS_MS, LatencyHistogram, \
+    PoolMetrics
+from src.db.postgres import Postgres
+
+
+def test_latencies_are_counted_in_buckets():
+    histogram = LatencyHistogram()
+    for elapsed_ms in (0.2, 0.5, 3, 4, 40, 5000):
+        histogram.record(elapsed_ms)
+    histogram.record(7, failed=True)
+
+    stats = histogram.get_stats()
+
+    assert stats["buckets"]["<=0.5ms"] == 2
+    assert stats["buckets"]["<=5ms"] == 2
+    assert stats["buckets"]["<=10ms"] == 1
+    assert stats["buckets"][f">{LATENCY_BUCKETS_MS[-1]}ms"] == 1
+    assert sum(stats["buckets"].values()) == stats["count"] == 7
+    assert stats["errors"] == 1
+    assert stats["mean_ms"] == pytest.approx(5054.7 / 7)
+    assert stats["max_ms"] == 5000
+
+
+def test_percentiles_are_bucket_upper_bounds():
+    histogram = LatencyHistogram()
+    for elapsed_ms in [1.5] * 90 + [30] * 9 + [4000]:
+        histogram.record(elapsed_ms)
+
+    assert histogram.get_percentile(0.5) == 2
+    assert histogram.get_percentile(0.95) == 50
+    assert histogram.get_percentile(0.99) == 50
+    # The slowest bucket has no upper bound, it's capped at the max
+    assert histogram.get_percentile(1) == 4000
+    assert LatencyHistogram().get_percentile(0.5) == 0.0
+
+
+def test_acquires_past_the_pool_size_are_saturated():
+    metrics = PoolMetrics()
+
+    for _ in range(3):
+        metrics.start_acquire(max_size=2)
+    metrics.end_acquire(1, acquired=True)
+    metrics.end_acquire(1, acquired=True)
+    metrics.end_acquire(9, acquired=False)
+    metrics.release()
+
+    assert (metrics.in_use, metrics.waiting) == (1, 0)
+    assert (metrics.peak_in_use, metrics.peak_waiting) == (2, 3)
+    assert metrics.saturated_acquires == 1
+    assert metrics.acquire_wait.errors == 1
+
+
+def test_pool_queries_are_recorded_by_statement(database_url):
+    database = Postgres(database_url, min_size=1, max_size=1)
+    query = database.statement("select_one", "SELECT 1")
+
+    async def run():
+        await database.connect()
+        try:
+            async def fetch():
+                async with database.acquire() as connection:
+                    await connection.fetchval(query)
+                    await asyncio.sleep(0.01)
+
+            await asyncio.gather(*(fetch() for _ in range(3)))
+            async with database.acquire() as connection:
+                with pytest.raises(asyncpg.UndefinedTableError):
+                    await connection.fetchval(query + " FROM missing_table")
+
+            return database.get_stats()
+        finally:
+            await database.disconnect()
+
+    stats = asyncio.run(run())
+
+    assert stats["pool"]["max_size"] == 1
+    assert stats["pool"]["in_use"] == 0
+    assert stats["pool"]["peak_in_use"] == 1
+    assert stats["pool"]["saturated_acquires"] == 2
+    assert stats["acquire_wait"]["count"] == 4
+    assert stats["queries"]["select_one"]["count"] == 3
+    assert stats["queries"]["other"]["errors"] == 1
+    # Releasing a connection resets it
+    assert stats["queries"]["pool_reset"]["count"] == 4
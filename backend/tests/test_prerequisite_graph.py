@@ -0,0 +1,90 @@
+import random
+import pytest
+from data_templates.course_template import Course
+from degree_planning.prerequisite_graph import PrerequisiteGraph
+
+
+def code(index):
+    return f"ABC {1000 + index}"
+
+
+def make_graph(edges, course_count):
+    """Graph of courses 0..course_count - 1, edges are (prereq, course)."""
+    prereqs = {index: [] for index in range(course_count)}
+    for prereq, course in edges:
+        prereqs[course].append(prereq)
+
+    return PrerequisiteGraph(
+        Course(code(index), "3", f"Course {index}", "ABC",
+               prereq_description=" and ".join(code(prereq) for prereq
+                                                in prereqs[index]))
+        for index in range(course_count))
+
+
+def reachable(graph, course_id, neighbors):
+    """Courses reachable in one or more steps, by breadth first search."""
+    bits = 0
+    queue = list(neighbors(course_id))
+
+    while queue:
+        next_id = queue.pop()
+        if not bits >> next_id & 1:
+            bits |= 1 << next_id
+            queue.extend(neighbors(next_id))
+
+    return bits
+
+
+def assert_closure_matches_bfs(graph):
+    for course_id in range(len(graph)):
+        assert graph.ancestors[course_id] == reachable(
+            graph, course_id, graph.direct_prereqs)
+        assert graph.descendants[course_id] == reachable(
+            graph, course_id, graph.direct_dependents)
+
+
+def test_chain():
+    graph = make_graph([(0, 1), (1, 2), (2, 3)], 4)
+
+    assert graph.ancestors_of(code(3)) == [code(0), code(1), code(2)]
+    assert graph.descendants_of(code(0)) == [code(1), code(2), code(3)]
+    assert graph.is_ancestor(code(0), code(3))
+    assert not graph.is_ancestor(code(3), code(0))
+
+
+def test_upstream_of_cycle():
+    # 0 -> 1 -> 2 -> 3 -> 1, 3 -> 4
+    graph = make_graph([(0, 1), (1, 2), (2, 3), (3, 1), (3, 4)], 5)
+
+    assert set(graph.descendants_of(code(0))) == {code(i) for i in range(1, 5)}
+    assert set(graph.ancestors_of(code(4))) == {code(i) for i in range(4)}
+    assert_closure_matches_bfs(graph)
+
+
+@pytest.mark.parametrize("seed", range(300))
+def test_random_graphs_match_bfs(seed):
+    generator = random.Random(seed)
+    course_count = generator.randint(1, 30)
+    edges = {(generator.randrange(course_count),
+              generator.randrange(course_count))
+             for _ in range(generator.randint(0, 2 * course_count))}
+    graph = make_graph([edge for edge in edges if edge[0] != edge[1]],
+                       course_count)
+
+    assert_closure_matches_bfs(graph)
+
+
+def test_unlocked():
+    graph = PrerequisiteGraph([
+        Course("MAC 2311", "4", "Calculus 1", "MAC"),
+        Course("PHY 2048", "3", "Physics 1", "PHY"),
+        Course("PHY 2049", "3", "Physics 2", "PHY"),
+        Course("EEL 3111", "3", "Circuits", "EEL",
+               prereq_description="MAC 2311 and (PHY 2048 or PHY 2049)")
+    ])
+    circuits = graph.ids["EEL 3111"]
+
+    assert not graph.is_unlocked(circuits, graph.bits_of(["MAC 2311"]))
+    assert graph.is_unlocked(circuits, graph.bits_of(["MAC 2311",
+                                                      "PHY 2049"]))
+    assert graph.credits[graph.ids["MAC 2311"]] == 4
@@ -0,0 +1,55 @@
+import requests
+from semester_scheduling.professor_ratings import ProfessorRatingCache
+
+
+class FakeScraper:
+    """Rates every professor 4.5, except the ones in failing whose requests
+    time out.
+    """
+
+    def __init__(self, failing=()):
+        self.failing = set(failing)
+        self.scraped = []
+
+    def __call__(self, professor_name):
+        self.scraped.append(professor_name)
+        if professor_name in self.failing:
+            raise requests.Timeout("timed out")
+
+        return {"professor": professor_name, "overall_rating": "4.5"}
+
+
+def make_cache(tmp_path, scraper):
+    return ProfessorRatingCache(db_path=tmp_path / "ratings.sqlite3",
+                                scrape=scraper)
+
+
+def test_batch_survives_a_failing_scrape(tmp_path):
+    scraper = FakeScraper(failing={"Jane Doe"})
+    cache = make_cache(tmp_path, scraper)
+
+    ratings = cache.get_ratings(["John Smith", "Jane Doe", "Ann Lee"])
+
+    assert ratings["John Smith"]["overall_rating"] == "4.5"
+    assert ratings["Ann Lee"]["overall_rating"] == "4.5"
+    assert "error" in ratings["Jane Doe"]
+
+
+def test_failed_scrapes_are_not_cached(tmp_path):
+    scraper = FakeScraper(failing={"Jane Doe"})
+    cache = make_cache(tmp_path, scraper)
+    cache.get_ratings(["John Smith", "Jane Doe"])
+
+    scraper.failing.clear()
+    ratings = cache.get_ratings(["john  smith", "Jane Doe"])
+
+    assert ratings["Jane Doe"]["overall_rating"] == "4.5"
+    # John Smith was cached the first time, Jane Doe scraped again
+    assert sorted(scraper.scraped) == ["Jane Doe", "Jane Doe", "John Smith"]
+
+
+def test_get_rating_does_not_raise(tmp_path):
+    cache = make_cache(tmp_path, FakeScraper(failing={"Jane Doe"}))
+
+    assert "error" in cache.get_rating("Jane Doe")
+    assert cache.get_cached("Jane Doe") is None
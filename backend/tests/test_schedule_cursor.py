@@ -0,0 +1,237 @@
+import asyncio
+import json
+import time
+import pytest
+from fastapi import HTTPException
+from data_templates.semester_course import SemesterCourse
+from semester_scheduling.schedule_solver import ClientDisconnectedError, \
+    InvalidCursorError, ScheduleSolverPool, SolverBusyError, \
+    page_semester_schedules
+from semester_scheduling.semester_schedule import SemesterScheduler
+from src.routes import schedules
+from src.routes.schedules import decode_schedule_cursor, \
+    encode_schedule_cursor, schedule_search_hash, stream_schedules
+
+
+def section(code, unique_id, day, start):
+    return SemesterCourse(code, 3, "Course", "ABC", unique_id,
+                          [{day: [start, f"{start[:2]}50", ""]}],
+                          ["CAR 100"], [], [], "PC", "", "", "Department")
+
+
+# ABC2000 has 2 sections, ABC1000 3, so ABC2000 is searched first
+CLASS_DATA = {
+    "ABC1000": [section("ABC1000", f"1{i}", "MWF"[i], "0800")
+                for i in range(3)],
+    "ABC2000": [section("ABC2000", f"2{i}", "MW"[i], "1000")
+                for i in range(2)],
+}
+
+
+def make_scheduler(class_data=CLASS_DATA, snapshot_id=7, **filters):
+    scheduler = SemesterScheduler(list(class_data))
+    scheduler.semester_class_data = class_data
+    scheduler.snapshot_id = snapshot_id
+    scheduler.prepare_semester_schedule_search(**filters)
+
+    return scheduler
+
+
+def page(scheduler, resume_after=None, max_results=100, filters=None):
+    return page_semester_schedules(
+        0, time.time() + 60, scheduler.semester_class_data,
+        scheduler.snapshot_id, filters or {}, resume_after, max_results)
+
+
+def get_cursors(scheduler, search_hash, resume_after=None):
+    return [encode_schedule_cursor(scheduler.snapshot_id, search_hash,
+                                   positions)
+            for _, positions in page(scheduler, resume_after)["schedules"]]
+
+
+class InlinePool:
+    """Stands in for the solver's process pool, running each chunk in this
+    process, or failing with the given errors first.
+    """
+
+    def __init__(self, *errors):
+        self.errors = list(errors)
+        self.chunk_sizes = []
+
+    async def run(self, request, solve, time_budget, *args):
+        if self.errors:
+            raise self.errors.pop(0)
+        self.chunk_sizes.append(args[-1])
+
+        return solve(0, time.time() + time_budget, *args)
+
+
+class ConnectedRequest:
+    async def is_disconnected(self):
+        return False
+
+
+def stream(scheduler, limit, first_chunk_size, pool, monkeypatch):
+    monkeypatch.setattr(schedules, "get_schedule_solver_pool", lambda: pool)
+    search_hash = schedule_search_hash(scheduler, {})
+    chunk = page(scheduler, max_results=first_chunk_size)
+
+    async def run():
+        return [json.loads(line) async for line in stream_schedules(
+            ConnectedRequest(), scheduler, {}, search_hash, limit,
+            time.time() + 60, chunk, first_chunk_size)]
+
+    return asyncio.run(run())
+
+
+def decode_error(cursor, scheduler, search_hash):
+    with pytest.raises(HTTPException) as error:
+        decode_schedule_cursor(cursor, scheduler, search_hash)
+
+    return error.value.status_code
+
+
+def test_resuming_from_every_cursor_continues_the_search():
+    scheduler = make_scheduler()
+    search_hash = schedule_search_hash(scheduler, {})
+    cursors = get_cursors(scheduler, search_hash)
+    assert len(cursors) == 6
+
+    for i, cursor in enumerate(cursors):
+        resume_after = decode_schedule_cursor(cursor, scheduler, search_hash)
+        assert get_cursors(scheduler, search_hash, resume_after) == \
+            cursors[i + 1:]
+
+
+def test_search_hash_normalizes_filters():
+    scheduler = make_scheduler()
+
+    assert schedule_search_hash(
+        scheduler, {"day_blackouts": ["M", "F"]}) == schedule_search_hash(
+        scheduler, {"day_blackouts": ["F", "M", "F"]})
+    assert schedule_search_hash(scheduler, {}) != schedule_search_hash(
+        scheduler, {"day_blackouts": ["F"]})
+
+
+def test_cursor_of_another_snapshot_is_a_conflict():
+    scheduler = make_scheduler()
+    search_hash = schedule_search_hash(scheduler, {})
+
+    assert decode_error(encode_schedule_cursor(6, search_hash, [0, 0]),
+                        scheduler, search_hash) == 409
+
+
+def test_cursor_of_another_search_is_rejected():
+    scheduler = make_scheduler()
+    search_hash = schedule_search_hash(scheduler, {})
+    filtered = make_scheduler(day_blackouts=["F"])
+    reordered = make_scheduler(dict(reversed(CLASS_DATA.items())))
+    cursor = get_cursors(scheduler, search_hash)[0]
+
+    # Same snapshot and number of positions, but they'd point elsewhere
+    assert decode_error(cursor, filtered, schedule_search_hash(
+        filtered, {"day_blackouts": ["F"]})) == 400
+    assert decode_error(cursor, reordered,
+                        schedule_search_hash(reordered, {})) == 400
+
+
+@pytest.mark.parametrize("positions", ["0.x", "0..0", "1.0.y"])
+def test_positions_that_are_not_numbers_are_rejected(positions):
+    scheduler = make_scheduler()
+    search_hash = schedule_search_hash(scheduler, {})
+
+    assert decode_error(f"7:{search_hash}:{positions}", scheduler,
+                        search_hash) == 400
+
+
+@pytest.mark.parametrize("positions", [
+    [], [0], [0, 0, 0], [-1, 0], [0, -1], [2, 0], [0, 3]
+])
+def test_positions_outside_the_search_are_rejected(positions):
+    with pytest.raises(InvalidCursorError):
+        page(make_scheduler(), positions)
+
+
+@pytest.mark.parametrize("cursor", ["7", "7:0.0", "7:a:b:0.0"])
+def test_malformed_cursors_are_rejected(cursor):
+    scheduler = make_scheduler()
+
+    assert decode_error(cursor, scheduler,
+                        schedule_search_hash(scheduler, {})) == 400
+
+
+def test_positions_are_bounded_by_the_filtered_sections():
+    # Only 2 sections of ABC1000 are left, the last position is out of range
+    filters = {"day_blackouts": ["F"]}
+    scheduler = make_scheduler(**filters)
+
+    assert page(scheduler, [1, 1], filters=filters)["schedules"] == []
+    with pytest.raises(InvalidCursorError):
+        page(scheduler, [1, 2], filters=filters)
+
+
+def test_chunks_are_streamed_as_one_search(monkeypatch):
+    scheduler = make_scheduler()
+    search_hash = schedule_search_hash(scheduler, {})
+    pool = InlinePool()
+    lines = stream(scheduler, 100, 1, pool, monkeypatch)
+
+    assert [line["cursor"] for line in lines[:-1]] == get_cursors(
+        scheduler, search_hash)
+    assert lines[-1] == {"done": True, "cursor": lines[-2]["cursor"],
+                         "stopped_by": None}
+    # Every chunk is twice the one before, the last one runs out of
+    # schedules after 3 of the 6
+    assert pool.chunk_sizes == [2, 4]
+
+
+def test_stream_stops_at_the_limit(monkeypatch):
+    scheduler = make_scheduler()
+    pool = InlinePool()
+    lines = stream(scheduler, 4, 1, pool, monkeypatch)
+
+    assert len(lines) == 5
+    assert lines[-1] == {"done": False, "cursor": lines[-2]["cursor"],
+                         "stopped_by": None}
+    # The last chunk only looks for the schedules left of the page
+    assert pool.chunk_sizes == [2, 1]
+
+
+def test_chunks_resume_in_the_solver_pool():
+    scheduler = make_scheduler()
+    search_hash = schedule_search_hash(scheduler, {})
+    pool = ScheduleSolverPool(max_workers=1)
+    resume_after = page(scheduler, max_results=2)["schedules"][-1][1]
+
+    async def run():
+        return await pool.run(ConnectedRequest(), page_semester_schedules, 60,
+                              scheduler.semester_class_data,
+                              scheduler.snapshot_id, {}, resume_after, 100)
+
+    try:
+        chunk = asyncio.run(run())
+    finally:
+        pool.shutdown()
+
+    assert [encode_schedule_cursor(7, search_hash, positions)
+            for _, positions in chunk["schedules"]] == get_cursors(
+        scheduler, search_hash)[2:]
+
+
+def test_busy_solver_ends_the_stream_with_its_cursor(monkeypatch):
+    scheduler = make_scheduler()
+    lines = stream(scheduler, 100, 2, InlinePool(SolverBusyError()),
+                   monkeypatch)
+
+    assert len(lines) == 3
+    assert lines[-1] == {"done": False, "cursor": lines[-2]["cursor"],
+                         "stopped_by": "busy"}
+
+
+def test_disconnected_client_ends_the_stream(monkeypatch):
+    scheduler = make_scheduler()
+    lines = stream(scheduler, 100, 2, InlinePool(ClientDisconnectedError()),
+                   monkeypatch)
+
+    # Nobody is listening, so there's no final line
+    assert [line.keys() for line in lines] == [{"schedule", "cursor"}] * 2
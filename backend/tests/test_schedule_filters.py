@@ -0,0 +1,103 @@
+import subprocess
+import sys
+from pathlib import Path
+import pytest
+from data_templates.semester_course import SemesterCourse
+from semester_scheduling.schedule_filters import compile_filters
+
+
+def section(times, instructor_ratings=(), level_of_difficulty="NA",
+            would_take_again="NA"):
+    return SemesterCourse(
+        "ABC1000", 3, "Course", "ABC", "1", times, ["CAR 100"],
+        ["Jane Doe"] if instructor_ratings else [], list(instructor_ratings),
+        "PC", "", "", "Department", level_of_difficulty=level_of_difficulty,
+        would_take_again=would_take_again)
+
+
+MORNING = section([{"M": ["0830", "0920", "Period 2"],
+                    "W": ["0830", "0920", "Period 2"]}])
+AFTERNOON = section([{"T": ["1400", "1450", "Period 7"]}])
+
+
+@pytest.mark.parametrize("filters, morning, afternoon", [
+    ({}, True, True),
+    ({"earliest_time": "0830"}, True, True),
+    ({"earliest_time": "0900"}, False, True),
+    ({"latest_time": "1450"}, True, True),
+    ({"latest_time": "1445"}, True, False),
+    # Bounds inside a 5 minute slot compare the exact meeting times
+    ({"earliest_time": "0827"}, True, True),
+    ({"earliest_time": "0831"}, False, True),
+    ({"latest_time": "1452"}, True, True),
+    ({"latest_time": "1449"}, True, False),
+    ({"day_blackouts": ["W"]}, False, True),
+    ({"day_blackouts": ["R", "F"]}, True, True),
+    ({"period_blackouts": ["7"]}, True, False),
+])
+def test_time_filters(filters, morning, afternoon):
+    compiled = compile_filters(**filters)
+
+    assert MORNING.meets_requirements(compiled) is morning
+    assert AFTERNOON.meets_requirements(compiled) is afternoon
+
+
+def test_bounds_inside_a_slot_match_exact_times():
+    # Period 1 starts at 0725, inside the slot of 0727
+    first_period = section([{"M": ["0725", "0815", "Period 1"]}])
+    off_slot = section([{"R": ["0727", "0812", ""]}])
+
+    assert not first_period.meets_requirements(
+        compile_filters(earliest_time="0727"))
+    assert first_period.meets_requirements(
+        compile_filters(earliest_time="0723"))
+    assert off_slot.meets_requirements(compile_filters(earliest_time="0727",
+                                                       latest_time="0812"))
+    assert not off_slot.meets_requirements(
+        compile_filters(earliest_time="0728"))
+    assert not off_slot.meets_requirements(
+        compile_filters(latest_time="0811"))
+    assert compile_filters(earliest_time="0727") != compile_filters(
+        earliest_time="0725")
+
+
+def test_rating_filters_skip_unknown_values():
+    rated = section([{"F": ["1000", "1050", ""]}], instructor_ratings=["3.5"],
+                    level_of_difficulty="4.0", would_take_again="60%")
+    unrated = section([{"F": ["1000", "1050", ""]}])
+
+    for filters, passes in [({"min_instructor_rating": "3"}, True),
+                            ({"min_instructor_rating": "4"}, False),
+                            ({"max_level_of_difficulty": "3"}, False),
+                            ({"min_would_take_again": "50"}, True),
+                            ({"min_would_take_again": "70%"}, False)]:
+        compiled = compile_filters(**filters)
+        assert rated.meets_requirements(compiled) is passes
+        assert unrated.meets_requirements(compiled)
+
+
+def test_equivalent_filters_compile_to_the_same_filters():
+    assert compile_filters(day_blackouts=["M", "F", "M"]) is \
+        compile_filters(day_blackouts=["F", "M"])
+    assert compile_filters(min_instructor_rating=4) == \
+        compile_filters(min_instructor_rating="4")
+    assert compile_filters() != compile_filters(day_blackouts=["M"])
+
+
+def test_results_are_memoized_per_section():
+    course = section([{"M": ["0830", "0920", ""]}])
+    compiled = compile_filters(day_blackouts=["M"])
+
+    assert not course.meets_requirements(compiled)
+    assert course.filter_results == {compiled: False}
+
+
+def test_data_templates_do_not_import_the_scheduler():
+    # In a new interpreter, this one already has the scheduler imported
+    check = subprocess.run([sys.executable, "-c", (
+        "import sys; import data_templates.semester_course; "
+        "sys.exit(any(name.startswith('semester_scheduling') "
+        "for name in sys.modules))")],
+        cwd=Path(__file__).resolve().parents[1] / "src")
+
+    assert check.returncode == 0
@@ -0,0 +1,93 @@
+import itertools
+import random
+import pytest
+from data_templates.semester_course import SemesterCourse
+from data_templates.time_slots import week_mask
+from semester_scheduling.schedule_ranking import DEFAULT_SCORE_WEIGHTS, \
+    days_on_campus, early_start_hours, gap_hours, schedule_penalty, \
+    section_score
+from semester_scheduling.semester_schedule import SemesterScheduler
+
+
+def random_section(rng, code, unique_id):
+    start = rng.randrange(8 * 12, 18 * 12) * 5
+    end = start + rng.choice((50, 75))
+    times = [{day: [f"{start // 60:02d}{start % 60:02d}",
+                    f"{end // 60:02d}{end % 60:02d}", ""]
+              for day in rng.sample("MTWRF", rng.randint(1, 3))}]
+    ratings = [rng.choice(("N/A", f"{rng.uniform(1, 5):.1f}"))]
+
+    return SemesterCourse(
+        code, 3, "Course", code[:3], unique_id, times, ["CAR 100"],
+        ["Jane Doe"], ratings, "PC", "", "", "Department",
+        level_of_difficulty=f"{rng.uniform(1, 5):.1f}",
+        would_take_again=rng.choice(("N/A", f"{rng.randint(0, 100)}%")))
+
+
+def random_scheduler(rng):
+    class_data = {
+        f"ABC{1000 + i}": [random_section(rng, f"ABC{1000 + i}", f"{i}-{j}")
+                           for j in range(rng.randint(1, 6))]
+        for i in range(4)
+    }
+    scheduler = SemesterScheduler(list(class_data))
+    scheduler.semester_class_data = class_data
+
+    return scheduler, class_data
+
+
+def brute_force_scores(class_data, weights):
+    weights = {**DEFAULT_SCORE_WEIGHTS, **weights}
+    scores = []
+
+    for sections in itertools.product(*class_data.values()):
+        if all(a.is_compatible(b)
+               for a, b in itertools.combinations(sections, 2)):
+            time_mask = week_mask([time for section in sections
+                                   for time in section.times])
+            scores.append(sum(section_score(section, weights)
+                              for section in sections) -
+                          schedule_penalty(time_mask, weights))
+
+    return sorted(scores, reverse=True)
+
+
+@pytest.mark.parametrize("seed", range(40))
+@pytest.mark.parametrize("weights", [
+    {}, {"gaps": 3, "days_on_campus": 0}, {"instructor_rating": 0,
+                                           "early_start": 5},
+])
+def test_top_schedules_match_brute_force(seed, weights):
+    scheduler, class_data = random_scheduler(random.Random(seed))
+    k = random.Random(seed).randint(1, 10)
+
+    top_schedules = scheduler.get_top_semester_schedules(k=k,
+                                                         weights=weights)
+
+    expected = brute_force_scores(class_data, weights)[:k]
+    assert [score for score, _ in top_schedules] == pytest.approx(expected)
+    codes = [sections[0].code for sections in class_data.values()]
+    for score, schedule in top_schedules:
+        assert [section.code for section in schedule] == codes
+        assert [score] == pytest.approx(
+            brute_force_scores({code: [section] for code, section
+                                in zip(codes, schedule)}, weights))
+
+
+def test_negative_weights_are_rejected():
+    scheduler, _ = random_scheduler(random.Random(0))
+
+    with pytest.raises(ValueError):
+        scheduler.get_top_semester_schedules(weights={"gaps": -1})
+
+
+def test_schedule_penalties():
+    time_mask = week_mask([{"M": ["0830", "0920", ""],
+                            "W": ["1200", "1250", ""]},
+                           {"M": ["1100", "1150", ""]}])
+
+    assert days_on_campus(time_mask) == 2
+    assert early_start_hours(time_mask) == pytest.approx(1.5)
+    # 0920 to 1100 on Monday
+    assert gap_hours(time_mask) == pytest.approx(100 / 60)
+    assert early_start_hours(0) == 0
@@ -0,0 +1,96 @@
+import asyncio
+import asyncpg
+from semester_scheduling.schedule_result_cache import ScheduleResultCache, \
+    schedule_result_key
+from src.db.migrations import run_migrations
+
+RESULT = {"schedules": [], "stopped_by": None}
+
+
+def get(cache, key, snapshot_id, connection=None):
+    return asyncio.run(cache.get(key, snapshot_id, connection))
+
+
+def set_result(cache, key, snapshot_id, codes, result, connection=None):
+    asyncio.run(cache.set(key, snapshot_id, codes, result, connection))
+
+
+def test_key_ignores_code_order_and_filter_spelling():
+    key = schedule_result_key("top", ["MAC2311", "COP3502"],
+                              {"day_blackouts": ["M", "F"]}, 1, {"k": 5})
+
+    assert key == schedule_result_key(
+        "top", ["COP3502", "MAC2311", "COP3502"],
+        {"day_blackouts": ["F", "M"], "earliest_time": ""}, 1, {"k": 5})
+    for other_key in [
+        schedule_result_key("generate", ["MAC2311", "COP3502"],
+                            {"day_blackouts": ["M", "F"]}, 1, {"k": 5}),
+        schedule_result_key("top", ["MAC2311"],
+                            {"day_blackouts": ["M", "F"]}, 1, {"k": 5}),
+        schedule_result_key("top", ["MAC2311", "COP3502"],
+                            {"day_blackouts": ["M"]}, 1, {"k": 5}),
+        schedule_result_key("top", ["MAC2311", "COP3502"],
+                            {"day_blackouts": ["M", "F"]}, 2, {"k": 5}),
+        schedule_result_key("top", ["MAC2311", "COP3502"],
+                            {"day_blackouts": ["M", "F"]}, 1, {"k": 6}),
+    ]:
+        assert other_key != key
+
+
+def test_least_recently_used_results_are_evicted():
+    cache = ScheduleResultCache(max_in_memory=2)
+    for key in "ab":
+        set_result(cache, key, 1, ["MAC2311"], RESULT)
+
+    assert get(cache, "a", 1) == (["MAC2311"], RESULT)
+    set_result(cache, "c", 1, ["MAC2311"], RESULT)
+
+    assert get(cache, "b", 1) is None
+    assert get(cache, "a", 1) is not None
+    assert get(cache, "c", 1) is not None
+    stats = cache.get_stats()
+    assert (stats["hits"], stats["misses"], stats["evictions"]) == (3, 1, 1)
+
+
+def test_new_snapshot_invalidates_results_in_memory():
+    cache = ScheduleResultCache()
+    set_result(cache, "a", 1, ["MAC2311"], RESULT)
+
+    assert get(cache, "a", 2) is None
+    assert get(cache, "a", 1) is None
+    assert cache.get_stats()["invalidations"] == 1
+
+
+def test_results_are_shared_through_postgres(database_url, test_schema):
+    async def run():
+        connection = await asyncpg.connect(
+            database_url, server_settings={"search_path": test_schema})
+        try:
+            await run_migrations(connection)
+            snapshot_id = await connection.fetchval(
+                "INSERT INTO section_snapshots (term, is_current) "
+                "VALUES ('2258', TRUE) RETURNING id")
+
+            await ScheduleResultCache().set("a", snapshot_id,
+                                            ["MAC2311", "COP3502"], RESULT,
+                                            connection)
+            # Another app worker, with nothing in memory
+            worker_cache = ScheduleResultCache()
+            shared = await worker_cache.get("a", snapshot_id, connection)
+            in_memory = await worker_cache.get("a", snapshot_id)
+
+            # Results of deleted snapshots are deleted with them
+            await connection.execute("DELETE FROM section_snapshots")
+            remaining = await connection.fetchval(
+                "SELECT count(*) FROM schedule_results")
+        finally:
+            await connection.close()
+
+        return shared, in_memory, worker_cache.get_stats(), remaining
+
+    shared, in_memory, stats, remaining = asyncio.run(run())
+
+    assert shared == (["MAC2311", "COP3502"], RESULT)
+    assert in_memory == shared
+    assert (stats["shared_hits"], stats["hits"]) == (1, 1)
+    assert remaining == 0
@@ -0,0 +1,77 @@
+import time
+from data_templates.semester_course import SemesterCourse
+from semester_scheduling.schedule_solver import STOP_CHECK_INTERVAL, \
+    SearchBudget, rank_semester_schedules, solve_semester_schedules
+
+
+def section(code, unique_id, day, start, end):
+    return SemesterCourse(code, 3, "Course", "ABC", unique_id,
+                          [{day: [start, end, ""]}], ["CAR 100"], [], [],
+                          "PC", "", "", "Department")
+
+
+# 3 * 3 sections on different days, so all 9 schedules are valid
+CLASS_DATA = {
+    "ABC1000": [section("ABC1000", f"1{i}", "MWF"[i], "0800", "0850")
+                for i in range(3)],
+    "ABC2000": [section("ABC2000", f"2{i}", "MWF"[i], "1000", "1050")
+                for i in range(3)],
+}
+
+
+def run_budget(budget, steps):
+    return sum(budget() for _ in range(steps))
+
+
+def test_budget_of_passed_deadline_is_stopped_from_the_start():
+    budget = SearchBudget(time.time() - 1)
+
+    assert budget.stopped_by == "time"
+    assert budget()
+
+
+def test_budget_stops_after_its_deadline():
+    budget = SearchBudget(time.time() + 60)
+    assert run_budget(budget, 2 * STOP_CHECK_INTERVAL) == 0
+
+    budget.deadline = time.time() - 1
+    run_budget(budget, STOP_CHECK_INTERVAL)
+
+    assert budget.stopped_by == "time"
+    assert budget()
+
+
+def test_budget_stops_when_cancelled():
+    cancelled = []
+    budget = SearchBudget(time.time() + 60, lambda: bool(cancelled))
+    assert run_budget(budget, STOP_CHECK_INTERVAL) == 0
+
+    cancelled.append(True)
+    run_budget(budget, STOP_CHECK_INTERVAL)
+
+    assert budget.stopped_by == "cancelled"
+
+
+def test_solve_finds_every_schedule():
+    result = solve_semester_schedules(0, time.time() + 60, CLASS_DATA, None,
+                                      {}, 100)
+
+    assert len(result["schedules"]) == 9
+    assert result["stopped_by"] is None
+
+
+def test_solve_stops_at_max_results():
+    result = solve_semester_schedules(0, time.time() + 60, CLASS_DATA, None,
+                                      {}, 4)
+
+    assert len(result["schedules"]) == 4
+    assert result["stopped_by"] == "results"
+
+
+def test_solves_expired_in_the_queue_do_not_search():
+    deadline = time.time() - 1
+
+    assert solve_semester_schedules(0, deadline, CLASS_DATA, None, {}, 100) \
+        == {"schedules": [], "stopped_by": "time"}
+    assert rank_semester_schedules(0, deadline, CLASS_DATA, None, {}, 3, {}) \
+        == {"schedules": [], "stopped_by": "time"}
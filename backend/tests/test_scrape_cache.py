@@ -0,0 +1,81 @@
+import asyncio
+import httpx
+from web_scrapers.courses_web_scraper import CatalogCrawler
+from web_scrapers.scrape_cache import ScrapeCache
+
+URL = "https://catalog.ufl.edu/UGRD/courses/accounting/"
+
+
+def test_unchanged_pages_are_skipped_after_a_commit(tmp_path):
+    cache = ScrapeCache(tmp_path / "cache.sqlite3")
+
+    assert cache.request_headers(URL) == {}
+    assert cache.is_changed(URL, "<html>1</html>", {"ETag": '"1"'})
+    # Nothing is saved until the changed pages were processed
+    assert ScrapeCache(tmp_path / "cache.sqlite3").is_changed(
+        URL, "<html>1</html>")
+    cache.commit()
+
+    next_run = ScrapeCache(tmp_path / "cache.sqlite3")
+    assert next_run.request_headers(URL) == {"If-None-Match": '"1"'}
+    assert not next_run.is_changed(URL, "<html>1</html>")
+    assert next_run.is_changed(URL, "<html>2</html>")
+    assert next_run.report() == \
+        "2 pages fetched, 1 skipped as unchanged, 1 changed"
+
+
+def serve(pages, requests):
+    """Transport answering like a server with ETags, pages is url -> text."""
+    def handle(request):
+        requests.append(request)
+        text = pages[str(request.url)]
+        etag = f'"{hash(text)}"'
+        if request.headers.get("If-None-Match") == etag:
+            return httpx.Response(304)
+        return httpx.Response(200, text=text, headers={
+            "ETag": etag, "Last-Modified": "Mon, 06 Jan 2025 00:00:00 GMT"})
+
+    return httpx.MockTransport(handle)
+
+
+def fetch(cache, transport):
+    async def run():
+        crawler = CatalogCrawler()
+        await crawler.client.aclose()
+        crawler.client = httpx.AsyncClient(transport=transport)
+        try:
+            return await crawler.fetch_page(URL, cache)
+        finally:
+            await crawler.aclose()
+
+    return asyncio.run(run())
+
+
+def test_catalog_requests_are_conditional(tmp_path):
+    pages = {URL: "<html>1</html>"}
+    requests = []
+    transport = serve(pages, requests)
+    cache = ScrapeCache(tmp_path / "cache.sqlite3")
+
+    assert fetch(cache, transport) == "<html>1</html>"
+    cache.commit()
+    assert fetch(cache, transport) is None
+    pages[URL] = "<html>2</html>"
+    assert fetch(cache, transport) == "<html>2</html>"
+
+    assert "If-None-Match" not in requests[0].headers
+    assert requests[1].headers["If-Modified-Since"] == \
+        "Mon, 06 Jan 2025 00:00:00 GMT"
+    assert cache.counts == {"fetched": 2, "skipped": 1, "changed": 2}
+
+
+def test_pages_without_validators_are_compared_by_content(tmp_path):
+    requests = []
+    transport = httpx.MockTransport(lambda request: requests.append(
+        request) or httpx.Response(200, text="<html>1</html>"))
+    cache = ScrapeCache(tmp_path / "cache.sqlite3")
+
+    assert fetch(cache, transport) == "<html>1</html>"
+    cache.commit()
+    assert fetch(cache, transport) is None
+    assert requests[1].headers.get("If-None-Match") is None
@@ -0,0 +1,77 @@
+import itertools
+from data_templates.semester_course import SemesterCourse
+from semester_scheduling.section_conflict_index import SectionConflictIndex
+
+
+def section(code, unique_id, times):
+    return SemesterCourse(code, 3, "Course", code[:3], unique_id, times,
+                          ["CAR 100"], [], [], "PC", "", "", "Department")
+
+
+# Back to back, overlapping and on other days, with one two-location section
+CLASS_DATA = {
+    "ABC1000": [section("ABC1000", "1", [{"M": ["0830", "0920", ""]}]),
+                section("ABC1000", "2", [{"T": ["0830", "0920", ""]}])],
+    "ABC2000": [section("ABC2000", "3", [{"M": ["0920", "1010", ""]}]),
+                section("ABC2000", "4", [{"M": ["0900", "0950", ""]}]),
+                section("ABC2000", "5", [{"W": ["0830", "0920", ""]},
+                                         {"T": ["0915", "1005", ""]}])],
+    "ABC3000": [section("ABC3000", "6", [{"R": ["1200", "1250", ""]}])],
+}
+
+
+def make_index():
+    index = SectionConflictIndex()
+    for code, sections in CLASS_DATA.items():
+        index.add_course(code, sections)
+
+    return index
+
+
+def test_conflicts_match_pairwise_checks():
+    index = make_index()
+
+    for a, b in itertools.combinations(range(len(index)), 2):
+        conflicts = not index.sections[a].is_compatible(index.sections[b])
+        assert index.conflicts_with(a, 1 << b) is conflicts
+        assert index.conflicts_with(b, 1 << a) is conflicts
+
+    conflicting = {(index.sections[a].unique_id, index.sections[b].unique_id)
+                   for a, b in itertools.combinations(range(len(index)), 2)
+                   if index.conflicts_with(a, 1 << b)}
+    # Sections of the same course always conflict
+    assert conflicting == {("1", "2"), ("1", "4"), ("2", "5"), ("3", "4"),
+                           ("3", "5"), ("4", "5")}
+
+
+def test_courses_are_indexed_once():
+    index = SectionConflictIndex()
+    sections = CLASS_DATA["ABC2000"]
+
+    section_ids = index.add_course("ABC2000", sections)
+
+    assert index.add_course("ABC2000", sections) is section_ids
+    assert len(index) == len(sections)
+
+
+def test_is_valid_schedule():
+    index = make_index()
+    ids = {section.unique_id: section_id
+           for section_id, section in enumerate(index.sections)}
+
+    assert index.is_valid_schedule([ids["1"], ids["3"], ids["6"]])
+    assert index.is_valid_schedule([ids["2"], ids["4"]])
+    assert not index.is_valid_schedule([ids["1"], ids["4"]])
+    assert not index.is_valid_schedule([ids["2"], ids["5"], ids["6"]])
+
+
+def test_fitting_sections():
+    index = make_index()
+    ids = {section.unique_id: section_id
+           for section_id, section in enumerate(index.sections)}
+
+    assert index.fitting_sections("ABC2000", [ids["1"]]) == [ids["3"],
+                                                             ids["5"]]
+    assert index.fitting_sections("ABC2000", [ids["2"]]) == [ids["3"],
+                                                             ids["4"]]
+    assert index.fitting_sections("ABC9999", [ids["1"]]) == []
@@ -0,0 +1,75 @@
+import asyncio
+import time
+import httpx
+from semester_scheduling.section_fetcher import HostRateLimiter, \
+    SectionFetcher
+from semester_scheduling.stub_soc_server import EMPTY_RESPONSE, \
+    run_stub_soc_server
+
+RESPONSES = {f"ABC{number}": [{"COURSES": [{"code": f"ABC{number}"}]}]
+             for number in range(1000, 1008)}
+DELAY = 0.2
+
+
+def fetch_courses(fetcher, course_codes):
+    async def run():
+        try:
+            return await fetcher.fetch_courses(course_codes)
+        finally:
+            await fetcher.aclose()
+
+    return asyncio.run(run())
+
+
+def test_courses_are_fetched_concurrently_in_order():
+    codes = list(reversed(RESPONSES)) + ["XYZ1000"]
+
+    with run_stub_soc_server(RESPONSES, delay=DELAY) as base_url:
+        start = time.monotonic()
+        responses = fetch_courses(SectionFetcher(
+            base_url, max_concurrency=len(codes), requests_per_second=0),
+            codes)
+        elapsed = time.monotonic() - start
+
+    assert list(responses) == codes
+    assert responses["ABC1007"] == RESPONSES["ABC1007"]
+    assert responses["XYZ1000"] == EMPTY_RESPONSE
+    assert elapsed < DELAY * len(codes) / 2
+
+
+def test_requests_in_flight_are_limited():
+    with run_stub_soc_server(RESPONSES, delay=DELAY) as base_url:
+        start = time.monotonic()
+        fetch_courses(SectionFetcher(base_url, max_concurrency=2,
+                                     requests_per_second=0), list(RESPONSES))
+        elapsed = time.monotonic() - start
+
+    assert elapsed >= DELAY * len(RESPONSES) / 2
+
+
+def test_failed_courses_are_none():
+    fetcher = SectionFetcher("https://one.uf.edu/apix/soc/schedule")
+    fetcher.client = httpx.AsyncClient(transport=httpx.MockTransport(
+        lambda request: httpx.Response(503) if "ABC1000" in str(request.url)
+        else httpx.Response(200, text="not json")))
+
+    assert fetch_courses(fetcher, ["ABC1000", "ABC1001"]) == {
+        "ABC1000": None, "ABC1001": None}
+
+
+def test_hosts_are_rate_limited_separately():
+    rate_limiter = HostRateLimiter(requests_per_second=20)
+
+    async def wait(host):
+        await rate_limiter.wait(host)
+        return time.monotonic()
+
+    async def run():
+        return await asyncio.gather(*(wait(host) for host in "aaaab"))
+
+    times = asyncio.run(run())
+
+    # 1 / 20 seconds apart on host a, counted from the first so a late
+    # wake up doesn't shorten the next gap, host b doesn't wait for it
+    assert all(times[i] - times[0] >= 0.045 * i for i in range(4))
+    assert times[4] - times[0] < 0.045
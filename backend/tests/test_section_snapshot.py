@@ -0,0 +1,140 @@
+import asyncio
+import asyncpg
+from database_interface.ingest_sections import ingest_sections
+from semester_scheduling import semester_schedule
+from semester_scheduling.section_conflict_index import \
+    get_snapshot_conflict_index
+from semester_scheduling.section_fetcher import SectionFetcher
+from semester_scheduling.section_snapshot import get_current_snapshot_id
+from semester_scheduling.semester_schedule import SemesterScheduler
+from semester_scheduling.stub_soc_server import TERM_PAGE_SIZE, \
+    run_stub_soc_server
+
+TERM = "2258"
+
+
+def api_course(number, section_count=2, instructors=("Jane Doe",)):
+    """One course of a UF schedule API response."""
+    return {
+        "code": f"ABC{number}",
+        "name": f"Course {number}",
+        "sections": [{
+            "classNumber": f"{number}{i}",
+            "credits": 3,
+            "deptName": "Department",
+            "genEd": ["M"],
+            "instructors": [{"name": name} for name in instructors],
+            "meetTimes": [{"meetDays": "MWF", "meetTimeBegin": "8:30 AM",
+                           "meetTimeEnd": "9:20 AM", "meetBuilding": "CAR",
+                           "meetRoom": "100"},
+                          {"meetDays": "T", "meetTimeBegin": "1:55 PM",
+                           "meetTimeEnd": "2:45 PM", "meetBuilding": "LIT",
+                           "meetRoom": "109"}]
+        } for i in range(section_count)]
+    }
+
+
+# More courses than fit in a page of a term-wide query
+RESPONSES = {f"ABC{number}": [{"COURSES": [api_course(number)]}]
+             for number in range(1000, 1000 + TERM_PAGE_SIZE + 10)}
+
+
+def schema_url(database_url, schema):
+    # asyncpg passes unknown DSN parameters on as server settings
+    separator = "&" if "?" in database_url else "?"
+    return f"{database_url}{separator}search_path={schema}"
+
+
+def test_ingested_snapshot_replaces_the_last_one(database_url, test_schema):
+    url = schema_url(database_url, test_schema)
+
+    async def run():
+        with run_stub_soc_server(RESPONSES) as soc_url:
+            first_id = await ingest_sections(url, TERM, False, soc_url)
+            second_id = await ingest_sections(url, TERM, False, soc_url)
+
+        connection = await asyncpg.connect(url)
+        try:
+            assert await get_current_snapshot_id(connection, TERM) == \
+                second_id
+            assert await connection.fetchval(
+                "SELECT count(*) FROM section_snapshots") == 1
+            assert await connection.fetchval(
+                "SELECT count(*) FROM sections WHERE snapshot_id = $1",
+                second_id) == 2 * len(RESPONSES)
+            assert first_id != second_id
+
+            scheduler = SemesterScheduler(["ABC1000", "ABC1059", "XYZ1000"])
+            await scheduler.get_semester_class_data_from_db(connection, TERM)
+        finally:
+            await connection.close()
+
+        return scheduler, second_id
+
+    scheduler, snapshot_id = asyncio.run(run())
+
+    assert scheduler.snapshot_id == snapshot_id
+    assert scheduler.semester_class_data["XYZ1000"] == []
+    sections = scheduler.semester_class_data["ABC1059"]
+    assert [section.unique_id for section in sections] == ["10590", "10591"]
+    section = sections[0]
+    assert section.code == "ABC 1059"
+    assert section.credit == 3
+    assert section.times == [{"M": ["0830", "0920", "Period 2"],
+                              "W": ["0830", "0920", "Period 2"],
+                              "F": ["0830", "0920", "Period 2"]},
+                             {"T": ["1355", "1445", "Period 7"]}]
+    assert section.locations == ["CAR 100", "LIT 109"]
+    assert section.gen_ed == ["M"]
+    # Every request on the snapshot shares its conflict index
+    assert scheduler.conflict_index is get_snapshot_conflict_index(
+        snapshot_id)
+
+
+class NotMigratedConnection:
+    """Connection to a database the section tables were never made in."""
+
+    async def fetchval(self, query, *args):
+        raise asyncpg.UndefinedTableError(
+            'relation "section_snapshots" does not exist')
+
+    async def fetch(self, query, *args):
+        raise AssertionError("there's no snapshot to read sections from")
+
+
+def test_sections_come_from_the_api_without_snapshot_tables(monkeypatch):
+    # Without instructors there are no ratings to look up
+    responses = {"ABC1000": [{"COURSES": [api_course(1000,
+                                                     instructors=())]}]}
+
+    async def run():
+        with run_stub_soc_server(responses) as soc_url:
+            fetcher = SectionFetcher(soc_url)
+            monkeypatch.setattr(semester_schedule, "get_section_fetcher",
+                                lambda: fetcher)
+            scheduler = SemesterScheduler(["ABC1000"])
+            try:
+                await scheduler.get_semester_class_data_from_db(
+                    NotMigratedConnection(), TERM)
+            finally:
+                await fetcher.aclose()
+
+        return scheduler
+
+    scheduler = asyncio.run(run())
+
+    assert scheduler.snapshot_id is None
+    assert [section.unique_id for section in
+            scheduler.semester_class_data["ABC1000"]] == ["10000", "10001"]
+
+
+def test_no_snapshot_before_the_first_ingest(database_url, test_schema):
+    async def run():
+        connection = await asyncpg.connect(
+            database_url, server_settings={"search_path": test_schema})
+        try:
+            return await get_current_snapshot_id(connection, TERM)
+        finally:
+            await connection.close()
+
+    assert asyncio.run(run()) is None
@@ -0,0 +1,107 @@
+import itertools
+import random
+import pytest
+from data_templates.semester_course import SemesterCourse
+from semester_scheduling.section_conflict_index import SectionConflictIndex
+from semester_scheduling.semester_schedule import SemesterScheduler
+
+
+def random_section(rng, code, unique_id):
+    start = rng.randrange(8 * 12, 18 * 12) * 5
+    end = start + rng.choice((50, 75))
+    times = [{day: [f"{start // 60:02d}{start % 60:02d}",
+                    f"{end // 60:02d}{end % 60:02d}", ""]
+              for day in rng.sample("MTWRF", rng.randint(1, 3))}]
+
+    return SemesterCourse(code, 3, "Course", code[:3], unique_id, times,
+                          ["CAR 100"], ["Jane Doe"],
+                          [f"{rng.uniform(1, 5):.1f}"], "PC", "", "",
+                          "Department")
+
+
+def random_class_data(rng, course_count=4, max_sections=5):
+    return {
+        f"ABC{1000 + i}": [random_section(rng, f"ABC{1000 + i}", f"{i}-{j}")
+                           for j in range(rng.randint(1, max_sections))]
+        for i in range(course_count)
+    }
+
+
+def make_scheduler(class_data, conflict_index=None):
+    scheduler = SemesterScheduler(list(class_data), conflict_index)
+    scheduler.semester_class_data = class_data
+
+    return scheduler
+
+
+def brute_force_schedules(class_data):
+    return [list(sections)
+            for sections in itertools.product(*class_data.values())
+            if all(a.is_compatible(b)
+                   for a, b in itertools.combinations(sections, 2))]
+
+
+def unique_ids(schedules):
+    return sorted(tuple(section.unique_id for section in schedule)
+                  for schedule in schedules)
+
+
+@pytest.mark.parametrize("seed", range(40))
+def test_search_finds_exactly_the_valid_schedules(seed):
+    class_data = random_class_data(random.Random(seed))
+    scheduler = make_scheduler(class_data)
+    scheduler.prepare_semester_schedule_search()
+
+    schedules = [schedule for schedule, _ in
+                 scheduler.iter_valid_semester_schedules()]
+
+    assert unique_ids(schedules) == unique_ids(
+        brute_force_schedules(class_data))
+    # Courses stay in the requested order whatever order they're searched in
+    codes = [sections[0].code for sections in class_data.values()]
+    for schedule in schedules:
+        assert [section.code for section in schedule] == codes
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_filters_are_applied_before_searching(seed):
+    class_data = random_class_data(random.Random(seed))
+    scheduler = make_scheduler(class_data)
+    scheduler.prepare_semester_schedule_search(day_blackouts=["F"],
+                                               min_instructor_rating="3")
+
+    schedules = [schedule for schedule, _ in
+                 scheduler.iter_valid_semester_schedules()]
+    filtered_data = {
+        code: [section for section in sections
+               if "F" not in section.times[0] and
+               float(section.instructor_ratings[0]) >= 3]
+        for code, sections in class_data.items()
+    }
+
+    assert unique_ids(schedules) == unique_ids(
+        brute_force_schedules(filtered_data))
+
+
+def test_search_stops_when_asked():
+    class_data = random_class_data(random.Random(0), course_count=5,
+                                   max_sections=8)
+    scheduler = make_scheduler(class_data)
+    scheduler.prepare_semester_schedule_search()
+
+    assert list(scheduler.iter_valid_semester_schedules(
+        should_stop=lambda: True)) == []
+
+
+def test_shared_index_gives_the_same_schedules():
+    class_data = random_class_data(random.Random(2))
+    shared_index = SectionConflictIndex()
+    # Another search indexed some of the courses first
+    make_scheduler(dict(list(class_data.items())[1:]),
+                   shared_index).prepare_semester_schedule_search()
+    scheduler = make_scheduler(class_data, shared_index)
+    scheduler.prepare_semester_schedule_search()
+
+    assert unique_ids(schedule for schedule, _ in
+                      scheduler.iter_valid_semester_schedules()) == \
+        unique_ids(brute_force_schedules(class_data))
@@ -0,0 +1,93 @@
+import random
+import pytest
+from data_templates.time_slots import WEEK_DAYS, blackout_mask, \
+    free_blocks, mask_from_bytes, mask_to_bytes, meeting_times_mask, \
+    period_mask, time_range_mask, time_to_minutes, week_mask
+
+
+def overlaps_by_minutes(times, other_times):
+    """Meeting time overlap the slow way, minute by minute."""
+    def minutes(times):
+        return {(day, minute)
+                for time_for_location in times
+                for day, (start, end, _) in time_for_location.items()
+                for minute in range(time_to_minutes(start),
+                                    max(time_to_minutes(end),
+                                        time_to_minutes(start) + 1))}
+
+    return bool(minutes(times) & minutes(other_times))
+
+
+def random_times(rng):
+    times = []
+
+    for _ in range(rng.randint(1, 2)):
+        start = rng.randrange(7 * 12, 21 * 12) * 5
+        end = start + rng.choice((50, 75, 110))
+        times.append({
+            day: [f"{start // 60:02d}{start % 60:02d}",
+                  f"{end // 60:02d}{end % 60:02d}", ""]
+            for day in rng.sample(WEEK_DAYS[:5], rng.randint(1, 3))
+        })
+
+    return times
+
+
+def test_back_to_back_meetings_do_not_overlap():
+    assert time_range_mask("M", "0830", "0920") & \
+        time_range_mask("M", "0920", "1010") == 0
+    assert time_range_mask("M", "0830", "0920") & \
+        time_range_mask("M", "0915", "1010")
+    assert time_range_mask("M", "0830", "0920") & \
+        time_range_mask("T", "0830", "0920") == 0
+
+
+@pytest.mark.parametrize("seed", range(50))
+def test_masks_overlap_exactly_when_meetings_do(seed):
+    rng = random.Random(seed)
+
+    for _ in range(20):
+        times, other_times = random_times(rng), random_times(rng)
+        assert (week_mask(times) & week_mask(other_times) != 0) == \
+            overlaps_by_minutes(times, other_times)
+
+
+def test_masks_round_trip_through_bytes():
+    mask = week_mask([{"M": ["0830", "0920", ""], "S": ["2300", "2400", ""]}])
+
+    assert mask_from_bytes(mask_to_bytes(mask)) == mask
+    assert mask_from_bytes(None) == 0
+
+
+def test_blackouts():
+    morning = meeting_times_mask({"W": ["0725", "0815", "Period 1"]})
+
+    assert morning & blackout_mask(earliest_time="0800")
+    assert not morning & blackout_mask(earliest_time="0725")
+    assert morning & blackout_mask(day_blackouts=("W",))
+    assert morning & period_mask("Period 1")
+    assert morning & period_mask("1") == morning
+    assert period_mask("E1") == period_mask("12")
+    assert period_mask("15") == 0
+
+
+def test_free_blocks_of_an_empty_week():
+    assert free_blocks(0, "0800", "1000") == [
+        (day, "0800", "1000") for day in WEEK_DAYS]
+
+
+def test_free_blocks_skip_busy_time_and_short_gaps():
+    busy = week_mask([{"M": ["0900", "0950", ""], "T": ["0820", "0950", ""]}])
+    blocks = [block for block in free_blocks(busy, "0800", "1000", 30)
+              if block[0] in "MT"]
+
+    assert blocks == [("M", "0800", "0900")]
+    assert ("T", "0800", "0820") in free_blocks(busy, "0800", "1000", 20)
+
+
+def test_free_blocks_are_clamped_to_the_day():
+    # A window past midnight must not spill into the next day's slots
+    assert free_blocks(0, "2200", "2600")[0] == ("M", "2200", "2400")
+    assert free_blocks(0, "2400", "2600") == []
+    assert free_blocks(0, "0000", "2400") == [
+        (day, "0000", "2400") for day in WEEK_DAYS]